@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+bench_cache_codecs.py
+
+Compares the size and encode/decode time of cached product catalogs for
+each CacheManager codec, against columnar JSON and msgpack (when installed)
+as alternative wire formats.
+Usage: python benchmarks/bench_cache_codecs.py [products]
+"""
+
+import os
+import sys
+import json
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from modules.cache_manager import CODECS
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def catalog(count):
+    products = []
+    for index in range(1, count + 1):
+        product = {
+            "id": index,
+            "name": f"Dog food {index}",
+            "description": f"Premium dry food for adult dogs, bag #{index}",
+            "price": 1500 + index % 500,
+            "size": ("small", "medium", "large")[index % 3],
+            "quantity": index % 40,
+            "created_at": "2026-01-15 10:32:11.482913",
+            "updated_at": "2026-02-03 18:04:55.120044"
+        }
+        if index % 4 == 0:
+            product["cart_products"] = [{
+                "cart_id": index // 4,
+                "product_id": index,
+                "quantity": 2,
+                "checkout": False,
+                "created_at": "2026-02-10 09:12:00.000000",
+                "updated_at": "2026-02-10 09:12:00.000000"
+            }]
+        products.append(product)
+    return products
+
+
+def columnar(products):
+    columns = sorted({key for product in products for key in product})
+    return {"columns": columns,
+            "rows": [[product.get(column) for column in columns] for product in products]}
+
+
+def timed(operation, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = operation()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def report(label, size, raw_size, encode_ms, decode_ms):
+    print(f"{label:<24} {size:>12,} {size / raw_size:>7.1%} {encode_ms:>10.1f} {decode_ms:>10.1f}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    products = catalog(count)
+    body, dumps_ms = timed(lambda: json.dumps(products, separators=(",", ":")).encode("utf-8"))
+
+    print("=" * 70)
+    print(f"Cached catalog of {count:,} products ({len(body):,} bytes of JSON, "
+          f"json.dumps {dumps_ms:.1f} ms)")
+    print("=" * 70)
+    print(f"{'format':<24} {'bytes':>12} {'ratio':>7} {'encode ms':>10} {'decode ms':>10}")
+
+    # Codecs compress the response bytes; hits decompress and send them as-is
+    for name, (_, compress, decompress) in CODECS.items():
+        if compress is None:
+            report(f"json + {name}", len(body), len(body), 0.0, 0.0)
+            continue
+        stored, encode_ms = timed(lambda: compress(body))
+        _, decode_ms = timed(lambda: decompress(stored))
+        report(f"json + {name}", len(stored), len(body), encode_ms, decode_ms)
+
+    # Alternative formats must be parsed and re-encoded to JSON on every hit,
+    # so their decode time includes json.dumps of the result
+    table, _ = timed(lambda: columnar(products))
+    encoded, encode_ms = timed(lambda: json.dumps(table, separators=(",", ":")).encode("utf-8"))
+    _, decode_ms = timed(lambda: json.dumps(
+        [dict(zip(table["columns"], row)) for row in json.loads(encoded)["rows"]]))
+    report("columnar json", len(encoded), len(body), encode_ms, decode_ms)
+
+    if msgpack is not None:
+        packed, encode_ms = timed(lambda: msgpack.packb(products))
+        _, decode_ms = timed(lambda: json.dumps(msgpack.unpackb(packed)))
+        report("msgpack", len(packed), len(body), encode_ms, decode_ms)
+    else:
+        print("msgpack not installed, skipped")
+
+
+if __name__ == "__main__":
+    main()
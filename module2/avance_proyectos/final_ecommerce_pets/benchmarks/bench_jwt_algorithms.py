@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+bench_jwt_algorithms.py
+
+Micro-benchmark of JWT encode/decode throughput for each supported signing
+algorithm (RS256, ES256, EdDSA).
+Usage: python benchmarks/bench_jwt_algorithms.py [iterations]
+"""
+
+import os
+import sys
+import time
+import jwt
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from modules.secret_keys import SUPPORTED_ALGORITHMS, create_private_key, key_id
+
+
+def throughput(iterations, operation):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    payload = {"id": 1, "email": "bench@pets.com", "role": "client", "type": "access"}
+
+    print("=" * 60)
+    print("JWT encode/decode throughput per algorithm")
+    print("=" * 60)
+    print(f"{'algorithm':<10} {'encode/s':>12} {'decode/s':>12} {'token bytes':>12}")
+
+    for algorithm in SUPPORTED_ALGORITHMS:
+        private_key = create_private_key(algorithm)
+        public_key = private_key.public_key()
+        headers = {"kid": key_id(public_key)}
+        token = jwt.encode(payload, private_key, algorithm=algorithm, headers=headers)
+
+        encode_rate = throughput(iterations, lambda: jwt.encode(
+            payload, private_key, algorithm=algorithm, headers=headers))
+        decode_rate = throughput(iterations, lambda: jwt.decode(
+            token, public_key, algorithms=[algorithm]))
+        print(f"{algorithm:<10} {encode_rate:>12,.0f} {decode_rate:>12,.0f} {len(token):>12}")
+
+
+if __name__ == "__main__":
+    main()
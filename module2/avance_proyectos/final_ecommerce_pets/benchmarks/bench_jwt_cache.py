@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+bench_jwt_cache.py
+
+Micro-benchmark comparing RS256 verification on every request against the
+verified-token cache used by require_jwt.
+Usage: python benchmarks/bench_jwt_cache.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ["FILE_PATH"] = tempfile.mkdtemp()
+
+from modules.secret_keys import generate_private_key
+from modules.jwt_manager import get_jwt_manager, verify_token, token_cache
+
+
+def run(label, iterations, token):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        verify_token(token)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {iterations / elapsed:>12,.0f} verifies/s "
+          f"{elapsed / iterations * 1e6:>8.1f} us/verify")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    generate_private_key()
+    token = get_jwt_manager().encode({"id": 1, "email": "bench@pets.com", "role": "client"})
+
+    print("=" * 60)
+    print("JWT verification - verify per request vs cached")
+    print("=" * 60)
+
+    token_cache.enabled = False
+    run("verify per request", iterations, token)
+
+    token_cache.enabled = True
+    token_cache.clear()
+    run("cached", iterations, token)
+    print(token_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+bench_serializers.py
+
+Compares the hand-built getattr loop over joined ORM objects with the
+schema serializer over column-only Row tuples, on a product listing served
+from a temporary SQLite database.
+Usage: python benchmarks/bench_serializers.py [products]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ["TESTING"] = "true"
+
+from sqlalchemy.orm import joinedload
+from modules.db_manager import DBManager
+from modules.models import _models
+from modules.serializers import _schemas
+
+
+def populate(db_manager, count):
+    session = db_manager.sessionlocal()
+    session.execute(_models["product"].__table__.insert(), [
+        {"name": f"Dog food {index}", "description": f"Premium dry food, bag #{index}",
+         "price": 1500 + index % 500, "size": ("small", "medium", "large")[index % 3],
+         "quantity": index % 40}
+        for index in range(1, count + 1)
+    ])
+    session.commit()
+
+
+def getattr_loop(db_manager, session):
+    model_class = _models["product"]
+    products = (session.query(model_class)
+                .options(joinedload(model_class.cart_products))
+                .order_by(model_class.id).all())
+    product_list = []
+    for product in products:
+        product_data = {
+            "id": product.id,
+            "name": product.name,
+            "description": product.description,
+            "price": product.price,
+            "size": product.size,
+            "quantity": product.quantity,
+            "created_at": str(product.created_at) if product.created_at else None,
+            "updated_at": str(product.updated_at) if product.updated_at else None
+        }
+        if product.cart_products:
+            product_data["cart_products"] = [{
+                "cart_id": cart_product.cart_id,
+                "product_id": cart_product.product_id,
+                "quantity": cart_product.quantity,
+                "checkout": cart_product.checkout,
+                "created_at": str(cart_product.created_at),
+                "updated_at": str(cart_product.updated_at)
+            } for cart_product in product.cart_products]
+        product_list.append(product_data)
+    return product_list
+
+
+def schema(db_manager, session):
+    product_schema = _schemas["product"]
+    rows = db_manager.get_query(session, product_schema.model, fields=product_schema.columns)
+    return product_schema.dump(db_manager, session, rows)
+
+
+def run(label, db_manager, serializer, repeat=3):
+    best = None
+    for _ in range(repeat):
+        session = db_manager.sessionlocal()
+        start = time.perf_counter()
+        records = serializer(db_manager, session)
+        elapsed = time.perf_counter() - start
+        db_manager.remove_session()
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:>10.1f} ms {len(records) / best:>14,.0f} rows/s")
+    return records
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db_manager = DBManager(db_uri=f"sqlite:///{path}")
+    db_manager.create_tables()
+    populate(db_manager, count)
+
+    print("=" * 60)
+    print(f"Serializing {count:,} products (query + dicts)")
+    print("=" * 60)
+    expected = run("ORM objects + getattr loop", db_manager, getattr_loop)
+    actual = run("schema over Row tuples", db_manager, schema)
+    print("same output:", expected == actual)
+
+
+if __name__ == "__main__":
+    main()
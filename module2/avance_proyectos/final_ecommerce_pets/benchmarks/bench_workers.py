@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+bench_workers.py
+
+Load test of the production server (gunicorn.conf.py) with a growing number
+of worker processes. Each run serves a SQLite catalog of 1000 products with
+Redis unreachable, so every request runs auth, SQL and serialization, and
+reports requests per second and latency percentiles.
+Usage: python benchmarks/bench_workers.py [seconds] [clients] [workers ...]
+"""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+WORK_DIR = tempfile.mkdtemp()
+os.environ.update({
+    "TESTING": "true",
+    "FILE_PATH": WORK_DIR,
+    "DB_URI": f"sqlite:///{WORK_DIR}/bench.db",
+    "DEFAULT_ADMIN": "admin",
+    "REDIS_HOST": "127.0.0.1",
+    "REDIS_PORT": "1",
+    "PASSWORD_WORKERS": "0",
+    "SERVER_TLS": "false",
+})
+
+PATH = "/e_commerce_pets/products?limit=100"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed():
+    from e_main import prepare
+    from modules.db_manager import DBManager
+    from modules.models import Product
+    from modules.jwt_manager import get_jwt_manager
+
+    admin = prepare()
+    db_manager = DBManager(db_uri=os.environ["DB_URI"])
+    session = db_manager.sessionlocal()
+    session.bulk_save_objects([
+        Product(name=f"product {i}", description="Dry food for adult dogs",
+                price=1000 + i, size="medium", quantity=i % 50)
+        for i in range(1000)
+    ])
+    session.commit()
+    session.close()
+    return get_jwt_manager().encode({"id": 1, **admin})
+
+
+def start_server(workers, port):
+    env = dict(os.environ, SERVER_WORKERS=str(workers), SERVER_BIND=f"127.0.0.1:{port}")
+    server = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py"], cwd=PROJECT_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/e_commerce_pets/_ready")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not become ready")
+
+
+def client(args):
+    port, token, seconds = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        conn.request("GET", PATH, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"GET {PATH} answered {response.status}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(workers, clients, seconds, token):
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        with Pool(clients) as pool:
+            # Warm every worker up before measuring
+            pool.map(client, [(port, token, 1)] * clients)
+            results = pool.map(client, [(port, token, seconds)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = sorted(latency for result in results for latency in result)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{workers:>7} {len(latencies) / seconds:>10,.0f} {p50:>9.1f} {p99:>9.1f}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    worker_counts = [int(n) for n in sys.argv[3:]] or [1, 2, 4]
+    token = seed()
+
+    print("=" * 60)
+    print(f"gunicorn throughput, {clients} keep-alive clients, GET {PATH}")
+    print(f"{os.cpu_count()} CPU(s), {os.environ.get('SERVER_THREADS', '4')} threads per worker")
+    print("=" * 60)
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for workers in worker_counts:
+        run(workers, clients, seconds, token)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 main.py
 
 Entry point for the E-Commerce Mascotas API application.
-Initializes the Flask app, configures extensions, sets up the database and admin user,
-registers all API endpoints, and runs the server with SSL.
+Provides the create_app factory, the one-time startup tasks (keys, database
+migrations, admin user) and the development server. Production runs the
+factory under gunicorn (see gunicorn.conf.py).
 
 Modules imported:
     - Flask and related extensions
@@ -12,9 +13,9 @@ Modules imported:
     - Configuration modules for cache, authentication, and SSL
 """
 from modules.db_manager import DBManager
-from modules.jwt_manager import JWT_Manager
-from flask import Flask
-from modules.config import DEFAULT_ADMIN
+from modules.jwt_manager import get_jwt_manager, token_cache
+from flask import Flask, jsonify, make_response
+from modules.config import DEFAULT_ADMIN, SQL_STATEMENT_LIMIT
 from modules.https_config import ssl_context
 from repositories.user_repository import UserRepository
 from repositories.registration_repository import RegistrationRepository
@@ -26,9 +27,19 @@ from repositories.shoppping_cart_repository import ShoppingCartRepository
 from repositories.receipt_repository import ReceiptRepository
 from repositories.shoppping_cart_product_repository import ShoppingCartProductRepository
 from repositories.user_contact_repository import UserContactRepository
-from modules.secret_keys import generate_private_key, password_hash
-from modules.config import FILE_PATH
+from repositories.pool_repository import PoolRepository
+from repositories.cache_repository import CacheRepository
+from repositories.readiness_repository import ReadinessRepository
+from repositories.metrics_repository import MetricsRepository
+from modules import metrics, compression
+from modules.cache_manager import cache_stats
+from modules.secret_keys import (ensure_keys, password_hash,
+                                 start_password_workers)
+from modules.migrations import migrate
+from modules.config import FILE_PATH, DB_URI
 
+# Base path of every endpoint
+API_NAME = "e_commerce_pets"
 
 
 def write_token(token):
@@ -102,23 +113,98 @@ def register_api(app, name, db_manager):
     app.add_url_rule(f"/{name}/user_contacts", view_func=user_contact_repo, methods=["GET", "POST"])
     app.add_url_rule(f"/{name}/user_contacts/<id>", view_func=user_contact_repo, methods=["GET", "PUT", "DELETE"])
 
+    # connection pool stats endpoint
+    pool_repo = PoolRepository.as_view("pool", db_manager)
+    app.add_url_rule(f"/{name}/_pool", view_func=pool_repo, methods=["GET"])
+
+    # cache hit ratio endpoint
+    cache_repo = CacheRepository.as_view("cache", db_manager)
+    app.add_url_rule(f"/{name}/_cache", view_func=cache_repo, methods=["GET"])
+
+    # readiness probe for load balancers during rolling restarts
+    readiness_repo = ReadinessRepository.as_view("ready", db_manager)
+    app.add_url_rule(f"/{name}/_ready", view_func=readiness_repo, methods=["GET"])
+
+    # Prometheus metrics endpoint, fed by per-request timing hooks
+    metrics.init_app(app, db_manager)
+    metrics.add_gauges("cache", cache_stats)
+    metrics.add_gauges("db_pool", db_manager.pool_status)
+    metrics.add_gauges("jwt_cache", token_cache.stats)
+    metrics_repo = MetricsRepository.as_view("metrics", db_manager)
+    app.add_url_rule(f"/{name}/metrics", view_func=metrics_repo, methods=["GET"])
+
+    # gzip/brotli for responses that are not served from a compressed cache entry
+    compression.init_app(app)
+
+    # Fail requests over the SQL statement budget (test mode for N+1 queries)
+    if SQL_STATEMENT_LIMIT:
+        @app.before_request
+        def reset_statement_count():
+            db_manager.reset_statement_count()
+
+        @app.after_request
+        def check_statement_count(response):
+            count = db_manager.statement_count()
+            if count > SQL_STATEMENT_LIMIT:
+                msg = f"Request issued {count} SQL statements (limit {SQL_STATEMENT_LIMIT})"
+                return make_response(jsonify({"error": msg}), 500)
+            return response
+
+
+def prepare():
+    """
+    Run the one-time startup tasks: keys, schema migrations and admin user.
 
-if __name__ == "__main__":
+    All of them are idempotent and cheap when already done. The production
+    server runs them once in its master process, before workers fork.
+
+    Returns:
+        dict: Email and role of the default admin user.
+    """
+    # Generate keys only if missing, so issued tokens survive restarts
+    ensure_keys()
+
+    # Apply pending migrations (no-op when current)
+    db_manager = DBManager(db_uri=DB_URI)
+    migrate(db_manager)
+    db_manager._get_model_name("register_user")
+
+    # Create Admin User (once; hashing is skipped when it already exists)
+    data = {"email": "admin@administrator.com", "role": "administrator"}
+    session = db_manager.sessionlocal()
+    try:
+        model_class = db_manager._get_model()
+        if not db_manager.get_by_email(session, data["email"]):
+            password = password_hash(DEFAULT_ADMIN)
+            new_record = model_class(**data, password=f"{password}")
+            db_manager.insert(session, new_record)
+    finally:
+        session.close()
+        db_manager.remove_session()
+        # Forked workers must not inherit open connections
+        db_manager.engine.dispose()
+    return data
+
+
+def create_app(config=None):
     """
-    Main entry point for the application.
-    Initializes the Flask app, configures extensions, creates necessary directories and admin user,
-    registers all API endpoints, and runs the server with SSL.
+    Application factory.
+
+    Builds a Flask app with its own database manager and every API
+    endpoint registered. Startup tasks are not run here (see prepare), so
+    each worker process of the production server builds its app quickly.
+
+    Args:
+        config (dict, optional): Flask config overrides. ``DB_URI`` selects
+            the database (defaults to the DB_URI setting, then PostgreSQL
+            from .env).
+
+    Returns:
+        Flask: The configured application.
     """
-    # Initialize Flask app
     app = Flask(__name__)
-    
-    # Generate keys
-    generate_private_key()
-    
-    # Initialize database manager
-    db_manager = DBManager()
-    db_manager.drop_tables()
-    db_manager.create_tables()
+    app.config.update(config or {})
+    db_manager = DBManager(db_uri=app.config.get("DB_URI", DB_URI))
     db_manager._get_model_name("register_user")
 
     # CRITICAL: Register teardown handler for session cleanup
@@ -132,31 +218,33 @@ if __name__ == "__main__":
             exception: Any exception that occurred during the request (or None)
         """
         db_manager.remove_session()
-    
-    # Create Admin User
-    session = db_manager.sessionlocal()
-    try:
-        model_class = db_manager._get_model()
-        password = password_hash(DEFAULT_ADMIN)
-        data = {"email": "admin@administrator.com",
-                "password": f"{password}", "role": "administrator"}
-        new_record = model_class(**data)
-        db_manager.insert(session, new_record)
-    finally:
-        session.close()
+
+    # Register all API endpoints
+    register_api(app, API_NAME, db_manager)
+    return app
+
+
+if __name__ == "__main__":
+    """
+    Development entry point: single process Werkzeug server with the reloader.
+    Use ``gunicorn -c gunicorn.conf.py`` in production.
+    """
+    admin = prepare()
+
+    # Fork password hashing workers before serving requests
+    start_password_workers()
+
+    app = create_app()
 
     # Create token
-    jwt = JWT_Manager()
-    token = jwt.encode({"email": data["email"], "role": data["role"]})
+    jwt = get_jwt_manager()
+    token = jwt.encode({"email": admin["email"], "role": admin["role"]})
     write_token(token)
 
-    # Register all API endpoints
-    register_api(app, "e_commerce_pets", db_manager)
-    
     # Run the application with SSL
     app.run(
         ssl_context=ssl_context,
         host="localhost",
         port=5001,
         debug=True
-    )
\ No newline at end of file
+    )
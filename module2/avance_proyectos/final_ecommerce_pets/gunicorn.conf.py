@@ -0,0 +1,63 @@
+"""gunicorn.conf.py
+
+Production server settings for the E-Commerce Pets API.
+
+Runs SERVER_WORKERS pre-forked worker processes with SERVER_THREADS threads
+each. Workers are recycled after SERVER_MAX_REQUESTS requests (plus jitter, so
+they do not all restart at once) and TLS uses the certificate from
+modules/https_config.py. Workers share a METRICS_DIR (a temporary directory
+unless set) so /metrics reports all of them.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+    kill -HUP <master pid>    # graceful reload: new workers start, old ones
+                              # finish their in-flight requests and exit
+"""
+
+import os
+import tempfile
+
+# Set before modules.config is imported, so the forked workers inherit it
+if not os.getenv("METRICS_DIR"):
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="e_commerce_pets_metrics_")
+
+from modules.config import (SERVER_BIND, SERVER_WORKERS, SERVER_THREADS,
+                            SERVER_MAX_REQUESTS, SERVER_MAX_REQUESTS_JITTER,
+                            SERVER_TIMEOUT, SERVER_GRACEFUL_TIMEOUT, SERVER_TLS)
+
+# Each worker builds its own app, so a reload also picks up code changes
+wsgi_app = "e_main:create_app()"
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+worker_class = "gthread"
+threads = SERVER_THREADS
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+timeout = SERVER_TIMEOUT
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+
+if SERVER_TLS:
+    # Module import: "ssl_context" is itself a gunicorn setting
+    from modules import https_config
+    certfile, keyfile = https_config.ssl_context
+
+
+def on_starting(server):
+    """Run keys, migrations and admin setup once in the master, before workers fork."""
+    from e_main import prepare
+    from modules import metrics
+    prepare()
+    # Counters restart with the server
+    metrics.clear()
+
+
+def post_worker_init(worker):
+    """Fork the password hashing pool of a worker before it serves requests."""
+    from modules.secret_keys import start_password_workers
+    start_password_workers()
+
+
+def worker_exit(server, worker):
+    """Write the final metrics of a worker, so a recycled worker's counts are kept."""
+    from modules import metrics
+    metrics.flush()
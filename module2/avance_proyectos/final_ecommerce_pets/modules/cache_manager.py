@@ -1,65 +1,706 @@
+import os
+import gzip
+import json
+import math
+import logging
+import time
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import redis
 from modules.config import (REDIS_HOST, REDIS_PORT,
-                            REDIS_PASSWORD)
+                            REDIS_PASSWORD, REDIS_MAX_CONNECTIONS,
+                            REDIS_SOCKET_TIMEOUT, REDIS_CONNECT_TIMEOUT,
+                            REDIS_HEALTH_CHECK_INTERVAL, REDIS_BREAKER_FAILURES,
+                            REDIS_BREAKER_SLOW_CALL, REDIS_BREAKER_COOLDOWN,
+                            LOCAL_CACHE_ENABLED,
+                            LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL,
+                            LOCAL_CACHE_MAX_BYTES, CACHE_INVALIDATION_CHANNEL,
+                            SINGLE_FLIGHT_LOCK_TTL, SINGLE_FLIGHT_WAIT,
+                            CACHE_HARD_TTL_FACTOR, CACHE_EARLY_REFRESH_BETA,
+                            CACHE_REFRESH_WORKERS, CACHE_CODEC,
+                            CACHE_COMPRESS_MIN_BYTES, CACHE_COMPRESS_LEVEL)
+from modules.metrics import timed
+from modules.compression import ENCODINGS
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+logger = logging.getLogger(__name__)
+
+
+# First byte of every framed value; values with another version (written by
+# an older or newer release) are treated as misses
+FRAME_VERSION = 1
+# name -> (id byte stored after the version, compress, decompress).
+# gzip output with mtime=0 is deterministic and is also a valid
+# Content-Encoding: gzip body
+CODECS = {
+    "none": (0, None, None),
+    "gzip": (1, lambda data: gzip.compress(data, CACHE_COMPRESS_LEVEL, mtime=0), gzip.decompress),
+}
+if lz4 is not None:
+    CODECS["lz4"] = (2, lambda data: lz4.frame.compress(data, compression_level=CACHE_COMPRESS_LEVEL),
+                     lz4.frame.decompress)
+_DECOMPRESSORS = {codec_id: decompress for codec_id, _, decompress in CODECS.values()}
+if CACHE_CODEC not in CODECS:
+    logger.warning(f"Cache codec {CACHE_CODEC!r} is not available, using gzip")
+_codec = CODECS.get(CACHE_CODEC, CODECS["gzip"])
+
+# Extends the TTL of KEYS[1] to ARGV[1] seconds unless it already lives
+# longer (what EXPIRE NX plus EXPIRE GT do, which need Redis 7)
+_EXTEND_TTL_SCRIPT = """
+if redis.call("TTL", KEYS[1]) < tonumber(ARGV[1]) then
+    return redis.call("EXPIRE", KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+def _namespace(key):
+    # Keys are namespaced by their prefix ("products:all" -> "products")
+    return key.split(":", 1)[0]
+
+
+def _variant_key(key, encoding):
+    # Key of a cached response compressed with a Content-Encoding, in the
+    # same namespace as the raw response
+    return f"{key}:encoding={encoding}"
+
+
+class CircuitOpenError(redis.RedisError):
+    # Raised instead of calling Redis while the breaker is open, so callers
+    # take their usual RedisError fallback without waiting for a timeout
+    pass
+
+
+class CircuitBreaker:
+    # closed: calls go through. open: calls are rejected until the cooldown
+    # ends. half_open: one probe call goes through, its outcome closes or
+    # reopens the breaker. Connection errors, timeouts and calls slower
+    # than slow_call count towards the threshold; any fast success resets
+    # the count. Errors Redis answers with (ResponseError, lock errors)
+    # show it is up, so they count as neither.
+    STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+    def __init__(self, failures=REDIS_BREAKER_FAILURES, slow_call=REDIS_BREAKER_SLOW_CALL,
+                 cooldown=REDIS_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() >= self._open_until:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _on_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probing = False
+            self.state = "closed"
+
+    def _on_neutral(self):
+        # The call failed for a reason unrelated to Redis availability (a
+        # rejected command, bad value, serialization error): release the
+        # probe without judging Redis
+        with self._lock:
+            self._probing = False
+
+    def _on_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failures:
+                if self.state != "open":
+                    self.opened += 1
+                    logger.warning(f"Redis circuit breaker open for {self.cooldown}s")
+                self.state = "open"
+                self._open_until = time.monotonic() + self.cooldown
+
+    @contextmanager
+    def guard(self, timed=True):
+        # timed=False for calls that block by design (lock waits)
+        if not self._allow():
+            raise CircuitOpenError("Redis circuit breaker is open")
+        start = time.monotonic()
+        try:
+            yield
+        except CircuitOpenError:
+            raise
+        except (redis.ConnectionError, redis.TimeoutError):
+            self._on_failure()
+            raise
+        except BaseException:
+            self._on_neutral()
+            raise
+        if timed and time.monotonic() - start > self.slow_call:
+            self._on_failure()
+        else:
+            self._on_success()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "state_code": self.STATES[self.state],
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+def _report(message, error):
+    # Calls skipped by the open breaker are expected, only log real errors
+    if not isinstance(error, CircuitOpenError):
+        logger.error(f"{message}: {error}")
+
+
+class LocalCache:
+    # In-process LRU tier in front of Redis for small hot values. Entries
+    # expire after a short TTL and are dropped as soon as another process
+    # publishes an invalidation for their namespace.
+    def __init__(self, maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL,
+                 max_bytes=LOCAL_CACHE_MAX_BYTES):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Bumped on every invalidation, so a value read from Redis before an
+        # invalidation is never stored locally after it
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(_namespace(key), 0)
+
+    def get(self, key, count=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += count
+                return None
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry[1]
+
+    def put(self, key, value, generation=None, size=None):
+        if (len(value) if size is None else size) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations.get(_namespace(key), 0):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        prefix = f"{namespace}:"
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            for namespace in self._generations:
+                self._generations[namespace] += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LocalCache()
+breaker = CircuitBreaker()
+# Namespaces whose invalidation did not reach Redis, retried before the
+# next Redis read or write so stale entries are not served once it recovers
+_pending_invalidations = set()
+_redis_stats = {"hits": 0, "misses": 0}
+_flight_stats = {"rebuilds": 0, "coalesced": 0}
+# key -> [lock, number of threads using it]
+_flights = {}
+_flights_lock = threading.Lock()
+_codec_stats = {"raw_bytes": 0, "stored_bytes": 0, "variant_bytes": 0}
+_stale_stats = {"stale_served": 0, "early_refreshes": 0, "refreshes": 0, "refresh_errors": 0}
+# Keys being rebuilt by this process's refresh workers
+_refreshing = set()
+_refresher = {"pid": None, "executor": None}
+_refresh_lock = threading.Lock()
+_pool = {"pid": None, "pool": None}
+_pool_lock = threading.Lock()
+_subscriber = {"pid": None, "thread": None, "retry_at": 0.0}
+_subscriber_lock = threading.Lock()
+
+
+def _hit_ratio(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+def cache_stats():
+    # Per-tier counters; a local miss falls through to Redis, so the Redis
+    # tier only sees the requests the local tier could not answer
+    return {
+        "local": {
+            "enabled": _local_enabled(),
+            "hits": local_cache.hits,
+            "misses": local_cache.misses,
+            "hit_ratio": _hit_ratio(local_cache.hits, local_cache.misses),
+            "size": len(local_cache),
+            "maxsize": local_cache.maxsize,
+        },
+        "redis": {
+            "hits": _redis_stats["hits"],
+            "misses": _redis_stats["misses"],
+            "hit_ratio": _hit_ratio(_redis_stats["hits"], _redis_stats["misses"]),
+        },
+        "single_flight": dict(_flight_stats),
+        "stale_while_revalidate": dict(_stale_stats),
+        "codec": {
+            "name": next(name for name, codec in CODECS.items() if codec is _codec),
+            "raw_bytes": _codec_stats["raw_bytes"],
+            "stored_bytes": _codec_stats["stored_bytes"],
+            "variant_bytes": _codec_stats["variant_bytes"],
+        },
+        "circuit_breaker": breaker.stats(),
+        "pending_invalidations": sorted(_pending_invalidations),
+    }
+
+
+@contextmanager
+def _local_flight(key):
+    # Threads of this process missing the same key queue behind one lock
+    with _flights_lock:
+        flight = _flights.setdefault(key, [threading.Lock(), 0])
+        flight[1] += 1
+    acquired = flight[0].acquire(timeout=SINGLE_FLIGHT_WAIT)
+    try:
+        yield
+    finally:
+        if acquired:
+            flight[0].release()
+        with _flights_lock:
+            flight[1] -= 1
+            if not flight[1]:
+                del _flights[key]
+
+
+def _connection_pool():
+    # One pool per process, shared by every CacheManager. Connections are
+    # opened on first use, and a forked worker builds its own pool instead
+    # of sharing sockets with its parent
+    with _pool_lock:
+        if _pool["pid"] != os.getpid():
+            _pool["pool"] = redis.ConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT or 6379,
+                password=REDIS_PASSWORD,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            )
+            _pool["pid"] = os.getpid()
+        return _pool["pool"]
+
+
+def _refresh_executor():
+    # Created lazily so forked workers get their own threads
+    with _refresh_lock:
+        if _refresher["pid"] != os.getpid():
+            _refresher["executor"] = ThreadPoolExecutor(
+                max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+            _refresher["pid"] = os.getpid()
+            _refreshing.clear()
+        return _refresher["executor"]
+
+
+class NotModified(tuple):
+    # (None, headers, meta) read from Redis for an entry whose ETag matched
+    # the request; it has no body, so it is not kept in the local tier
+    pass
+
+
+def _is_fresh(meta):
+    # Past the soft TTL the value is stale. Before it, refresh early with a
+    # probability that grows as expiry nears and with the rebuild time
+    # (XFetch), so keys filled together do not all expire together
+    remaining = meta["fresh_until"] - time.time()
+    if remaining <= 0:
+        _stale_stats["stale_served"] += 1
+        return False
+    if CACHE_EARLY_REFRESH_BETA > 0 and meta["delta"] > 0:
+        if -meta["delta"] * CACHE_EARLY_REFRESH_BETA * math.log(1.0 - random.random()) >= remaining:
+            _stale_stats["early_refreshes"] += 1
+            return False
+    return True
+
+
+def _local_enabled():
+    # The local tier is only coherent while this process is subscribed to
+    # the invalidation channel
+    return (LOCAL_CACHE_ENABLED and _subscriber["pid"] == os.getpid()
+            and _subscriber["thread"] is not None and _subscriber["thread"].is_alive())
+
+
+def _on_invalidation(message):
+    namespace = message["data"]
+    if isinstance(namespace, bytes):
+        namespace = namespace.decode("utf-8")
+    local_cache.invalidate(namespace)
+
+
+def _on_subscriber_error(error, pubsub, thread):
+    # Messages may have been missed while disconnected; drop everything
+    # and let the pubsub reconnect on the next poll
+    logger.error(f"An error ocurred while listening for cache invalidations: {error}")
+    local_cache.clear()
+    time.sleep(1)
+
+
+def _start_subscriber(redis_client):
+    # One listener thread per process, started lazily so forked workers
+    # get their own
+    if not LOCAL_CACHE_ENABLED or _local_enabled():
+        return
+    with _subscriber_lock:
+        # While Redis is unreachable retry at most every few seconds instead
+        # of paying a connect timeout on every request
+        if _local_enabled() or time.monotonic() < _subscriber["retry_at"]:
+            return
+        _subscriber["retry_at"] = time.monotonic() + 5
+        local_cache.clear()
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CACHE_INVALIDATION_CHANNEL: _on_invalidation})
+            _subscriber["thread"] = pubsub.run_in_thread(
+                sleep_time=1, daemon=True, exception_handler=_on_subscriber_error)
+            _subscriber["pid"] = os.getpid()
+        except redis.RedisError as error:
+            logger.error(f"An error ocurred while subscribing to cache invalidations: {error}")
 
 
 class CacheManager:
-    def __init__(self, *args, **kwargs):
-        self.redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            password=REDIS_PASSWORD,
-            *args,
-            **kwargs,
-        )
-        connection_status = self.redis_client.ping()
-        if connection_status:
-            print("Connection created succesfully")
+    def __init__(self):
+        # Cheap to build per request: no connection is opened here, commands
+        # borrow one from the shared pool
+        self.redis_client = redis.Redis(connection_pool=_connection_pool())
+        self._extend_ttl = self.redis_client.register_script(_EXTEND_TTL_SCRIPT)
+        _start_subscriber(self.redis_client)
 
+    @staticmethod
+    def _index_key(namespace):
+        # Set holding every cached key of a namespace, e.g. "products:keys"
+        return f"{namespace}:keys"
+
+    @timed("cache_set")
     def store_data(self, key, value, ttl=None):
-        try:
-            if ttl is None:
-                self.redis_client.set(key, value)
+        local_value = value if isinstance(value, str) else value.decode("utf-8")
+        self._store([(key, value, local_value, None)], ttl)
+
+    @timed("cache_set")
+    def store_raw(self, key, body, ttl=None, headers=None, build_time=0.0, variants=None,
+                  generation=None):
+        # Store response bytes together with the headers to send back with
+        # them, framed as a version byte, a codec byte, one JSON header line
+        # and the (compressed when large) body, so a hit is served without
+        # parsing or re-encoding the payload.
+        # ttl is the soft TTL; the key is kept CACHE_HARD_TTL_FACTOR times
+        # longer so stale bytes can be served while a refresh runs.
+        # variants maps each Content-Encoding to the body compressed with it
+        # (None when the body is sent as is). Each is stored under its own
+        # key next to the raw one, so clients accepting it get the bytes
+        # compressed once per fill. generation is the namespace generation
+        # read before the payload was loaded; if the namespace was
+        # invalidated since, the payload may be stale and is not stored.
+        # Returns encoding -> (body, headers), with None for the raw body
+        headers = dict(headers or {})
+        headers["ETag"] = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        meta = {"fresh_until": time.time() + ttl if ttl else math.inf, "delta": build_time}
+        hard_ttl = math.ceil(ttl * CACHE_HARD_TTL_FACTOR) if ttl else None
+        codec_id, compress, _ = _codec
+        stored = body
+        if compress is None or len(body) < CACHE_COMPRESS_MIN_BYTES:
+            codec_id = 0
+        else:
+            stored = compress(body)
+        _codec_stats["raw_bytes"] += len(body)
+        _codec_stats["stored_bytes"] += len(stored)
+        entries = [(key, self._frame(codec_id, headers, meta, stored),
+                    (body, headers, meta), len(body))]
+        representations = {None: (body, headers)}
+        for encoding, encoded in (variants or {}).items():
+            variant_headers = dict(headers)
+            if encoded is None:
+                encoded = body
             else:
-                self.redis_client.setex(key, ttl, value)
+                variant_headers["Content-Encoding"] = encoding
+                # Strong ETags differ between content codings of a body
+                variant_headers["ETag"] = f'{headers["ETag"][:-1]}-{encoding}"'
+            _codec_stats["variant_bytes"] += len(encoded)
+            entries.append((_variant_key(key, encoding), self._frame(0, variant_headers, meta, encoded),
+                            (encoded, variant_headers, meta), len(encoded)))
+            representations[encoding] = (encoded, variant_headers)
+        self._store(entries, hard_ttl, generation)
+        return representations
+
+    @staticmethod
+    def _frame(codec_id, headers, meta, stored):
+        return (bytes((FRAME_VERSION, codec_id))
+                + json.dumps({"headers": headers, "meta": meta}).encode("utf-8") + b"\n" + stored)
+
+    def generation(self, key):
+        # Invalidation count of the key's namespace, read before loading a
+        # payload and passed back to store_raw()
+        return local_cache.generation(key)
+
+    def _store(self, entries, ttl, generation=None):
+        # entries are (key, value, local value, local size) tuples of one
+        # namespace, written in one round trip. Keys are registered in their
+        # namespace index so invalidate() can find them
+        index = self._index_key(_namespace(entries[0][0]))
+        self._flush_invalidations()
+        if generation is not None and generation != local_cache.generation(entries[0][0]):
+            return
+        try:
+            with breaker.guard():
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value, _, _ in entries:
+                    if ttl is None:
+                        pipe.set(key, value)
+                    else:
+                        pipe.setex(key, ttl, value)
+                pipe.sadd(index, *(key for key, _, _, _ in entries))
+                if ttl is not None:
+                    # Index lives at least as long as its longest-lived member
+                    self._extend_ttl(keys=[index], args=[ttl], client=pipe)
+                else:
+                    pipe.persist(index)
+                pipe.execute()
+            if _local_enabled():
+                for key, _, local_value, size in entries:
+                    local_cache.put(key, local_value, generation, size=size)
         except redis.RedisError as error:
-            print(f"An error ocurred while storing data in Redis: {error}")
+            _report("An error ocurred while storing data in Redis", error)
 
+    @timed("cache_get")
     def check_key(self, key):
         try:
-            key_exists = self.redis_client.exists(key)
-            if key_exists:
-                ttl = self.redis_client.ttl(key)
-                return True, ttl
+            with breaker.guard():
+                key_exists = self.redis_client.exists(key)
+                if key_exists:
+                    ttl = self.redis_client.ttl(key)
+                    return True, ttl
 
             return False, None
         except redis.RedisError as error:
-            print(f"An error ocurred while checking a key in Redis: {error}")
+            _report("An error ocurred while checking a key in Redis", error)
             return False, None
 
     def get_data(self, key):
+        return self._fetch(key, lambda output: output.decode("utf-8"))
+
+    def get_raw(self, key, etag_matches=None, encoding=None, count=True):
+        # Returns (body bytes, headers dict, fresh), or (None, None, False) on
+        # a miss. Stale values are still returned with fresh=False so the
+        # caller can serve them and refresh in the background.
+        # etag_matches(etag) is checked against a Redis hit before its body
+        # is decompressed; on a match the body is None, since a 304 needs
+        # only the headers. With an encoding the variant stored for it is read.
+        # count=False leaves the hit/miss counters alone, for re-checks of a
+        # key the request already looked up
+        if encoding is not None:
+            key = _variant_key(key, encoding)
+        result = self._fetch(key, lambda output: self._unframe(output, etag_matches),
+                             size=lambda value: len(value[0]), count=count)
+        if result is None:
+            return None, None, False
+        body, headers, meta = result
+        return body, headers, _is_fresh(meta)
+
+    def refresh_in_background(self, key, rebuild):
+        # Run rebuild() on a refresh worker unless this process or another
+        # worker (Redis lock) is already rebuilding the key. The executor is
+        # fetched first: creating it resets _refreshing in a new process
+        executor = _refresh_executor()
+        with _refresh_lock:
+            if key in _refreshing:
+                return False
+            _refreshing.add(key)
         try:
-            output = self.redis_client.get(key)
-            if output is not None:
-                result = output.decode("utf-8")
+            executor.submit(self._refresh, key, rebuild)
+        except RuntimeError as error:
+            _refreshing.discard(key)
+            logger.error(f"An error ocurred while scheduling a cache refresh: {error}")
+            return False
+        return True
+
+    def _refresh(self, key, rebuild):
+        try:
+            lock = self.redis_client.lock(f"{key}:lock", timeout=SINGLE_FLIGHT_LOCK_TTL)
+            with breaker.guard():
+                acquired = lock.acquire(blocking=False)
+            if not acquired:
+                return
+            try:
+                rebuild()
+                _stale_stats["refreshes"] += 1
+            finally:
+                lock.release()
+        except Exception as error:
+            _stale_stats["refresh_errors"] += 1
+            _report("An error ocurred while refreshing a cache entry", error)
+        finally:
+            _refreshing.discard(key)
+
+    @contextmanager
+    def single_flight(self, key, encoding=None):
+        # Coalesce rebuilds of a missed key: one thread per process and one
+        # process across workers (short Redis lock) rebuild it while the
+        # others wait. Yields get_raw(key, encoding=encoding) after the wait,
+        # so waiters get the value the leader stored; a None body means the
+        # caller rebuilds. The caller already counted its miss, so this
+        # lookup is not counted again.
+        # Waits are bounded, after SINGLE_FLIGHT_WAIT the caller rebuilds anyway.
+        with _local_flight(key):
+            lock = self.redis_client.lock(f"{key}:lock", timeout=SINGLE_FLIGHT_LOCK_TTL,
+                                          blocking_timeout=SINGLE_FLIGHT_WAIT)
+            try:
+                with breaker.guard(timed=False):
+                    acquired = lock.acquire()
+            except redis.RedisError as error:
+                _report("An error ocurred while locking a key in Redis", error)
+                acquired = False
+            try:
+                result = self.get_raw(key, encoding=encoding, count=False)
+                if result[0] is not None:
+                    _flight_stats["coalesced"] += 1
+                else:
+                    _flight_stats["rebuilds"] += 1
+                yield result
+            finally:
+                if acquired:
+                    try:
+                        with breaker.guard():
+                            lock.release()
+                    except redis.RedisError as error:
+                        _report("An error ocurred while unlocking a key in Redis", error)
+
+    @staticmethod
+    def _unframe(output, etag_matches=None):
+        if output[0] != FRAME_VERSION or output[1] not in _DECOMPRESSORS:
+            return None
+        header, _, body = output[2:].partition(b"\n")
+        header = json.loads(header)
+        if etag_matches is not None and etag_matches(header["headers"].get("ETag", "")):
+            return NotModified((None, header["headers"], header["meta"]))
+        decompress = _DECOMPRESSORS[output[1]]
+        if decompress is not None:
+            body = decompress(body)
+        return body, header["headers"], header["meta"]
+
+    @timed("cache_get")
+    def _fetch(self, key, decode, size=None, count=True):
+        self._flush_invalidations()
+        use_local = _local_enabled()
+        if use_local:
+            result = local_cache.get(key, count)
+            if result is not None:
+                return result
+            generation = local_cache.generation(key)
+        try:
+            with breaker.guard():
+                output = self.redis_client.get(key)
+            result = decode(output) if output is not None else None
+            if result is not None:
+                _redis_stats["hits"] += count
+                if use_local and not isinstance(result, NotModified):
+                    local_cache.put(key, result, generation,
+                                    size=size(result) if size else None)
                 return result
             else:
+                _redis_stats["misses"] += count
                 return None
         except redis.RedisError as error:
-            print(f"An error ocurred while retrieving data from Redis: {error}")
+            _report("An error ocurred while retrieving data from Redis", error)
+
+    def _publish_invalidation(self, *namespaces):
+        # Drop again once Redis is updated (a concurrent read may have refilled
+        # the local tier in between), then tell every other process
+        for namespace in namespaces:
+            local_cache.invalidate(namespace)
+        if not LOCAL_CACHE_ENABLED:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        for namespace in namespaces:
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, namespace)
+        pipe.execute()
 
     def delete_data(self, key):
+        local_cache.invalidate(_namespace(key))
         try:
-            output = self.redis_client.delete(key)
-            return output == 1
+            with breaker.guard():
+                output = self.redis_client.delete(key, *(_variant_key(key, encoding)
+                                                         for encoding in ENCODINGS))
+                self._publish_invalidation(_namespace(key))
+            return output > 0
         except redis.RedisError as error:
-            print(f"An error ocurred while deleting data from Redis: {error}")
+            _report("An error ocurred while deleting data from Redis", error)
+            _pending_invalidations.add(_namespace(key))
             return False
 
-    def delete_pattern(self, pattern):
+    def invalidate(self, *namespaces):
+        # Drop every cached key of the given namespaces without scanning the
+        # keyspace: read and delete the index sets atomically, then UNLINK
+        # the members (freed in the background by Redis) in one round trip
+        indexes = [self._index_key(namespace) for namespace in namespaces]
+        for namespace in namespaces:
+            local_cache.invalidate(namespace)
         try:
-            # Iterar sobre las claves que coinciden con el patrón
-            for key in self.redis_client.scan_iter(match=pattern):
-                self.delete_data(key)
+            with breaker.guard():
+                pipe = self.redis_client.pipeline(transaction=True)
+                for index in indexes:
+                    pipe.smembers(index)
+                pipe.delete(*indexes)
+                results = pipe.execute()
+                keys = set().union(*results[:-1])
+                if keys:
+                    self.redis_client.unlink(*keys)
+                self._publish_invalidation(*namespaces)
+            _pending_invalidations.difference_update(namespaces)
+            return len(keys)
         except redis.RedisError as error:
-            print(f"An error ocurred while deleting data from Redis: {error}")
\ No newline at end of file
+            _report("An error ocurred while deleting data from Redis", error)
+            _pending_invalidations.update(namespaces)
+            return 0
+
+    def _flush_invalidations(self):
+        # Retry invalidations that failed while Redis was unreachable; while
+        # the breaker is open this is rejected without a network call
+        if _pending_invalidations:
+            self.invalidate(*list(_pending_invalidations))
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""compression.py
+
+HTTP response compression negotiated with Accept-Encoding.
+
+Responses of at least RESPONSE_COMPRESS_MIN_BYTES are sent with the first
+encoding of RESPONSE_ENCODINGS the client accepts (brotli only when the
+brotli package is installed). Cached endpoints store each encoded variant
+next to the raw payload when the cache is filled (see cache_manager), so
+their compression runs once per fill; every other response is compressed
+by an after_request hook.
+"""
+
+import gzip
+from flask import request
+from modules.config import (RESPONSE_ENCODINGS, RESPONSE_COMPRESS_MIN_BYTES,
+                            RESPONSE_COMPRESS_LEVEL)
+from modules.metrics import timed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Content-Encoding -> compress function. gzip with mtime=0 gives the same
+# bytes for the same body
+ENCODERS = {
+    "gzip": lambda data: gzip.compress(data, RESPONSE_COMPRESS_LEVEL, mtime=0),
+}
+if brotli is not None:
+    ENCODERS["br"] = lambda data: brotli.compress(data, quality=RESPONSE_COMPRESS_LEVEL)
+
+# Encodings offered, in server preference order
+ENCODINGS = [name for name in RESPONSE_ENCODINGS if name in ENCODERS]
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html"}
+
+
+def negotiate():
+    """
+    Pick the encoding of the current response from its Accept-Encoding header.
+
+    Client quality values decide; ties go to the order of RESPONSE_ENCODINGS.
+
+    Returns:
+        str: Content-Encoding to use, None to send the body as is.
+    """
+    if not ENCODINGS:
+        return None
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def encode_variants(body):
+    """
+    Compress a body with every offered encoding.
+
+    Args:
+        body (bytes): Response body.
+
+    Returns:
+        dict: Encoding -> compressed bytes, or None for every encoding when
+        the body is smaller than RESPONSE_COMPRESS_MIN_BYTES (sent as is).
+    """
+    if len(body) < RESPONSE_COMPRESS_MIN_BYTES:
+        return dict.fromkeys(ENCODINGS)
+    return {name: ENCODERS[name](body) for name in ENCODINGS}
+
+
+def init_app(app):
+    """
+    Compress the responses of an app that are not already encoded.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    if not ENCODINGS:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or response.is_streamed or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add("Accept-Encoding")
+        if (response.content_length or 0) < RESPONSE_COMPRESS_MIN_BYTES:
+            return response
+        encoding = negotiate()
+        if encoding is None:
+            return response
+        with timed("serialize"):
+            response.set_data(ENCODERS[encoding](response.get_data()))
+        response.headers["Content-Encoding"] = encoding
+        return response
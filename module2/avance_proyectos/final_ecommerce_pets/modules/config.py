@@ -10,12 +10,70 @@ Constants:
     DB_HOST: Database host address.
     DB_PORT: Database port number.
     SCHEMA: Database schema name.
+    DB_URI: Full database URI, overrides the DB_* settings above (optional).
+    DB_POOL_SIZE: Persistent connections kept open in the pool.
+    DB_MAX_OVERFLOW: Extra connections allowed beyond the pool size.
+    DB_POOL_TIMEOUT: Seconds to wait for a free connection before failing.
+    DB_POOL_RECYCLE: Seconds after which a pooled connection is replaced.
+    DB_POOL_PRE_PING: Test connections on checkout to drop stale ones.
+    DB_STATEMENT_TIMEOUT: PostgreSQL statement timeout in milliseconds.
+    DB_APPLICATION_NAME: Name reported to PostgreSQL in pg_stat_activity.
+    SQL_STATEMENT_LIMIT: SQL statements a request may issue before it fails (0 disables).
+    SERVER_TIMING: Send a Server-Timing header with the per-phase request timings.
+    METRICS_DIR: Directory where each worker writes its metrics for /metrics to aggregate (unset keeps them per process).
+    METRICS_FLUSH_INTERVAL: Seconds between the metrics snapshots of a worker.
+    PROFILE_DIR: Directory where request profiles are written.
+    PROFILE_SAMPLE_RATE: Profile 1 in N requests at random (0 profiles only on request).
+    PROFILE_INTERVAL: Seconds between stack samples of a profiled request.
     ALLOWED_ROLES: List of valid user roles.
+    DEFAULT_PAGE_LIMIT: Page size for list endpoints when no limit is given.
+    MAX_PAGE_LIMIT: Largest page size a client may request.
+    STREAM_CHUNK_SIZE: Rows fetched and encoded per chunk of a streamed response.
     DEFAULT_ADMIN: Default administrator password.
+    REDIS_MAX_CONNECTIONS: Size of the process-wide Redis connection pool.
+    REDIS_SOCKET_TIMEOUT: Seconds to wait for a Redis reply.
+    REDIS_CONNECT_TIMEOUT: Seconds to wait for a Redis connection.
+    REDIS_HEALTH_CHECK_INTERVAL: Seconds idle before a pooled connection is checked.
+    REDIS_BREAKER_FAILURES: Consecutive failed or slow Redis calls that open the breaker.
+    REDIS_BREAKER_SLOW_CALL: Seconds after which a Redis call counts as slow.
+    REDIS_BREAKER_COOLDOWN: Seconds Redis is skipped before a probe call is let through.
+    LOCAL_CACHE_ENABLED: Keep small hot Redis values in process memory.
+    LOCAL_CACHE_SIZE: Maximum number of values kept in process memory.
+    LOCAL_CACHE_TTL: Seconds a value is served from process memory.
+    LOCAL_CACHE_MAX_BYTES: Largest value kept in process memory.
+    CACHE_INVALIDATION_CHANNEL: Redis pub/sub channel for invalidation messages.
+    SINGLE_FLIGHT_LOCK_TTL: Seconds a cache rebuild lock is held at most.
+    SINGLE_FLIGHT_WAIT: Seconds a request waits for another one to rebuild a key.
+    CACHE_HARD_TTL_FACTOR: Hard TTL of cached responses as a multiple of their soft TTL.
+    CACHE_EARLY_REFRESH_BETA: Eagerness of probabilistic early refresh (0 disables it).
+    CACHE_REFRESH_WORKERS: Background threads rebuilding stale cache entries.
+    CACHE_CODEC: Compression for cached responses (none, gzip or lz4).
+    CACHE_COMPRESS_MIN_BYTES: Smallest response that is compressed in Redis.
+    CACHE_COMPRESS_LEVEL: Compression level passed to the codec.
+    RESPONSE_ENCODINGS: Content-Encodings offered to clients, in order of preference.
+    RESPONSE_COMPRESS_MIN_BYTES: Smallest response body sent compressed.
+    RESPONSE_COMPRESS_LEVEL: gzip level and brotli quality of compressed responses.
     CACHE_TYPE: Flask-Caching backend type.
     CACHE_DEFAULT_TIMEOUT: Cache timeout in seconds.
     CERTS_DIR: Directory for SSL certificates.
     FILE_PATH: Directory for secret keys and tokens.
+    KEY_CHECK_INTERVAL: Seconds between checks for rotated key files.
+    JWT_ALGORITHM: Signing algorithm for new keys (RS256, ES256 or EdDSA).
+    JWT_CACHE_ENABLED: Cache verified token payloads in require_jwt.
+    JWT_CACHE_SIZE: Maximum number of verified tokens kept in the cache.
+    PASSWORD_HASH_ITERATIONS: PBKDF2-SHA256 iterations for password hashes.
+    PASSWORD_WORKERS: Processes hashing passwords per server worker (0 hashes on the request thread).
+    PASSWORD_QUEUE_LIMIT: Hash jobs allowed in flight per server worker before answering 503.
+    SERVER_BIND: Address the production server listens on.
+    SERVER_WORKERS: Pre-forked worker processes of the production server.
+    SERVER_THREADS: Request threads per worker process.
+    SERVER_MAX_REQUESTS: Requests after which a worker is recycled (0 disables).
+    SERVER_MAX_REQUESTS_JITTER: Random extra requests so workers do not recycle together.
+    SERVER_TIMEOUT: Seconds a silent worker is given before it is killed and restarted.
+    SERVER_GRACEFUL_TIMEOUT: Seconds workers get to finish requests on reload or shutdown.
+    SERVER_TLS: Serve HTTPS with the certificate from https_config.
+    SSL_CERT_FILE: Certificate file; a development certificate is generated if unset.
+    SSL_KEY_FILE: Private key file matching SSL_CERT_FILE.
 """
 
 import os
@@ -36,15 +94,75 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 SCHEMA = os.getenv("SCHEMA")
+DB_URI = os.getenv("DB_URI")
+
+# Connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "30000"))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "e_commerce_pets")
+
+# Statement budget per request, meant for tests to catch N+1 queries
+SQL_STATEMENT_LIMIT = int(os.getenv("SQL_STATEMENT_LIMIT", "0"))
+
+# Per-phase timings in a Server-Timing response header (debugging)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
 
 # Redis
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = os.getenv("REDIS_PORT")
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+# Redis circuit breaker
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", "5"))
+REDIS_BREAKER_SLOW_CALL = float(os.getenv("REDIS_BREAKER_SLOW_CALL", "0.25"))
+REDIS_BREAKER_COOLDOWN = float(os.getenv("REDIS_BREAKER_COOLDOWN", "10"))
+
+# In-process cache tier in front of Redis
+LOCAL_CACHE_ENABLED = os.getenv("LOCAL_CACHE_ENABLED", "true").lower() == "true"
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", "256"))
+LOCAL_CACHE_TTL = float(os.getenv("LOCAL_CACHE_TTL", "5"))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_BYTES", "262144"))
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+
+# Cached response compression
+CACHE_CODEC = os.getenv("CACHE_CODEC", "gzip").lower()
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", "1"))
+
+# HTTP response compression, negotiated with Accept-Encoding ("br" needs
+# the brotli package and is skipped without it)
+RESPONSE_ENCODINGS = [name.strip() for name in os.getenv("RESPONSE_ENCODINGS", "br,gzip").split(",")
+                      if name.strip()]
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_COMPRESS_LEVEL = int(os.getenv("RESPONSE_COMPRESS_LEVEL", "6"))
+
+# Cache miss coalescing
+SINGLE_FLIGHT_LOCK_TTL = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "10"))
+SINGLE_FLIGHT_WAIT = float(os.getenv("SINGLE_FLIGHT_WAIT", "5"))
+
+# Stale-while-revalidate
+CACHE_HARD_TTL_FACTOR = float(os.getenv("CACHE_HARD_TTL_FACTOR", "2"))
+CACHE_EARLY_REFRESH_BETA = float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1"))
+CACHE_REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "2"))
 
 # Roles
 ALLOWED_ROLES = ["client", "administrator"]
 
+# Pagination
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", "100"))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "1000"))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
 # SCHEMA and ORM Base
 _metadata = MetaData(schema=None if TESTING else SCHEMA)
 Base = declarative_base(metadata=_metadata)
@@ -56,5 +174,35 @@ DEFAULT_ADMIN = os.getenv("DEFAULT_ADMIN")
 ROOT_DIR = os.getcwd()
 CERTS_DIR = f"{ROOT_DIR}/certs"
 
+# Sampling profiler for single requests
+PROFILE_DIR = os.getenv("PROFILE_DIR", f"{ROOT_DIR}/profiles")
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+
 # KEYs
 FILE_PATH = os.getenv("FILE_PATH")
+KEY_CHECK_INTERVAL = float(os.getenv("KEY_CHECK_INTERVAL", "5"))
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "RS256")
+
+# Verified token cache
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "true").lower() == "true"
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+
+# Production server (gunicorn.conf.py)
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5001")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 2)))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "4"))
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000"))
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "30"))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_TLS = os.getenv("SERVER_TLS", "true").lower() == "true"
+SSL_CERT_FILE = os.getenv("SSL_CERT_FILE")
+SSL_KEY_FILE = os.getenv("SSL_KEY_FILE")
+
+# Password hashing. Every server worker forks its own hashing pool, so the
+# default splits the CPUs between workers instead of giving each all of them
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS",
+                                 str(max(1, (os.cpu_count() or 2) // SERVER_WORKERS))))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
@@ -4,14 +4,31 @@ Database manager module for handling all database operations using SQLAlchemy OR
 Provides session management, CRUD operations, and query building functionality.
 """
 
-from sqlalchemy import (create_engine, text)
+import threading
+from sqlalchemy import (create_engine, text, insert, event, inspect)
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.exc import IntegrityError
 from modules.config import (DB_HOST, DB_USERNAME, DB_PORT,
                             DB_PASSWORD, DB_NAME, SCHEMA,
-                            Base)
-from sqlalchemy.orm import (sessionmaker, scoped_session, joinedload)
+                            DB_POOL_SIZE, DB_MAX_OVERFLOW,
+                            DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+                            DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT,
+                            DB_APPLICATION_NAME, Base)
+from sqlalchemy.orm import (sessionmaker, scoped_session, joinedload,
+                            selectinload, raiseload)
 from modules.models import _models
 
+# Values per IN (...) list when loading related records
+RELATED_CHUNK_SIZE = 5000
+
+# Relationship loading strategies accepted by get_query
+LOADING_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "raise": raiseload
+}
+
 
 
 class DBManager:
@@ -42,7 +59,7 @@ class DBManager:
             self.db_uri = db_uri
         else:
             self.db_uri = f'postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
-        self.engine = create_engine(self.db_uri, echo=False)
+        self.engine = create_engine(self.db_uri, echo=False, **self._engine_options())
         self.schema = SCHEMA
         self.base = Base
         self._sessionmaker = sessionmaker(bind=self.engine)
@@ -51,8 +68,86 @@ class DBManager:
         self.session = self._session()
         self._models = _models
         self._model_name = model_name
+        self._statements = threading.local()
+        event.listen(self.engine, "before_cursor_execute", self._count_statement)
         if self.engine.dialect.name == 'postgresql':
             self._ensure_schema()
+        elif self.engine.dialect.name == 'sqlite':
+            self._enable_sqlite_savepoints()
+
+    def _engine_options(self):
+        """
+        Build the connection pool options for the configured database.
+
+        PostgreSQL gets a sized QueuePool with pre-ping, recycling, a
+        per-connection statement timeout and application name. Other
+        dialects (SQLite in tests) keep the SQLAlchemy defaults.
+
+        Returns:
+            dict: Keyword arguments for create_engine.
+        """
+        if make_url(self.db_uri).get_backend_name() != 'postgresql':
+            return {}
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+            "connect_args": {
+                "application_name": DB_APPLICATION_NAME,
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+            }
+        }
+
+    def _enable_sqlite_savepoints(self):
+        """
+        Let SQLAlchemy control SQLite transactions.
+
+        The pysqlite driver only emits BEGIN before DML, so a SAVEPOINT can
+        open (and RELEASE commit) a transaction on its own. Emitting BEGIN
+        explicitly keeps savepoints nested inside the session transaction.
+        """
+        @event.listens_for(self.engine, "connect")
+        def _disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(self.engine, "begin")
+        def _emit_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+    def _count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        """Count a statement sent to the database by the current thread."""
+        self._statements.count = getattr(self._statements, "count", 0) + 1
+
+    def reset_statement_count(self):
+        """Start counting SQL statements of the current thread from zero."""
+        self._statements.count = 0
+
+    def statement_count(self):
+        """
+        Number of SQL statements the current thread issued since the last reset.
+
+        Returns:
+            int: Statement count.
+        """
+        return getattr(self._statements, "count", 0)
+
+    def pool_status(self):
+        """
+        Report the current state of the connection pool.
+
+        Returns:
+            dict: Pool class, configured size, checked-in, checked-out
+                  and overflow connection counts.
+        """
+        pool = self.engine.pool
+        stats = {"pool": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            counter = getattr(pool, name, None)
+            stats[name] = counter() if callable(counter) else None
+        stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+        return stats
 
     def _get_model_name(self, model_name):
         """
@@ -122,9 +217,19 @@ class DBManager:
         self.base.metadata.drop_all(self.engine)
 
     def get_query(self, session, model_class, id=None, name=None,
-                  email=None, relationships=[]):
+                  email=None, relationships=None, after_id=None, limit=None,
+                  fields=None, yield_per=None):
         """
         Build and execute a query with optional filters and relationships.
+
+        List queries (no id) can be paginated with a keyset cursor and
+        projected to a subset of columns. A projection selects only the
+        requested columns and returns Row tuples instead of model objects,
+        so relationships are not loaded.
+
+        Model objects only load the relationships listed in
+        ``relationships``; any other relationship raises on access instead
+        of silently issuing one lazy query per object.
         
         Args:
             session: SQLAlchemy session instance.
@@ -132,33 +237,26 @@ class DBManager:
             id (int, optional): Filter by ID.
             name (str, optional): Filter by name.
             email (str, optional): Filter by email.
-            relationships (list, optional): List of relationships to eager load.
+            relationships (dict, optional): Relationship path -> loading
+                strategy ("selectin", "joined" or "raise"), e.g.
+                ``{"carts": "selectin", "carts.receipt": "joined"}``.
+            after_id (int, optional): Return only records with an ID greater than this.
+            limit (int, optional): Maximum number of records to return.
+            fields (list, optional): Column names to select.
+            yield_per (int, optional): Stream results in batches of this size.
             
         Returns:
-            list: List of matching records.
+            list: List of matching records, or an iterator when streaming.
             
         Raises:
-            ValueError: If ID format is invalid.
+            ValueError: If ID format or a requested field is invalid.
             Exception: If query execution fails.
         """
         try:
-            _query = session.query(model_class)
-            if relationships:
-                for relationship in relationships:
-                    _query = _query.options(joinedload(relationship))
-            query = _query
-            if id:
-                try:
-                    id = int(id)
-                except ValueError:
-                    raise ValueError(f"Invalid ID format: {id}")
-                query = query.filter_by(id=id)
-            elif name:
-                query = query.filter_by(name=name)
-            elif email:
-                query = query.filter_by(email=email)
-                      
-            return self.get(query)
+            query = self.build_query(session, model_class, id=id, name=name,
+                                     email=email, relationships=relationships,
+                                     after_id=after_id, limit=limit, fields=fields)
+            return self.get(query, yield_per=yield_per)
         except IntegrityError as e:
             session.rollback()
             return None
@@ -167,24 +265,297 @@ class DBManager:
         except Exception as e:
             raise Exception("Failed to fetch records") from e
 
-    def get(self, query):
+    def build_query(self, session, model_class, id=None, name=None,
+                    email=None, relationships=None, after_id=None, limit=None,
+                    fields=None):
+        """
+        Build the query run by get_query without executing it.
+
+        Args:
+            session: SQLAlchemy session instance.
+            model_class: The model class to query.
+            id (int, optional): Filter by ID.
+            name (str, optional): Filter by name.
+            email (str, optional): Filter by email.
+            relationships (dict, optional): Relationship path -> loading strategy.
+            after_id (int, optional): Return only records with an ID greater than this.
+            limit (int, optional): Maximum number of records to return.
+            fields (list, optional): Column names to select.
+
+        Returns:
+            Query: The unexecuted query.
+
+        Raises:
+            ValueError: If ID format or a requested field is invalid.
+        """
+        if fields:
+            query = session.query(*self._get_columns(model_class, fields))
+        else:
+            query = session.query(model_class).options(
+                *self._loader_options(model_class, relationships or {}))
+        if id:
+            try:
+                id = int(id)
+            except ValueError:
+                raise ValueError(f"Invalid ID format: {id}")
+            query = query.filter(model_class.id == id)
+        elif name:
+            query = query.filter(model_class.name == name)
+        elif email:
+            query = query.filter(model_class.email == email)
+
+        if not id:
+            query = self.paginate(query, model_class, after_id=after_id,
+                                  limit=limit)
+        return query
+
+    def _loader_options(self, model_class, relationships):
+        """
+        Build the loader options for a relationship loading policy.
+
+        Every segment of a dotted path uses the strategy declared for that
+        prefix, falling back to selectinload for collections and joinedload
+        for many-to-one. Relationships not declared raise when they would
+        emit SQL.
+
+        Args:
+            model_class: The model class being queried.
+            relationships (dict): Relationship path -> strategy name.
+
+        Returns:
+            list: Loader options for Query.options().
+
+        Raises:
+            ValueError: If a relationship or strategy is unknown.
+        """
+        options = [raiseload("*", sql_only=True)]
+        for path in relationships:
+            model, option, prefix = model_class, None, []
+            for name in path.split("."):
+                prefix.append(name)
+                attribute = getattr(model, name, None)
+                if attribute is None or not hasattr(attribute.property, "mapper"):
+                    raise ValueError(f"Unknown relationship: {path}")
+                declared = relationships.get(".".join(prefix))
+                if declared is None:
+                    declared = "selectin" if attribute.property.uselist else "joined"
+                if declared not in LOADING_STRATEGIES:
+                    raise ValueError(f"Unknown loading strategy: {declared}")
+                loader = LOADING_STRATEGIES[declared]
+                if option is None:
+                    option = loader(attribute)
+                else:
+                    option = getattr(option, loader.__name__)(attribute)
+                model = attribute.property.mapper.class_
+            if declared != "raise":
+                option = option.raiseload("*", sql_only=True)
+            options.append(option)
+        return options
+
+    def paginate(self, query, model_class, after_id=None, limit=None):
+        """
+        Apply keyset pagination ordered by primary key.
+
+        Args:
+            query: SQLAlchemy query object.
+            model_class: The model class being queried.
+            after_id (int, optional): Cursor, the last ID of the previous page.
+            limit (int, optional): Maximum number of records to return.
+
+        Returns:
+            Query: The query restricted to the requested page.
+        """
+        if after_id is not None:
+            query = query.filter(model_class.id > after_id)
+        query = query.order_by(model_class.id)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    def _get_columns(self, model_class, fields):
+        """
+        Resolve field names to model columns for a projection.
+
+        The primary key is always selected so the result can be paged.
+
+        Args:
+            model_class: The model class being queried.
+            fields (list): Requested column names.
+
+        Returns:
+            list: Column attributes to select.
+
+        Raises:
+            ValueError: If a field is not a column of the model.
+        """
+        column_names = model_class.__table__.columns.keys()
+        unknown = [field for field in fields if field not in column_names]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        names = dict.fromkeys(["id", *fields])
+        return [getattr(model_class, field) for field in names]
+
+    def get(self, query, yield_per=None):
         """
         Execute a query and return all results.
+
+        With ``yield_per`` the rows are streamed instead: PostgreSQL uses a
+        server-side cursor and only one batch is held in memory at a time.
         
         Args:
             query: SQLAlchemy query object.
+            yield_per (int, optional): Rows fetched per batch when streaming.
             
         Returns:
-            list: All records matching the query.
+            list: All records matching the query, or an iterator of
+            records when streaming.
             
         Raises:
             Exception: If query execution fails.
         """
+        if yield_per:
+            return self._stream(query, yield_per)
         try:
             return query.all()
         except Exception as e:
             raise Exception("Failed to fetch records") from e
+
+    def _stream(self, query, yield_per):
+        """
+        Iterate over a query in batches of ``yield_per`` rows.
+
+        Args:
+            query: SQLAlchemy query object.
+            yield_per (int): Rows fetched per batch.
+
+        Yields:
+            Records matching the query.
+
+        Raises:
+            Exception: If query execution fails.
+        """
+        try:
+            yield from query.yield_per(yield_per)
+        except Exception as e:
+            raise Exception("Failed to fetch records") from e
         
+    def get_related(self, session, model_class, fields, key, values):
+        """
+        Select columns of the records whose ``key`` column is in ``values``.
+
+        Used to load a relationship for a whole page of parents with one
+        column-only query (split into chunks of RELATED_CHUNK_SIZE values)
+        instead of joining ORM objects.
+
+        Args:
+            session: SQLAlchemy session instance.
+            model_class: The related model class.
+            fields (list): Column names to select.
+            key (str): Column matched against the values.
+            values (list): Values of the parent records.
+
+        Returns:
+            list: Row tuples ordered by primary key within each chunk.
+
+        Raises:
+            Exception: If query execution fails.
+        """
+        rows = []
+        for start in range(0, len(values), RELATED_CHUNK_SIZE):
+            chunk = values[start:start + RELATED_CHUNK_SIZE]
+            rows.extend(self.get(self.related_query(session, model_class,
+                                                    fields, key, chunk)))
+        return rows
+
+    def related_query(self, session, model_class, fields, key, values):
+        """
+        Build one chunk query of get_related without executing it.
+
+        Args:
+            session: SQLAlchemy session instance.
+            model_class: The related model class.
+            fields (list): Column names to select.
+            key (str): Column matched against the values.
+            values (list): Values of the parent records.
+
+        Returns:
+            Query: The unexecuted query.
+        """
+        columns = [getattr(model_class, field) for field in fields]
+        return (session.query(*columns)
+                .filter(getattr(model_class, key).in_(values))
+                .order_by(model_class.id))
+
+    def create_indexes(self):
+        """
+        Create the indexes declared in the models that the database lacks.
+
+        create_tables skips tables that already exist, so indexes added to
+        the models later are created here. On PostgreSQL they are built
+        CONCURRENTLY to keep the tables writable.
+
+        Returns:
+            list: Names of the indexes created.
+        """
+        inspector = inspect(self.engine)
+        postgresql = self.engine.dialect.name == 'postgresql'
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        options = {"isolation_level": "AUTOCOMMIT"} if postgresql else {}
+        created = []
+        with self.engine.connect().execution_options(**options) as conn, conn.begin():
+            for table in self.base.metadata.sorted_tables:
+                if not inspector.has_table(table.name, schema=table.schema):
+                    continue
+                existing = {index["name"] for index in
+                            inspector.get_indexes(table.name, schema=table.schema)}
+                for index in table.indexes:
+                    if index.name in existing:
+                        continue
+                    ddl = str(CreateIndex(index).compile(dialect=self.engine.dialect))
+                    if postgresql:
+                        ddl = ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+                    conn.exec_driver_sql(ddl)
+                    created.append(index.name)
+        return created
+
+    def full_scans(self, session, query):
+        """
+        EXPLAIN a query and report the table scans that use no index.
+
+        On PostgreSQL sequential scans are disabled for the current
+        transaction first, so a Seq Scan left in the plan means no index
+        can serve the query; index scans without an index condition are
+        reported too. On SQLite every SCAN step of the query plan is
+        reported.
+
+        Args:
+            session: SQLAlchemy session instance.
+            query: SQLAlchemy query object.
+
+        Returns:
+            list: One description per full scan, empty if every table is
+            searched through an index.
+        """
+        statement = str(query.statement.compile(dialect=self.engine.dialect,
+                                                compile_kwargs={"literal_binds": True}))
+        if self.engine.dialect.name != 'postgresql':
+            plan = session.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+            return [row[-1] for row in plan if row[-1].startswith("SCAN")]
+
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+        scans = []
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", []))
+            if node["Node Type"] == "Seq Scan":
+                scans.append(f"Seq Scan on {node['Relation Name']}")
+            elif node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node:
+                scans.append(f"Full index scan on {node['Relation Name']} "
+                             f"using {node['Index Name']}")
+        return scans
+
     def get_by_id(self, session, id):
         """
         Get a record by its ID.
@@ -271,6 +642,77 @@ class DBManager:
             session.rollback()
             raise Exception("Failed to insert record") from e
 
+    def bulk_insert(self, session, model_class, rows):
+        """
+        Insert many records in a single transaction.
+
+        Uses one multi-row ``INSERT ... RETURNING`` statement and commits
+        once. The insert is all-or-nothing: if any row violates a
+        constraint nothing is stored, and each offending row is reported.
+
+        Args:
+            session: SQLAlchemy session instance.
+            model_class: The model class to insert into.
+            rows (list): List of dictionaries with column values.
+
+        Returns:
+            tuple: (list of inserted rows, list of conflicts). On success the
+                   conflicts list is empty; on failure the rows are None and
+                   each conflict is a dict with the row ``index`` and ``error``.
+
+        Raises:
+            ValueError: If a row is not a dict or has unknown fields.
+            Exception: If insertion fails due to non-integrity errors.
+        """
+        if not rows:
+            return [], []
+        columns = model_class.__table__.columns
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"Row {index} is not an object")
+            unknown = [field for field in row if field not in columns]
+            if unknown:
+                raise ValueError(f"Row {index} has unknown field(s): {', '.join(unknown)}")
+        statement = insert(model_class).returning(*columns, sort_by_parameter_order=True)
+        try:
+            records = session.execute(statement, rows).all()
+            session.commit()
+            return records, []
+        except IntegrityError:
+            session.rollback()
+            return None, self._find_conflicts(session, model_class, rows)
+        except Exception as e:
+            session.rollback()
+            raise Exception("Failed to insert records") from e
+
+    def _find_conflicts(self, session, model_class, rows):
+        """
+        Identify which rows of a failed bulk insert violate constraints.
+
+        Each row is inserted inside its own savepoint so later rows are
+        also checked against earlier rows of the same batch. Everything is
+        rolled back afterwards.
+
+        Args:
+            session: SQLAlchemy session instance.
+            model_class: The model class to insert into.
+            rows (list): List of dictionaries with column values.
+
+        Returns:
+            list: Conflicts as dicts with the row ``index`` and ``error``.
+        """
+        conflicts = []
+        try:
+            for index, row in enumerate(rows):
+                try:
+                    with session.begin_nested():
+                        session.execute(insert(model_class), [row])
+                except IntegrityError as e:
+                    conflicts.append({"index": index, "error": str(e.orig)})
+        finally:
+            session.rollback()
+        return conflicts
+
     def update(self, session, new_record):
         """
         Update an existing record in the database.
@@ -2,21 +2,27 @@
 https_config.py
 
 Handles SSL certificate generation and configuration for running the Flask app with HTTPS.
-Creates a development certificate if it does not exist and sets the SSL context for the server.
+Uses SSL_CERT_FILE/SSL_KEY_FILE when set; otherwise creates a development certificate
+if it does not exist. Sets the SSL context for the dev server and gunicorn.
 """
 
 from werkzeug.serving import make_ssl_devcert
-from modules.config import CERTS_DIR
+from modules.config import CERTS_DIR, SSL_CERT_FILE, SSL_KEY_FILE
 import os
 
-# Ensure the certificates directory exists
-os.makedirs(CERTS_DIR, exist_ok=True)
+if SSL_CERT_FILE and SSL_KEY_FILE:
+    # Real certificate configured for production
+    ssl_context = (SSL_CERT_FILE, SSL_KEY_FILE)
+else:
+    # Ensure the certificates directory exists
+    os.makedirs(CERTS_DIR, exist_ok=True)
 
-# Path for the development certificate (without extension)
-CERT_FILE = os.path.join(CERTS_DIR, "dev")
+    # Path for the development certificate (without extension)
+    CERT_FILE = os.path.join(CERTS_DIR, "dev")
 
-# Generate a self-signed development certificate for localhost if not present
-make_ssl_devcert(CERT_FILE, host='localhost')
+    # Generate a self-signed development certificate for localhost if not present
+    if not os.path.exists(f"{CERT_FILE}.crt"):
+        make_ssl_devcert(CERT_FILE, host='localhost')
 
-# SSL context tuple (certificate file, key file) for Flask app
-ssl_context = (os.path.join(CERTS_DIR, "dev.crt"), os.path.join(CERTS_DIR, "dev.key"))
\ No newline at end of file
+    # SSL context tuple (certificate file, key file) for Flask app
+    ssl_context = (os.path.join(CERTS_DIR, "dev.crt"), os.path.join(CERTS_DIR, "dev.key"))
\ No newline at end of file
@@ -1,22 +1,35 @@
 """jwt_manager.py
 
 JWT (JSON Web Token) management module for authentication and authorization.
-Provides token encoding/decoding using RS256 algorithm and role-based access control.
+Provides token encoding/decoding using RS256, ES256 or EdDSA and role-based
+access control. Signing keys are parsed once per process and kept in a shared
+key store that reloads them when the PEM files change on disk; tokens carry a
+``kid`` header so several keys can be valid during a migration. Verified tokens
+are kept in a bounded LRU cache so repeated requests skip the signature verify.
 """
 
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 import jwt
 from flask import request, jsonify
 import logging
 from datetime import datetime, timedelta
-from modules.config import FILE_PATH
+from cryptography.hazmat.primitives import serialization
+from modules.config import (FILE_PATH, KEY_CHECK_INTERVAL,
+                            JWT_CACHE_ENABLED, JWT_CACHE_SIZE)
+from modules.secret_keys import key_algorithm, key_id
+from modules.metrics import timed
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 def read_keys():
     """
-    Read RSA key pair from PEM files.
+    Read the active signing key pair from PEM files.
     
     Returns:
         tuple: (private_key, public_key) as bytes.
@@ -30,32 +43,199 @@ def read_keys():
     return private_key,public_key
 
 
+class KeyStore:
+    """
+    Process-wide store of the parsed signing keys.
+
+    Keys are read and parsed once and reused for every sign/verify call.
+    At most every ``check_interval`` seconds the PEM files are stat'ed and
+    reloaded if their modification time changed, so rotated keys are picked
+    up without a restart.
+
+    The active pair (private.pem/public.pem) signs new tokens. Archived
+    ``public.<kid>.pem`` files are kept as verification-only keys so tokens
+    signed before a rotation or algorithm migration remain valid. Each key
+    is identified by its ``kid`` and its algorithm is inferred from the key
+    type (RS256, ES256 or EdDSA).
+
+    Attributes:
+        path (str): Directory containing the PEM files.
+        check_interval (float): Seconds between modification time checks.
+    """
+
+    def __init__(self, path=FILE_PATH, check_interval=KEY_CHECK_INTERVAL):
+        """
+        Initialize an empty key store; keys are loaded on first use.
+
+        Args:
+            path (str): Directory containing the PEM files.
+            check_interval (float): Seconds between modification time checks.
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._private_key = None
+        self._public_key = None
+        self._algorithm = None
+        self._kid = None
+        self._verification_keys = {}
+        self._mtimes = None
+        self._checked_at = 0.0
+        self._reload_hooks = []
+
+    def _key_files(self):
+        """Return the key directory and the private and public PEM file paths."""
+        return self.path, f'{self.path}/private.pem', f'{self.path}/public.pem'
+
+    def _load(self, mtimes):
+        """
+        Read and parse the active key pair and any archived public keys.
+
+        Args:
+            mtimes (tuple): Modification times of the files being loaded.
+        """
+        private_pem, public_pem = read_keys()
+        self._private_key = serialization.load_pem_private_key(private_pem, password=None)
+        self._public_key = serialization.load_pem_public_key(public_pem)
+        self._algorithm = key_algorithm(self._private_key)
+        self._kid = key_id(self._public_key)
+        verification_keys = {self._kid: (self._public_key, self._algorithm)}
+        for file_name in os.listdir(self.path):
+            if file_name.startswith('public.') and file_name != 'public.pem' \
+                    and file_name.endswith('.pem'):
+                with open(f'{self.path}/{file_name}', 'rb') as f:
+                    public_key = serialization.load_pem_public_key(f.read())
+                verification_keys[key_id(public_key)] = (public_key, key_algorithm(public_key))
+        self._verification_keys = verification_keys
+        self._mtimes = mtimes
+        logger.info(f"Signing key {self._kid} ({self._algorithm}) loaded, "
+                    f"{len(verification_keys)} verification key(s)")
+        for hook in self._reload_hooks:
+            hook()
+
+    def refresh(self, force=False):
+        """
+        Reload the keys if the files changed since they were last read.
+
+        Args:
+            force (bool): Check the files even if the interval has not elapsed.
+        """
+        now = time.monotonic()
+        if not force and self._mtimes and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtimes = tuple(os.stat(file).st_mtime_ns for file in self._key_files())
+            if mtimes != self._mtimes:
+                self._load(mtimes)
+
+    def on_reload(self, hook):
+        """
+        Register a callback invoked after the keys are (re)loaded.
+
+        Args:
+            hook (callable): Function called with no arguments.
+        """
+        self._reload_hooks.append(hook)
+
+    def verification_key(self, kid=None):
+        """
+        Get the public key and algorithm for a token's ``kid`` header.
+
+        Args:
+            kid (str, optional): Key ID; tokens without one use the active key.
+
+        Returns:
+            tuple: (public_key, algorithm), or None if the kid is unknown.
+        """
+        self.refresh()
+        if kid is None:
+            return self._public_key, self._algorithm
+        return self._verification_keys.get(kid)
+
+    @property
+    def private_key(self):
+        """Parsed private key used to sign tokens."""
+        self.refresh()
+        return self._private_key
+
+    @property
+    def public_key(self):
+        """Parsed public key of the active signing key."""
+        self.refresh()
+        return self._public_key
+
+    @property
+    def algorithm(self):
+        """str: JWT algorithm of the active signing key."""
+        self.refresh()
+        return self._algorithm
+
+    @property
+    def kid(self):
+        """str: Key ID of the active signing key."""
+        self.refresh()
+        return self._kid
+
+
+key_store = KeyStore()
+
+
 class JWT_Manager:
     """
     JWT Manager class for token operations.
     
-    Handles encoding and decoding of JWT tokens using RS256 (asymmetric)
-    or HS256 (symmetric) algorithms.
+    Handles encoding and decoding of JWT tokens using the key store's
+    asymmetric algorithm (RS256, ES256 or EdDSA) or HS256 (symmetric).
     
     Attributes:
-        private_key (bytes): RSA private key for signing tokens.
-        public_key (bytes): RSA public key for verifying tokens.
+        private_key: Parsed private key for signing tokens.
+        public_key: Parsed public key for verifying tokens.
         secret (str, optional): Secret key for HS256 algorithm.
-        algorithm (str): JWT algorithm (RS256 or HS256).
+        algorithm (str): JWT algorithm (from the signing key, or HS256).
     """
     
-    def __init__(self, secret=None, algorithm="RS256"):
+    def __init__(self, secret=None, algorithm=None):
         """
         Initialize JWT Manager.
         
         Args:
             secret (str, optional): Secret key for HS256. If provided, uses HS256.
-            algorithm (str): Default algorithm (RS256 for asymmetric).
+            algorithm (str, optional): Override the algorithm inferred from the
+                                       signing key.
         """
-        self.private_key = read_keys()[0]
-        self.public_key = read_keys()[1]
         self.secret = secret
-        self.algorithm = algorithm if self.secret is None else "HS256"
+        self._algorithm = algorithm if self.secret is None else "HS256"
+
+    @property
+    def algorithm(self):
+        """str: Algorithm used to sign tokens."""
+        return self._algorithm or key_store.algorithm
+
+    @property
+    def private_key(self):
+        """Shared private key from the key store."""
+        return key_store.private_key
+
+    @property
+    def public_key(self):
+        """Shared public key from the key store."""
+        return key_store.public_key
+
+    def _sign(self, payload):
+        """
+        Sign a payload with the secret or the active key store key.
+
+        Args:
+            payload (dict): Claims to sign.
+
+        Returns:
+            str: Encoded JWT token.
+        """
+        if self.secret:
+            return jwt.encode(payload, self.secret, algorithm=self.algorithm)
+        return jwt.encode(payload, self.private_key, algorithm=self.algorithm,
+                          headers={"kid": key_store.kid})
 
     def encode(self, data, expires_in_minutes: int = 15):
         """
@@ -73,11 +253,7 @@ class JWT_Manager:
             payload['exp'] = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
             payload['iat'] = datetime.utcnow()
             payload['type'] = 'access' # Token type identifier
-            if self.secret:
-                encoded = jwt.encode(payload, self.secret, algorithm=self.algorithm)
-                return encoded
-            encoded = jwt.encode(payload, self.private_key, algorithm=self.algorithm)
-            return encoded
+            return self._sign(payload)
         except Exception as e:
             logger.warning(f"Encode token error: {e}")
             return None
@@ -91,11 +267,7 @@ class JWT_Manager:
                 'iat': datetime.utcnow(),
                 'type': 'refresh' # Token type identifier
             }
-            if self.secret:
-                encoded = jwt.encode(payload, self.secret, algorithm=self.algorithm)
-                return encoded
-            encoded = jwt.encode(payload, self.private_key, algorithm=self.algorithm)
-            return encoded
+            return self._sign(payload)
         except Exception as e:
             logger.warning(f"Encode refresh token error: {e}")
         return None
@@ -114,13 +286,179 @@ class JWT_Manager:
             if self.secret:
                 decoded = jwt.decode(token, self.secret, algorithms=[self.algorithm])
                 return decoded
-            decoded = jwt.decode(token, self.public_key, algorithms=[self.algorithm])
-            return decoded
+            return decode_signed(token)
         except Exception as e:
             logger.warning(f"Decode token error: {e}")
             return None
 
 
+def decode_signed(token):
+    """
+    Verify a token against the key named by its ``kid`` header.
+
+    The algorithm is taken from the key, never from the token header.
+
+    Args:
+        token (str): Encoded JWT.
+
+    Returns:
+        dict: Verified payload.
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired.
+        jwt.InvalidTokenError: If the token is invalid or its key is unknown.
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    verification_key = key_store.verification_key(kid)
+    if verification_key is None:
+        raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+    public_key, algorithm = verification_key
+    return jwt.decode(token, public_key, algorithms=[algorithm])
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified token payloads.
+
+    Entries are keyed by the SHA-256 digest of the token and kept until
+    the token's ``exp`` claim, so a cached payload is never served for an
+    expired token. The cache is cleared whenever the signing keys reload.
+
+    Attributes:
+        maxsize (int): Maximum number of cached tokens.
+        enabled (bool): Whether lookups and stores are performed.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that required a verify.
+    """
+
+    def __init__(self, maxsize=JWT_CACHE_SIZE, enabled=JWT_CACHE_ENABLED):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of cached tokens.
+            enabled (bool): Whether the cache is active.
+        """
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token):
+        """Return the cache key for a token."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        """
+        Look up the verified payload of a token.
+
+        Args:
+            token (str): Encoded JWT.
+
+        Returns:
+            dict: Cached payload, or None on a miss or if the token expired.
+        """
+        if not self.enabled:
+            return None
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token, payload):
+        """
+        Store the payload of a freshly verified token.
+
+        Tokens without an ``exp`` claim are not cached.
+
+        Args:
+            token (str): Encoded JWT.
+            payload (dict): Verified payload.
+        """
+        if not self.enabled or 'exp' not in payload:
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (payload['exp'], payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached token."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Report cache counters.
+
+        Returns:
+            dict: enabled flag, size, hits, misses and hit ratio.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+
+token_cache = VerifiedTokenCache()
+key_store.on_reload(token_cache.clear)
+
+
+def verify_token(token):
+    """
+    Verify a signed token, using the verified-token cache when possible.
+
+    Args:
+        token (str): Encoded JWT.
+
+    Returns:
+        dict: Verified payload.
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired.
+        jwt.InvalidTokenError: If the token is invalid.
+    """
+    key_store.refresh()
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_signed(token)
+        token_cache.put(token, payload)
+    return payload
+
+
+_jwt_manager = None
+
+
+def get_jwt_manager():
+    """
+    Get the shared key store backed JWT_Manager for this process.
+
+    Returns:
+        JWT_Manager: Process-wide manager backed by the key store.
+    """
+    global _jwt_manager
+    if _jwt_manager is None:
+        _jwt_manager = JWT_Manager()
+    return _jwt_manager
+
+
 def require_jwt(required_roles=None):
     """
     Usage:
@@ -132,14 +470,14 @@ def require_jwt(required_roles=None):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             token = request.headers.get('Authorization', '').replace('Bearer ', '')
-            PUBLIC_KEY = read_keys()[1]
             
             if not token:
                 logger.warning("No token provided")
                 return jsonify({"error": "No token provided"}), 401
             
             try:
-                payload = jwt.decode(token, PUBLIC_KEY, algorithms=["RS256"])
+                with timed("auth"):
+                    payload = verify_token(token)
                 user_role = payload.get('role')
                 
                 # Check role if required
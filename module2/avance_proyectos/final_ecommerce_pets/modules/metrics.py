@@ -0,0 +1,510 @@
+"""metrics.py
+
+Per-request latency and SQL instrumentation.
+
+Every request records its wall time and the time spent in auth verify,
+cache get/set, SQL (statement count and time, from SQLAlchemy engine
+events) and serialization. A phase does not include the SQL it triggers
+(nested relationship loads while serializing count as SQL), so the phases
+add up to less than the wall time; the rest is routing and framework work.
+
+Samples feed per-endpoint histograms rendered in the Prometheus text format.
+With SERVER_TIMING on, each response also carries a Server-Timing header.
+
+Each process records into its own registry. With METRICS_DIR set (the
+production server sets it for its workers) every process also writes a
+snapshot of its registry and gauges there every METRICS_FLUSH_INTERVAL
+seconds, and a scrape answered by any worker sums the counters and
+histograms of all of them. Snapshots of workers that exited are folded
+into an archive, so counters do not drop when gunicorn recycles workers.
+Gauges (cache and pool stats) are reported per worker with a ``worker``
+label.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import request
+from sqlalchemy import event
+from modules.config import SERVER_TIMING, METRICS_DIR, METRICS_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+PHASES = ("auth", "cache_get", "cache_set", "sql", "serialize")
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_current = threading.local()
+
+# Snapshots not rewritten for this long belong to workers that exited
+STALE_AFTER = max(10 * METRICS_FLUSH_INTERVAL, 30)
+ARCHIVE_FILE = "archive.json"
+
+
+class Timings:
+    """
+    Time spent by one request, per phase.
+
+    Attributes:
+        started (float): perf_counter() value when the request started.
+        phases (dict): Phase name -> seconds.
+        statements (int): SQL statements executed.
+    """
+
+    def __init__(self):
+        """Start timing a request."""
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.statements = 0
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus format.
+
+    Attributes:
+        buckets (tuple): Bucket upper bounds.
+        counts (list): Observations per bucket (non-cumulative), plus +Inf.
+        sum (float): Sum of the observed values.
+        count (int): Number of observations.
+    """
+
+    def __init__(self, buckets):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets (tuple): Sorted bucket upper bounds.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Record one value.
+
+        Args:
+            value (float): Observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Process-wide store of request counters and histograms.
+
+    Series are keyed by metric name and a tuple of (label, value) pairs.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, labels):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Metric name.
+            labels (tuple): (label, value) pairs.
+        """
+        with self._lock:
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        """
+        Record a value in a histogram, creating it on first use.
+
+        Args:
+            name (str): Metric name.
+            labels (tuple): (label, value) pairs.
+            value (float): Observed value.
+            buckets (tuple): Bucket upper bounds for a new histogram.
+        """
+        with self._lock:
+            key = (name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        """
+        Copy every series into a JSON-serializable dict.
+
+        Returns:
+            dict: Counters and histograms, read back with load().
+        """
+        with self._lock:
+            return {
+                "counters": [[name, labels, value]
+                             for (name, labels), value in self._counters.items()],
+                "histograms": [[name, labels, histogram.buckets, histogram.counts,
+                                histogram.sum, histogram.count]
+                               for (name, labels), histogram in self._histograms.items()],
+            }
+
+    def load(self, snapshot):
+        """
+        Add the series of a snapshot to this registry.
+
+        Args:
+            snapshot (dict): Result of snapshot(), possibly read from JSON.
+        """
+        with self._lock:
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, buckets, counts, total, count in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(tuple(buckets))
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+
+    def render(self):
+        """
+        Render every series in the Prometheus text format.
+
+        Returns:
+            str: Exposition text.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (series, labels), value in sorted(self._counters.items()):
+                    if series == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (series, labels), histogram in sorted(self._histograms.items(),
+                                                          key=lambda item: item[0][1]):
+                    if series != name:
+                        continue
+                    cumulative = 0
+                    bounds = [*map(str, histogram.buckets), "+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _labels(labels):
+    """Format (label, value) pairs as a Prometheus label set."""
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+# Prefix -> callable returning a stats dict, see add_gauges()
+_gauge_sources = {}
+# Snapshot file of this process, reset in forked workers
+_worker = {"pid": None, "path": None}
+_worker_lock = threading.Lock()
+
+
+def _flatten(prefix, stats, gauges=None):
+    """
+    Collect the numeric values of a nested stats dict as gauges.
+
+    ``{"redis": {"hits": 3}}`` with prefix ``cache`` becomes
+    ``cache_redis_hits``; strings are skipped and lists are counted.
+
+    Args:
+        prefix (str): Metric name prefix.
+        stats (dict): Stats as returned by cache_stats() or pool_status().
+        gauges (dict, optional): Dict to add the gauges to.
+
+    Returns:
+        dict: Gauge name -> value.
+    """
+    gauges = {} if gauges is None else gauges
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            _flatten(name, value, gauges)
+        elif isinstance(value, (list, set, tuple)):
+            gauges[name] = len(value)
+        elif isinstance(value, (int, float)):
+            gauges[name] = float(value)
+    return gauges
+
+
+def add_gauges(prefix, collect):
+    """
+    Report a stats dict as gauges on every scrape and snapshot.
+
+    Args:
+        prefix (str): Metric name prefix.
+        collect (callable): Returns the current stats dict.
+    """
+    _gauge_sources[prefix] = collect
+
+
+def _collect_gauges():
+    """Read every registered stats source of this process."""
+    gauges = {}
+    for prefix, collect in _gauge_sources.items():
+        _flatten(prefix, collect(), gauges)
+    return gauges
+
+
+def _start_flusher():
+    """Start the snapshot thread of this process, once per (forked) process."""
+    if METRICS_DIR is None or _worker["pid"] == os.getpid():
+        return
+    with _worker_lock:
+        if _worker["pid"] == os.getpid():
+            return
+        _worker["pid"] = os.getpid()
+        _worker["path"] = os.path.join(METRICS_DIR, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+        threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def _flush_loop():
+    """Write a snapshot every METRICS_FLUSH_INTERVAL seconds."""
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        flush()
+
+
+def flush():
+    """
+    Write the snapshot of this process to METRICS_DIR.
+
+    Called periodically and when a worker exits, so its final counts
+    are kept.
+    """
+    if METRICS_DIR is None or _worker["pid"] != os.getpid():
+        return
+    path = _worker["path"]
+    try:
+        snapshot = {"registry": registry.snapshot(), "gauges": _collect_gauges()}
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not write metrics snapshot {path}: {e}")
+
+
+def clear():
+    """Remove the snapshots of a previous server run from METRICS_DIR."""
+    if METRICS_DIR is None:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for name in os.listdir(METRICS_DIR):
+        if name.endswith((".json", ".tmp")):
+            os.remove(os.path.join(METRICS_DIR, name))
+
+
+@contextmanager
+def _directory_lock():
+    """Serialize scrapes that read and compact METRICS_DIR."""
+    with open(os.path.join(METRICS_DIR, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_snapshots():
+    """
+    Read the snapshots of the other workers, archiving those that exited.
+
+    Returns:
+        tuple: (Registry with the archived counts, dict worker -> snapshot
+        of the live workers)
+    """
+    archive = Registry()
+    archive_path = os.path.join(METRICS_DIR, ARCHIVE_FILE)
+    if os.path.exists(archive_path):
+        with open(archive_path) as f:
+            archive.load(json.load(f))
+    live, archived = {}, []
+    now = time.time()
+    for name in os.listdir(METRICS_DIR):
+        path = os.path.join(METRICS_DIR, name)
+        if not name.endswith(".json") or name == ARCHIVE_FILE or path == _worker["path"]:
+            continue
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+            stale = now - os.path.getmtime(path) > STALE_AFTER
+        except (OSError, ValueError):
+            continue
+        if stale:
+            archive.load(snapshot["registry"])
+            archived.append(path)
+        else:
+            live[name.split("-", 1)[0]] = snapshot
+    if archived:
+        with open(f"{archive_path}.tmp", "w") as f:
+            json.dump(archive.snapshot(), f)
+        os.replace(f"{archive_path}.tmp", archive_path)
+        for path in archived:
+            os.remove(path)
+    return archive, live
+
+
+def render():
+    """
+    Render the metrics of every worker in the Prometheus text format.
+
+    Counters and histograms are summed over all workers, including the
+    ones that exited; gauges are reported per live worker.
+
+    Returns:
+        str: Exposition text.
+    """
+    snapshots = {str(os.getpid()): {"registry": registry.snapshot(), "gauges": _collect_gauges()}}
+    total = Registry()
+    if METRICS_DIR is not None:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with _directory_lock():
+            total, live = _read_snapshots()
+        snapshots.update(live)
+    for snapshot in snapshots.values():
+        total.load(snapshot["registry"])
+
+    lines = []
+    names = sorted({name for snapshot in snapshots.values() for name in snapshot["gauges"]})
+    for name in names:
+        lines.append(f"# TYPE {name} gauge")
+        for worker, snapshot in sorted(snapshots.items()):
+            if name in snapshot["gauges"]:
+                lines.append(f'{name}{_labels((("worker", worker),))} {snapshot["gauges"][name]}')
+    return total.render() + "\n".join(lines) + ("\n" if lines else "")
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in a block to a phase of the current request.
+
+    SQL run inside the block is left to the ``sql`` phase. Outside a
+    request (background refresh threads) nothing is recorded. Also usable
+    as a decorator.
+
+    Args:
+        phase (str): One of PHASES.
+    """
+    timings = getattr(_current, "timings", None)
+    if timings is None:
+        yield
+        return
+    sql_before = timings.phases["sql"]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timings.phases["sql"] - sql_before)
+        timings.phases[phase] += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Remember when a statement was sent."""
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Add a finished statement to the current request."""
+    started = conn.info["metrics_started"].pop()
+    timings = getattr(_current, "timings", None)
+    if timings is not None:
+        timings.phases["sql"] += time.perf_counter() - started
+        timings.statements += 1
+
+
+def _handle_error(exception_context):
+    """Drop the start time of a failed statement."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_started"):
+        connection.info["metrics_started"].pop()
+
+
+def _server_timing(timings, total):
+    """
+    Build a Server-Timing header value.
+
+    Args:
+        timings (Timings): Timings of the request.
+        total (float): Wall time in seconds.
+
+    Returns:
+        str: Header value, durations in milliseconds.
+    """
+    parts = []
+    for phase, seconds in timings.phases.items():
+        part = f"{phase};dur={seconds * 1000:.2f}"
+        if phase == "sql":
+            part += f';desc="{timings.statements} statements"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def init_app(app, db_manager):
+    """
+    Instrument an app and the engine of its database manager.
+
+    Args:
+        app (Flask): The Flask application instance.
+        db_manager: Database manager instance.
+    """
+    event.listen(db_manager.engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_manager.engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_manager.engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_timing():
+        _start_flusher()
+        _current.timings = Timings()
+
+    @app.after_request
+    def record_timing(response):
+        timings = getattr(_current, "timings", None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.started
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        labels = (("method", request.method), ("endpoint", endpoint))
+        registry.inc("http_requests_total", labels + (("status", str(response.status_code)),))
+        registry.observe("http_request_duration_seconds", labels, total)
+        for phase, seconds in timings.phases.items():
+            registry.observe("http_request_phase_seconds", labels + (("phase", phase),), seconds)
+        registry.observe("http_request_sql_statements", labels, timings.statements,
+                         buckets=STATEMENT_BUCKETS)
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = _server_timing(timings, total)
+        return response
+
+    @app.teardown_request
+    def stop_timing(exception=None):
+        _current.timings = None
@@ -0,0 +1,145 @@
+"""migrations.py
+
+Versioned schema migrations for the e-commerce database.
+
+Each migration has a version number, a name and a function applied with
+the database manager. Applied versions are recorded in the
+schema_migrations table, so a start against a current schema costs one
+small query. Migrations are idempotent: a database created before versions
+were tracked starts at version 0 and simply replays them all.
+
+Usage:
+    python -m modules.migrations            # apply pending migrations
+    python -m modules.migrations --status   # print current and latest version
+"""
+
+import sys
+from contextlib import contextmanager
+from sqlalchemy import (MetaData, Table, Column, Integer, String, DateTime,
+                        func, inspect, select, text)
+from modules.config import Base, DB_URI
+
+
+# Kept off Base.metadata so create_tables()/drop_tables() leave the
+# migration history alone; only migrate() creates this table
+_migrations_metadata = MetaData(schema=Base.metadata.schema)
+
+schema_migrations = Table(
+    "schema_migrations", _migrations_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now())
+)
+
+# PostgreSQL advisory lock key serializing processes that migrate at once
+MIGRATION_LOCK_ID = 7305
+
+
+def _create_tables(db_manager):
+    """Create every table (and its indexes) that does not exist yet."""
+    db_manager.create_tables()
+
+
+def _create_indexes(db_manager):
+    """Add the indexes introduced after the initial schema to existing tables."""
+    db_manager.create_indexes()
+
+
+MIGRATIONS = [
+    (1, "initial schema", _create_tables),
+    (2, "foreign key and active cart indexes", _create_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(db_manager):
+    """
+    Get the schema version of the database.
+
+    Args:
+        db_manager: Database manager instance.
+
+    Returns:
+        int: Highest applied migration, 0 if none was recorded.
+    """
+    with db_manager.engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name,
+                                       schema=schema_migrations.schema):
+            return 0
+        return conn.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+@contextmanager
+def _migration_lock(db_manager):
+    """
+    Hold the migration lock so only one process migrates at a time.
+
+    PostgreSQL uses a session advisory lock; SQLite serializes writers on
+    its own.
+
+    Args:
+        db_manager: Database manager instance.
+    """
+    if db_manager.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db_manager.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+def migrate(db_manager):
+    """
+    Apply the pending migrations in order.
+
+    Returns immediately when the schema is already current. Otherwise the
+    version is read again under the migration lock, so processes starting
+    together apply each migration once.
+
+    Args:
+        db_manager: Database manager instance.
+
+    Returns:
+        list: (version, name) of each migration applied.
+    """
+    if current_version(db_manager) >= LATEST_VERSION:
+        return []
+    applied = []
+    with _migration_lock(db_manager):
+        schema_migrations.create(db_manager.engine, checkfirst=True)
+        version = current_version(db_manager)
+        for number, name, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            apply(db_manager)
+            with db_manager.engine.begin() as conn:
+                conn.execute(schema_migrations.insert().values(version=number, name=name))
+            applied.append((number, name))
+    return applied
+
+
+def main(argv):
+    """
+    Run the migration command.
+
+    Args:
+        argv (list): Command line arguments.
+
+    Returns:
+        int: Process exit status.
+    """
+    from modules.db_manager import DBManager
+    db_manager = DBManager(db_uri=DB_URI)
+    if "--status" not in argv:
+        for number, name in migrate(db_manager):
+            print(f"Applied migration {number}: {name}")
+    print(f"Schema version {current_version(db_manager)} (latest {LATEST_VERSION})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
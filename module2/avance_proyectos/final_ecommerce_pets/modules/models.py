@@ -16,7 +16,8 @@ Also includes the CartStatus enum and input validation functions.
 """
 
 from sqlalchemy import (Enum, Column, Integer, String, DateTime, 
-                        Boolean, func, ForeignKey, UniqueConstraint)
+                        Boolean, func, ForeignKey, UniqueConstraint,
+                        Index, text)
 from sqlalchemy.orm import relationship
 from modules.config import Base
 import enum
@@ -97,11 +98,12 @@ class User(Base):
     )
 
     id = Column(Integer, primary_key=True)
-    registration_id = Column(Integer, ForeignKey("user_registrations.id", ondelete="CASCADE"), nullable=False)
+    registration_id = Column(Integer, ForeignKey("user_registrations.id", ondelete="CASCADE"),
+                             nullable=False, index=True)
     first_name = Column(String)
     last_name = Column(String)
     telephone = Column(String(8), unique=True)
-    address_id = Column(Integer, ForeignKey("addresses.id"), nullable=False)
+    address_id = Column(Integer, ForeignKey("addresses.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     # UserContact = class name, back_populates = field name i.e user on other table/class
@@ -209,6 +211,7 @@ class Product(Base):
     """
     __tablename__ = "products"
     __table_args__ = (
+        # Its index also serves lookups by name (leading column)
         UniqueConstraint('name', 'price', 'size', name='unique_product_identity'),
     )
 
@@ -245,9 +248,16 @@ class ShoppingCart(Base):
         cart_products: List of ShoppingCartProduct objects.
     """
     __tablename__ = "shopping_carts"
+    __table_args__ = (
+        # Partial index: a user's active cart is looked up far more often
+        # than their cart history
+        Index('ix_shopping_carts_active_user_id', 'user_id',
+              postgresql_where=text("status = 'ACTIVE'"),
+              sqlite_where=text("status = 'ACTIVE'")),
+    )
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     status = Column(Enum(CartStatus), default=CartStatus.ACTIVE, nullable=False)
     purchase_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -283,7 +293,7 @@ class Receipt(Base):
     __tablename__ = "receipts"
 
     id = Column(Integer, primary_key=True)
-    cart_id = Column(Integer, ForeignKey("shopping_carts.id"), nullable=False)
+    cart_id = Column(Integer, ForeignKey("shopping_carts.id"), nullable=False, index=True)
     description = Column(String(100))
     payment_method = Column(String(50))
     total_amount = Column(Integer)
@@ -313,10 +323,14 @@ class ShoppingCartProduct(Base):
         cart: Related ShoppingCart object.
     """
     __tablename__ = "cart_products"
+    __table_args__ = (
+        # Also serves lookups by cart_id alone (leading column)
+        Index('ix_cart_products_cart_id_product_id', 'cart_id', 'product_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     cart_id = Column(Integer, ForeignKey("shopping_carts.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Integer)
     checkout = Column(Boolean, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,163 @@
+"""profiler.py
+
+Sampling profiler for single requests.
+
+While a request is profiled, a background thread wakes every
+PROFILE_INTERVAL seconds and records the stack of the request thread,
+from the view dispatch down. Samples are written to PROFILE_DIR in the
+collapsed-stack format (``frame;frame;frame count`` per line) read by
+flamegraph.pl, speedscope and inferno.
+
+A request is profiled when an administrator sends ``X-Profile: true``, or
+at random for 1 in PROFILE_SAMPLE_RATE requests. Any other request only
+pays for one header lookup (and one random number when sampling is on).
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+import jwt
+from flask import request, after_this_request
+from modules.config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL
+from modules.jwt_manager import verify_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Sampler(threading.Thread):
+    """
+    Thread sampling the stack of another thread at a fixed interval.
+
+    Attributes:
+        thread_id (int): Identifier of the sampled thread.
+        root: Frame where stacks stop, excluded from the samples.
+        interval (float): Seconds between samples.
+        samples (Counter): Collapsed stack -> number of samples.
+    """
+
+    def __init__(self, thread_id, root, interval):
+        """
+        Initialize the sampler.
+
+        Args:
+            thread_id (int): Identifier of the thread to sample.
+            root: Frame where stacks stop.
+            interval (float): Seconds between samples.
+        """
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.samples = Counter()
+        self._done = threading.Event()
+        self._frame_names = {}
+
+    def run(self):
+        """Sample until stop() is called."""
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling and wait for the thread to finish."""
+        self._done.set()
+        self.join()
+
+    def _frame_name(self, code):
+        """Name a frame as ``function (file:line)``, relative to the project or site-packages."""
+        name = self._frame_names.get(code)
+        if name is None:
+            filename = code.co_filename
+            for prefix in (PROJECT_ROOT + os.sep, "site-packages" + os.sep):
+                if prefix in filename:
+                    filename = filename.split(prefix, 1)[1]
+                    break
+            name = self._frame_names[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return name
+
+
+def requested():
+    """
+    Check whether an administrator asked to profile the current request.
+
+    Returns:
+        bool: True if the profile header is set and the token is an administrator's.
+    """
+    if request.headers.get(PROFILE_HEADER, "").lower() not in ("1", "true"):
+        return False
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    try:
+        return verify_token(token).get("role") == "administrator"
+    except (jwt.InvalidTokenError, OSError):
+        return False
+
+
+def sampled():
+    """
+    Draw whether the current request is one of the 1 in PROFILE_SAMPLE_RATE profiled.
+
+    Returns:
+        bool: True if the request should be profiled.
+    """
+    return PROFILE_SAMPLE_RATE > 0 and random.randrange(PROFILE_SAMPLE_RATE) == 0
+
+
+def start(root):
+    """
+    Start profiling the current thread.
+
+    Args:
+        root: Frame of the dispatch, where recorded stacks stop.
+
+    Returns:
+        Sampler: Running sampler, passed to finish().
+    """
+    sampler = Sampler(threading.get_ident(), root, PROFILE_INTERVAL)
+    sampler.start()
+    return sampler
+
+
+def finish(sampler, report=False):
+    """
+    Stop a sampler and write its samples to PROFILE_DIR.
+
+    Args:
+        sampler (Sampler): Sampler returned by start().
+        report (bool): Name the profile file in an X-Profile-File response header.
+
+    Returns:
+        str: Path of the profile, None if nothing was written.
+    """
+    sampler.stop()
+    if not sampler.samples:
+        return None
+    name = (f"{request.endpoint}-{request.method.lower()}-{time.strftime('%Y%m%dT%H%M%S')}"
+            f"-{os.getpid()}-{uuid.uuid4().hex[:8]}.collapsed")
+    path = os.path.join(PROFILE_DIR, name)
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in sampler.samples.items())
+    except OSError as e:
+        logger.warning(f"Could not write profile {path}: {e}")
+        return None
+    logger.info(f"Wrote profile {path} ({sum(sampler.samples.values())} samples)")
+    if report:
+        @after_this_request
+        def add_profile_header(response):
+            response.headers["X-Profile-File"] = name
+            return response
+    return path
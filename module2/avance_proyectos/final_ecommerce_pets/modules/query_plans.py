@@ -0,0 +1,97 @@
+"""query_plans.py
+
+Index verification command for the e-commerce schema.
+
+Runs EXPLAIN on every query shape the repositories issue (lookups by ID,
+name and email, keyset pages and the nested relationship loads of each
+serializer schema) and flags the ones that scan a whole table.
+
+Usage:
+    python -m modules.query_plans            # check only
+    python -m modules.query_plans --create   # create missing indexes first
+
+Exits with status 1 when any query shape needs a full scan.
+"""
+
+import sys
+from modules.config import DEFAULT_PAGE_LIMIT, DB_URI
+from modules.models import CartStatus, ShoppingCart
+from modules.serializers import _schemas
+
+
+def query_shapes(db_manager, session):
+    """
+    Build one query of every shape the repositories run.
+
+    Args:
+        db_manager: Database manager instance.
+        session: SQLAlchemy session instance.
+
+    Returns:
+        list: (label, unexecuted query) pairs.
+    """
+    shapes = []
+    for name, schema in _schemas.items():
+        model = schema.model
+        shapes.append((f"{name} by id", db_manager.build_query(session, model, id=1)))
+        shapes.append((f"{name} page", db_manager.build_query(
+            session, model, after_id=1, limit=DEFAULT_PAGE_LIMIT, fields=schema.columns)))
+        for key, nested in schema.nested.items():
+            shapes.append((f"{name}.{key}", db_manager.related_query(
+                session, nested.schema.model, nested.columns, nested.key, [1, 2, 3])))
+
+    product = _schemas["product"].model
+    registration = _schemas["register_user"].model
+    shapes.append(("product by name", db_manager.build_query(session, product, name="name")))
+    shapes.append(("register_user by email", db_manager.build_query(
+        session, registration, email="user@pets.com")))
+    shapes.append(("active carts of a user", session.query(ShoppingCart.id).filter(
+        ShoppingCart.user_id == 1, ShoppingCart.status == CartStatus.ACTIVE)))
+    return shapes
+
+
+def check(db_manager):
+    """
+    EXPLAIN every query shape and print the ones that scan a whole table.
+
+    Args:
+        db_manager: Database manager instance.
+
+    Returns:
+        int: Number of query shapes with a full scan.
+    """
+    session = db_manager.sessionlocal()
+    flagged = 0
+    try:
+        for label, query in query_shapes(db_manager, session):
+            scans = db_manager.full_scans(session, query)
+            flagged += bool(scans)
+            print(f"{'SCAN' if scans else 'ok':<5} {label:<40} {'; '.join(scans)}")
+    finally:
+        session.rollback()
+        db_manager.remove_session()
+    return flagged
+
+
+def main(argv):
+    """
+    Run the index verification command.
+
+    Args:
+        argv (list): Command line arguments.
+
+    Returns:
+        int: Process exit status.
+    """
+    from modules.db_manager import DBManager
+    db_manager = DBManager(db_uri=DB_URI)
+    if "--create" in argv:
+        for name in db_manager.create_indexes():
+            print(f"Created index {name}")
+    flagged = check(db_manager)
+    print(f"{flagged} query shape(s) with full scans")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
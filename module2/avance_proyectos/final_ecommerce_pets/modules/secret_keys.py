@@ -1,66 +1,252 @@
 """secret_keys.py
 
 Cryptographic key generation and password hashing utilities.
-Handles RSA key pair generation for JWT tokens and secure password operations.
+Handles signing key pair generation for JWT tokens (RSA, ECDSA P-256 or
+Ed25519) and secure password operations. Password hashing runs in a bounded
+pool of worker processes so it neither holds the GIL nor pins request threads.
 """
 
-from cryptography.hazmat.primitives.asymmetric import rsa
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 from werkzeug.security import generate_password_hash, check_password_hash
-from modules.config import FILE_PATH
+from modules.config import (FILE_PATH, JWT_ALGORITHM,
+                            PASSWORD_HASH_ITERATIONS, PASSWORD_WORKERS,
+                            PASSWORD_QUEUE_LIMIT)
 
 
-def generate_private_key():
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+PASSWORD_METHOD = f"pbkdf2:sha256:{PASSWORD_HASH_ITERATIONS}"
+
+_password_executor = None
+_password_slots = threading.BoundedSemaphore(PASSWORD_QUEUE_LIMIT)
+_executor_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+def create_private_key(algorithm=JWT_ALGORITHM):
     """
-    Generate an RSA private key and save it to a PEM file.
-    
-    Creates a 2048-bit RSA private key and saves it to the secrets directory.
-    Also triggers public key generation.
+    Create a private key for the given JWT signing algorithm.
+
+    Args:
+        algorithm (str): One of RS256 (2048-bit RSA), ES256 (ECDSA P-256)
+                         or EdDSA (Ed25519).
+
+    Returns:
+        Private key object.
+
+    Raises:
+        ValueError: If the algorithm is not supported.
     """
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
+    if algorithm == "RS256":
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend()
+        )
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported JWT algorithm: {algorithm}. "
+                     f"Use one of {', '.join(SUPPORTED_ALGORITHMS)}")
+
+
+def key_algorithm(key):
+    """
+    Get the JWT algorithm matching a private or public key.
+
+    Args:
+        key: RSA, EC P-256 or Ed25519 key object.
+
+    Returns:
+        str: RS256, ES256 or EdDSA.
+
+    Raises:
+        ValueError: If the key type is not supported.
+    """
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if isinstance(key.curve, ec.SECP256R1):
+            return "ES256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+def key_id(public_key):
+    """
+    Derive a stable key ID (``kid``) from a public key.
+
+    Args:
+        public_key: Public key object.
+
+    Returns:
+        str: First 16 hex characters of the SHA-256 of the DER public key.
+    """
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
     )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def generate_private_key(algorithm=JWT_ALGORITHM):
+    """
+    Generate a signing private key and save it to a PEM file.
+    
+    Creates a key for the configured JWT algorithm and saves it to the
+    secrets directory. Also triggers public key generation.
+
+    Args:
+        algorithm (str): RS256, ES256 or EdDSA.
+    """
+    private_key = create_private_key(algorithm)
     # Save private key to file
     with open(f'{FILE_PATH}/private.pem', 'wb') as f:
         f.write(private_key.private_bytes(
             encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            format=serialization.PrivateFormat.PKCS8,
             encryption_algorithm=serialization.NoEncryption()
         ))
     generate_public_key(private_key)
 
 
+def ensure_keys(algorithm=JWT_ALGORITHM):
+    """
+    Make sure a signing key pair for the configured algorithm exists.
+
+    Keys are kept across restarts so issued tokens stay valid. A new pair
+    is generated only when ``private.pem`` is missing or was created for
+    another algorithm (JWT_ALGORITHM changed); a missing ``public.pem`` is
+    derived again from the private key.
+
+    Args:
+        algorithm (str): RS256, ES256 or EdDSA.
+
+    Returns:
+        bool: True if a new key pair was generated.
+    """
+    private_file = f'{FILE_PATH}/private.pem'
+    if os.path.exists(private_file):
+        with open(private_file, 'rb') as f:
+            private_key = serialization.load_pem_private_key(f.read(), password=None)
+        if key_algorithm(private_key) == algorithm:
+            if not os.path.exists(f'{FILE_PATH}/public.pem'):
+                generate_public_key(private_key)
+            return False
+    generate_private_key(algorithm)
+    return True
+
+
 def generate_public_key(private_key):
     """
     Generate a public key from a private key and save it to a PEM file.
+
+    The previous public key, if any, is kept as ``public.<kid>.pem`` so
+    tokens it signed still verify while clients migrate to the new key.
+    Delete the archived file to retire the old key.
     
     Args:
-        private_key: RSA private key object.
+        private_key: Private key object.
     """
     public_key = private_key.public_key()
+    public_file = f'{FILE_PATH}/public.pem'
+
+    # Keep the previous public key for verification during migration
+    if os.path.exists(public_file):
+        with open(public_file, 'rb') as f:
+            previous_key = serialization.load_pem_public_key(f.read())
+        if key_id(previous_key) != key_id(public_key):
+            os.replace(public_file, f'{FILE_PATH}/public.{key_id(previous_key)}.pem')
 
     # Save public key to file
-    with open(f'{FILE_PATH}/public.pem', 'wb') as f:
+    with open(public_file, 'wb') as f:
         f.write(public_key.public_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         ))
 
 
+def start_password_workers():
+    """
+    Start the password hashing worker processes.
+
+    Call this before the server starts handling requests so the workers
+    are forked from a single-threaded parent. With PASSWORD_WORKERS set to
+    0 no pool is created and hashing runs on the calling thread.
+
+    Returns:
+        ProcessPoolExecutor: The shared executor, or None if disabled.
+    """
+    global _password_executor
+    if PASSWORD_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _password_executor is None:
+            context = None
+            if "fork" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("fork")
+            _password_executor = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS,
+                                                     mp_context=context)
+            # The first job launches every worker process
+            _password_executor.submit(int).result()
+    return _password_executor
+
+
+def _run_password_job(function, *args):
+    """
+    Run a hashing function in the worker pool and wait for its result.
+
+    Args:
+        function (callable): Picklable hashing function.
+        *args: Arguments for the function.
+
+    Returns:
+        The function result.
+
+    Raises:
+        PasswordHasherBusy: If PASSWORD_QUEUE_LIMIT jobs are already in flight.
+    """
+    executor = start_password_workers()
+    if executor is None:
+        return function(*args)
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = executor.submit(function, *args)
+    except Exception:
+        _password_slots.release()
+        raise
+    future.add_done_callback(lambda _: _password_slots.release())
+    return future.result()
+
+
 def password_hash(password):
     """
     Hash a password using PBKDF2 with SHA-256.
+
+    The iteration count comes from PASSWORD_HASH_ITERATIONS.
     
     Args:
         password (str): Plain text password to hash.
         
     Returns:
         str: Hashed password string.
+
+    Raises:
+        PasswordHasherBusy: If the hashing queue is full.
     """
-    hashed = generate_password_hash(password, method='pbkdf2:sha256')
+    hashed = _run_password_job(generate_password_hash, password, PASSWORD_METHOD)
     return hashed
 
 
@@ -74,6 +260,22 @@ def verify_password(hashed, password):
         
     Returns:
         bool: True if password matches, False otherwise.
+
+    Raises:
+        PasswordHasherBusy: If the hashing queue is full.
+    """
+    is_valid = _run_password_job(check_password_hash, hashed, password)
+    return is_valid
+
+
+def needs_rehash(hashed):
+    """
+    Check whether a stored hash uses a different method or cost.
+
+    Args:
+        hashed (str): The stored password hash.
+
+    Returns:
+        bool: True if the hash should be regenerated with PASSWORD_METHOD.
     """
-    is_valid = check_password_hash(hashed, password)
-    return is_valid
\ No newline at end of file
+    return hashed.split("$", 1)[0] != PASSWORD_METHOD
@@ -0,0 +1,373 @@
+"""serializers.py
+
+Declarative response serializers for the API models.
+
+Each Schema lists the output keys of a response and the model columns they
+come from. Schemas are compiled once at import: the columns to select, the
+position of every output key in the selected Row tuples and the formatter of
+each datetime and enum column. Rows are converted column by column, so every
+distinct timestamp is formatted once per response, and each nested
+relationship is loaded with one column-only query instead of joined ORM
+objects.
+
+Also includes the _schemas registry used by the repositories.
+"""
+
+from sqlalchemy import DateTime, Date, Enum
+from modules.models import (UserRegistration, User, UserContact, Address,
+                            Product, ShoppingCart, Receipt, ShoppingCartProduct)
+
+
+def _format_datetime(value):
+    """Format a timestamp the way the API always has (``str``)."""
+    return str(value) if value is not None else None
+
+
+def _format_enum(value):
+    """Return the value of an enum member."""
+    return value.value if value is not None else None
+
+
+def _formatter(column_type):
+    """
+    Pick the formatter for a column type.
+
+    Args:
+        column_type: SQLAlchemy type of the column.
+
+    Returns:
+        callable: Formatter, or None if values are JSON-ready as selected.
+    """
+    if isinstance(column_type, Enum):
+        return _format_enum
+    if isinstance(column_type, (DateTime, Date)):
+        return _format_datetime
+    return None
+
+
+def _format_batch(values, formatter):
+    """
+    Format a whole column at once, formatting each distinct value once.
+
+    Timestamps repeat heavily (bulk inserts share ``created_at``), so this
+    is much cheaper than formatting row by row.
+
+    Args:
+        values (list): Column values.
+        formatter (callable): Formatter for one value.
+
+    Returns:
+        list: Formatted values in the same order.
+    """
+    formatted = {value: formatter(value) for value in set(values)}
+    return [formatted[value] for value in values]
+
+
+class Computed:
+    """
+    Output value derived from several columns.
+
+    Attributes:
+        columns (tuple): Column names passed to the function, in order.
+        function (callable): Builds the value from the column values.
+    """
+
+    def __init__(self, columns, function):
+        """
+        Initialize a computed field.
+
+        Args:
+            columns (tuple): Column names passed to the function.
+            function (callable): Builds the value from the column values.
+        """
+        self.columns = tuple(columns)
+        self.function = function
+
+
+class Nested:
+    """
+    Related records embedded under a key of the parent record.
+
+    Children are matched by ``child.key == parent.parent_key`` and the key
+    is omitted from the parent when no child matches, as the hand-built
+    responses did.
+
+    Attributes:
+        schema (Schema): Schema of the related records.
+        key (str): Column of the related model matched against the parent.
+        parent_key (str): Column of the parent model holding the match value.
+        many (bool): Embed a list (True) or a single record (False).
+        inherit (tuple): Output keys copied from the parent into each child.
+    """
+
+    def __init__(self, schema, key, parent_key="id", many=True, inherit=()):
+        """
+        Initialize a nested relationship.
+
+        Args:
+            schema (Schema): Schema of the related records.
+            key (str): Column of the related model matched against the parent.
+            parent_key (str): Column of the parent model holding the match value.
+            many (bool): Embed a list (True) or a single record (False).
+            inherit (tuple): Output keys copied from the parent into each child.
+        """
+        self.schema = schema
+        self.key = key
+        self.parent_key = parent_key
+        self.many = many
+        self.inherit = tuple(inherit)
+        self.columns = list(dict.fromkeys([*schema.columns, key]))
+        self._key_index = self.columns.index(key)
+
+    def load(self, db_manager, session, parent_values):
+        """
+        Load and serialize the children of a batch of parents.
+
+        Args:
+            db_manager: Database manager instance.
+            session: SQLAlchemy session instance.
+            parent_values (list): ``parent_key`` value of every parent.
+
+        Returns:
+            dict: Match value -> list of serialized children.
+        """
+        values = [value for value in set(parent_values) if value is not None]
+        rows = db_manager.get_related(session, self.schema.model, self.columns,
+                                      self.key, values)
+        groups = {}
+        for row, record in zip(rows, self.schema.dump(db_manager, session, rows)):
+            groups.setdefault(row[self._key_index], []).append(record)
+        return groups
+
+
+class Schema:
+    """
+    Declarative serializer for one response shape of a model.
+
+    Attributes:
+        model: The model class the rows are selected from.
+        columns (list): Column names to select, primary key first.
+    """
+
+    def __init__(self, model, fields, nested=None):
+        """
+        Compile a schema.
+
+        Args:
+            model: The model class the rows are selected from.
+            fields (dict): Output key -> column name or Computed.
+            nested (dict, optional): Output key -> Nested.
+        """
+        self.model = model
+        self.fields = fields
+        self.nested = nested or {}
+
+        names = ["id"]
+        for spec in fields.values():
+            names.extend(spec.columns if isinstance(spec, Computed) else [spec])
+        names.extend(nested.parent_key for nested in self.nested.values())
+        self.columns = list(dict.fromkeys(names))
+
+        position = {name: index for index, name in enumerate(self.columns)}
+        table_columns = model.__table__.columns
+        self._formatters = []
+        for name in self.columns:
+            formatter = _formatter(table_columns[name].type)
+            if formatter is not None:
+                self._formatters.append((position[name], formatter))
+        self._keys = list(fields)
+        self._getters = []
+        for spec in fields.values():
+            if isinstance(spec, Computed):
+                self._getters.append(([position[name] for name in spec.columns], spec.function))
+            else:
+                self._getters.append(position[spec])
+        self._nested = [(name, nested, position[nested.parent_key])
+                        for name, nested in self.nested.items()]
+
+    def dump(self, db_manager, session, rows):
+        """
+        Serialize Row tuples selected with ``columns``.
+
+        Args:
+            db_manager: Database manager instance, used to load nested records.
+            session: SQLAlchemy session instance.
+            rows (list): Rows whose leading values follow ``columns``.
+
+        Returns:
+            list: One dictionary per row.
+        """
+        if not rows:
+            return []
+        columns = [list(column) for column in zip(*rows)]
+        parent_values = [columns[index] for _, _, index in self._nested]
+        for index, formatter in self._formatters:
+            columns[index] = _format_batch(columns[index], formatter)
+
+        values = []
+        for getter in self._getters:
+            if isinstance(getter, int):
+                values.append(columns[getter])
+            else:
+                positions, function = getter
+                values.append(list(map(function, *(columns[index] for index in positions))))
+        keys = self._keys
+        records = [dict(zip(keys, record)) for record in zip(*values)]
+
+        for (name, nested, _), parents in zip(self._nested, parent_values):
+            groups = nested.load(db_manager, session, parents)
+            for record, parent in zip(records, parents):
+                children = groups.get(parent)
+                if not children:
+                    continue
+                for key in nested.inherit:
+                    for child in children:
+                        child[key] = record[key]
+                record[name] = children if nested.many else children[0]
+        return records
+
+
+_user_name = Computed(("first_name", "last_name"), lambda first, last: f"{first} {last}")
+
+_user_summary = Schema(User, {"id": "id", "user_name": _user_name})
+
+_cart = Schema(ShoppingCart, {
+    "id": "id",
+    "user_id": "user_id",
+    "status": "status",
+    "purchase_date": "purchase_date",
+    "created_at": "created_at",
+    "updated_at": "updated_at"
+})
+
+_schemas = {
+    "register_user": Schema(UserRegistration, {
+        "registration_id": "id",
+        "email": "email",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "user": Nested(_user_summary, key="registration_id", many=False)
+    }),
+    "user": Schema(User, {
+        "id": "id",
+        "registration_id": "registration_id",
+        "user_name": _user_name,
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "address": Nested(Schema(Address, {
+            "id": "id",
+            "street": "street",
+            "city": "city",
+            "state": "state",
+            "postal_code": "postal_code",
+            "country": "country"
+        }), key="id", parent_key="address_id", many=False),
+        # Contacts show the name of the user they belong to
+        "contacts": Nested(Schema(UserContact, {"contact_id": "id"}),
+                           key="user_id", inherit=("user_name",)),
+        "carts": Nested(Schema(ShoppingCart, {
+            "cart_id": "id",
+            "status": "status",
+            "purchase_date": "purchase_date"
+        }), key="user_id")
+    }),
+    "user_contact": Schema(UserContact, {
+        "id": "id",
+        "user_id": "user_id",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "user": Nested(_user_summary, key="id", parent_key="user_id", many=False)
+    }),
+    "address": Schema(Address, {
+        "id": "id",
+        "postal_code": "postal_code",
+        "country": "country",
+        "state": "state",
+        "city": "city",
+        "street": "street",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "users": Nested(_user_summary, key="address_id")
+    }),
+    "product": Schema(Product, {
+        "id": "id",
+        "name": "name",
+        "description": "description",
+        "price": "price",
+        "size": "size",
+        "quantity": "quantity",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "cart_products": Nested(Schema(ShoppingCartProduct, {
+            "cart_id": "cart_id",
+            "product_id": "product_id",
+            "quantity": "quantity",
+            "checkout": "checkout",
+            "created_at": "created_at",
+            "updated_at": "updated_at"
+        }), key="product_id")
+    }),
+    "shopping_cart": Schema(ShoppingCart, {
+        "id": "id",
+        "user_id": "user_id",
+        "status": "status",
+        "purchase_date": "purchase_date",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "receipt": Nested(Schema(Receipt, {
+            "receipt_id": "id",
+            "payment_method": "payment_method",
+            "total_amount": "total_amount",
+            "created_at": "created_at",
+            "updated_at": "updated_at"
+        }), key="cart_id", many=False),
+        "shopping_cart_products": Nested(Schema(ShoppingCartProduct, {
+            "cart_id": "cart_id",
+            "product_id": "product_id",
+            "quantity": "quantity",
+            "created_at": "created_at",
+            "updated_at": "updated_at"
+        }), key="cart_id")
+    }),
+    "receipt": Schema(Receipt, {
+        "id": "id",
+        "cart_id": "cart_id",
+        "payment_method": "payment_method",
+        "total_amount": "total_amount",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "cart": Nested(_cart, key="id", parent_key="cart_id", many=False)
+    }),
+    "shopping_cart_product": Schema(ShoppingCartProduct, {
+        "id": "id",
+        "cart_id": "cart_id",
+        "product_id": "product_id",
+        "checkout": "checkout",
+        "created_at": "created_at",
+        "updated_at": "updated_at"
+    }, nested={
+        "product": Nested(Schema(Product, {
+            "product_id": "id",
+            "name": "name",
+            "description": "description",
+            "price": "price",
+            "size": "size",
+            "quantity": "quantity"
+        }), key="id", parent_key="product_id", many=False),
+        "cart": Nested(Schema(ShoppingCart, {
+            "cart_id": "id",
+            "user_id": "user_id",
+            "status": "status",
+            "purchase_date": "purchase_date",
+            "created_at": "created_at",
+            "updated_at": "updated_at"
+        }), key="id", parent_key="cart_id", many=False)
+    })
+}
@@ -4,15 +4,17 @@ Address repository for managing user address records.
 Handles CRUD operations for delivery and billing addresses.
 """
 
-import json
+import logging
 import redis
 from flask import (request, jsonify)
 from datetime import date
 from repositories.repository import Repository
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 from modules.cache_manager import CacheManager
 
+logger = logging.getLogger(__name__)
 
 
 class AddressRepository(Repository):
@@ -40,6 +42,9 @@ class AddressRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('address')
+        self.schema = _schemas.get('address')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {"users": "selectin"}
         self.cache_manager = CacheManager()
 
     def _get(self, id=None):
@@ -52,59 +57,41 @@ class AddressRepository(Repository):
         Returns:
             tuple: (JSON response with address data, HTTP status code)
         """
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream)
         # Cache layer with Redis
-        cache_key = f"addresses:{id}" if id else "addresses:all"
-        try:
-            cached_data = self.cache_manager.get_data(cache_key)
-        except redis.RedisError:
-            cached_data = None
-        if cached_data:
-            print("Pull from Redis")
-            return jsonify(json.loads(cached_data)), 200
+        page = self._page_args(id)
+        cache_key = f"addresses:{id}" if id else f"addresses:all:{self._page_key(page)}"
+        return self._cached_get(cache_key, page, ttl=600,
+                                load=lambda: self._load(page, id=id))
 
-        model_class = self.model_class
-        relationship_list = [model_class.users]
+    def _load(self, page, id=None):
+        """
+        Query address records and convert them to dictionaries.
+
+        Called on a cache miss by the one request rebuilding the key.
+
+        Args:
+            page (dict): Arguments returned by _page_args.
+            id (int, optional): Filter by address ID.
+
+        Returns:
+            list | dict | tuple: Serialized addresses, a single address when
+            querying by ID, or an error response tuple.
+        """
         session = self.db_manager.sessionlocal()
-        addresses = self.db_manager.get_query(session, model_class, id=id,
-                                              relationships=relationship_list)
+        try:
+            address_list = self._serialize(session, self.schema, page, id=id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # If querying by ID and no result found
-        if id and not addresses:
+        if id and not address_list:
             return jsonify({"error": "Address not found"}), 404
-        # Convert SQLAlchemy objects to dictionaries
-        address_list = []
-        for address in addresses:
-            address_data = {
-                "id": address.id,
-                "postal_code": address.postal_code,
-                "country": address.country,
-                "state": address.state,
-                "city": address.city,
-                "street": address.street,
-                "created_at": str(address.created_at) if address.created_at else None,
-                "updated_at": str(address.updated_at) if address.updated_at else None
-            }
-            
-            # Include related user data if loaded
-            if hasattr(address, 'users') and address.users:
-                users_list = []
-                for user in address.users:
-                    user_data = {
-                        "id": user.id,
-                        "user_name": f"{user.first_name} {user.last_name}"
-                    }
-                    users_list.append(user_data)
-                address_data['users'] = users_list
-            
-            address_list.append(address_data)
-
-        self.cache_manager.store_data(cache_key, json.dumps(address_list), ttl=600)
 
         # Return single object if querying by ID, otherwise return list
-        if id and address_list:
-            return jsonify(address_list[0]), 200
-        
-        return jsonify(address_list), 200
+        return address_list[0] if id else address_list
 
     def _add(self, data):
         """
@@ -129,11 +116,10 @@ class AddressRepository(Repository):
             }), 409
 
         try:
-            self.cache_manager.delete_pattern("addresses:*")
             # Cross-invalidate: user responses include address data
-            self.cache_manager.delete_pattern("users:*")
+            self.cache_manager.invalidate("addresses", "users")
         except redis.RedisError as e:
-            print(f"Redis Error: {e}")
+            logger.warning(f"Redis Error: {e}")
 
         return jsonify({
             "id": address.id,
@@ -191,11 +177,10 @@ class AddressRepository(Repository):
             updated_address = self.db_manager.update(session, address)
 
             try:
-                self.cache_manager.delete_pattern("addresses:*")
                 # Cross-invalidate: user responses include address data
-                self.cache_manager.delete_pattern("users:*")
+                self.cache_manager.invalidate("addresses", "users")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             if updated_address:
                 msg = f"Address with ID {updated_address.id} has been UPDATED"
@@ -221,18 +206,18 @@ class AddressRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            addresses = self.db_manager.get_query(session, model_class, id=id)
+            addresses = self.db_manager.get_query(session, model_class, id=id,
+                                                  relationships=self.relationships)
             address = addresses[0]
             if not address:
                 raise ValueError(f"Address ID {id} has not been found")
             self.db_manager.delete(session, address)
 
             try:
-                self.cache_manager.delete_pattern("addresses:*")
                 # Cross-invalidate: user responses include address data
-                self.cache_manager.delete_pattern("users:*")
+                self.cache_manager.invalidate("addresses", "users")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             msg = f"Address with ID {id} has been DELETED"
             return jsonify({"message": msg}), 200
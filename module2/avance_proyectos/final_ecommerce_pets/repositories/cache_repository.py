@@ -0,0 +1,57 @@
+"""cache_repository.py
+
+Cache repository exposing per-tier cache hit ratios.
+Used to check how often the in-process tier answers before Redis.
+"""
+
+from flask import jsonify
+from repositories.repository import Repository
+from modules.jwt_manager import require_jwt
+from modules.cache_manager import cache_stats
+
+
+
+class CacheRepository(Repository):
+    """
+    Repository for reading cache statistics.
+
+    Read-only endpoint reporting hits, misses and hit ratio of the
+    in-process cache tier and of the Redis tier behind it.
+
+    Attributes:
+        db_manager: Database manager instance.
+    """
+
+    def __init__(self, db_manager, *args, **kwargs):
+        """
+        Initialize the cache repository.
+
+        Args:
+            db_manager: Database manager instance.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+        """
+        # Ensure MethodView init runs and accept extra args if Flask passes any
+        super().__init__(*args, **kwargs)
+        self.db_manager = db_manager
+
+    @require_jwt("administrator")
+    def get(self):
+        """
+        Get per-tier cache statistics.
+
+        Requires administrator role.
+
+        Returns:
+            tuple: (JSON response with cache counters, HTTP status code)
+        """
+        return jsonify(cache_stats()), 200
+
+    def post(self):
+        pass
+
+    def put(self):
+        pass
+
+    def delete(self):
+        pass
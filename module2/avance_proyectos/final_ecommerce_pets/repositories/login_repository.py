@@ -7,8 +7,9 @@ Provides endpoints for user login and retrieving current user information.
 import json
 from flask import (request, jsonify)
 from repositories.repository import Repository
-from modules.jwt_manager import require_jwt, JWT_Manager
-from modules.secret_keys import verify_password
+from modules.jwt_manager import require_jwt, get_jwt_manager
+from modules.secret_keys import (verify_password, password_hash,
+                                 needs_rehash, PasswordHasherBusy)
 
 
 
@@ -54,7 +55,7 @@ class LoginRepository(Repository):
         token = _token.replace("Bearer ","")
         if not token:
             return jsonify({"error": "No token provided"}), 400
-        jwt_manager = JWT_Manager()
+        jwt_manager = get_jwt_manager()
         decoded = jwt_manager.decode(token)
         email = decoded.get("email")
         records = self.db_manager.get_by_email(session, email)
@@ -71,6 +72,8 @@ class LoginRepository(Repository):
         Authenticate user and generate JWT token.
         
         Validates email and password, returns JWT access token on success.
+        If the stored hash uses an outdated method or cost it is replaced
+        with a fresh hash of the submitted password.
         
         Request Body:
             email (str): User's email address.
@@ -78,7 +81,8 @@ class LoginRepository(Repository):
             
         Returns:
             tuple: JSON response with email, token, and creation date on success,
-                   or error message with appropriate HTTP status code.
+                   or error message with appropriate HTTP status code
+                   (503 when the password hashing queue is full).
         """
         session = self.db_manager.sessionlocal()
         data = request.get_json()
@@ -90,11 +94,22 @@ class LoginRepository(Repository):
             return jsonify({"error": "User not found"}), 404
         record = records[0]
         hashed = record.password
-        is_valid = verify_password(hashed, password)
+        try:
+            is_valid = verify_password(hashed, password)
+        except PasswordHasherBusy:
+            return self._busy_response("Too many login attempts, try again shortly")
         
         if not is_valid:
             return jsonify({"error": "Invalid password"}), 403
-        jwt_manager = JWT_Manager()
+
+        # Upgrade the stored hash if the configured cost changed
+        if needs_rehash(hashed):
+            try:
+                record.password = password_hash(password)
+                self.db_manager.update(session, record)
+            except PasswordHasherBusy:
+                pass  # Keep the old hash, it is upgraded on a later login
+        jwt_manager = get_jwt_manager()
 
         # Create token data
         token_data = {
@@ -0,0 +1,56 @@
+"""metrics_repository.py
+
+Metrics repository exposing request, cache and pool metrics to Prometheus.
+Used to find which phase of which endpoint a latency regression comes from.
+"""
+
+from flask import Response
+from repositories.repository import Repository
+from modules import metrics
+from modules.jwt_manager import require_jwt
+
+
+class MetricsRepository(Repository):
+    """
+    Repository for the Prometheus scrape endpoint.
+
+    Administrator only, since it exposes cache and pool internals; the
+    scraper sends an administrator token. Counters and histograms are
+    summed over all workers, gauges carry a ``worker`` label.
+
+    Attributes:
+        db_manager: Database manager instance.
+    """
+
+    def __init__(self, db_manager, *args, **kwargs):
+        """
+        Initialize the metrics repository.
+
+        Args:
+            db_manager: Database manager instance.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+        """
+        # Ensure MethodView init runs and accept extra args if Flask passes any
+        super().__init__(*args, **kwargs)
+        self.db_manager = db_manager
+
+    @require_jwt("administrator")
+    def get(self):
+        """
+        Get the metrics in the Prometheus text format.
+
+        Returns:
+            Response: Request histograms plus cache (including circuit
+            breaker) and connection pool gauges.
+        """
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    def post(self):
+        pass
+
+    def put(self):
+        pass
+
+    def delete(self):
+        pass
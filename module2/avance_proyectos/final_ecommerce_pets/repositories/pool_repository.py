@@ -0,0 +1,56 @@
+"""pool_repository.py
+
+Pool repository exposing database connection pool statistics.
+Used to size application workers against the database connection limit.
+"""
+
+from flask import jsonify
+from repositories.repository import Repository
+from modules.jwt_manager import require_jwt
+
+
+
+class PoolRepository(Repository):
+    """
+    Repository for reading connection pool statistics.
+
+    Read-only endpoint reporting checked-in, checked-out and
+    overflow connection counts from the DBManager engine pool.
+
+    Attributes:
+        db_manager: Database manager instance.
+    """
+
+    def __init__(self, db_manager, *args, **kwargs):
+        """
+        Initialize the pool repository.
+
+        Args:
+            db_manager: Database manager instance.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+        """
+        # Ensure MethodView init runs and accept extra args if Flask passes any
+        super().__init__(*args, **kwargs)
+        self.db_manager = db_manager
+
+    @require_jwt("administrator")
+    def get(self):
+        """
+        Get connection pool statistics.
+
+        Requires administrator role.
+
+        Returns:
+            tuple: (JSON response with pool counters, HTTP status code)
+        """
+        return jsonify(self.db_manager.pool_status()), 200
+
+    def post(self):
+        pass
+
+    def put(self):
+        pass
+
+    def delete(self):
+        pass
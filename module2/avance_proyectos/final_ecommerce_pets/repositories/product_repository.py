@@ -5,15 +5,18 @@ Handles CRUD operations for products with name, description,
 price, size, and quantity attributes.
 """
 
-import json
+import logging
 import redis
 from flask import (request, jsonify)
 from datetime import date
 from repositories.repository import Repository
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 from modules.cache_manager import CacheManager
 
+logger = logging.getLogger(__name__)
+
 
 class ProductRepository(Repository):
     """
@@ -39,6 +42,9 @@ class ProductRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('product')
+        self.schema = _schemas.get('product')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {"cart_products": "selectin"}
         self.cache_manager = CacheManager()
 
     def _get(self, id=None, name=None):
@@ -52,65 +58,49 @@ class ProductRepository(Repository):
         Returns:
             tuple: (JSON response with product data, HTTP status code)
         """
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream, name=name)
         # Cache layer with Redis
-        cache_key = f"products:{id}" if id else "products:all"
-        try:
-            cached_data = self.cache_manager.get_data(cache_key)
-        except redis.RedisError:
-            # Fallback to database if Redis is down
-            cached_data = None
-        if cached_data:
-            print("Pull from Redis")
-            return jsonify(json.loads(cached_data)), 200
+        page = self._page_args(id)
+        cache_key = f"products:{id}" if id else f"products:all:{self._page_key(page)}"
+        return self._cached_get(cache_key, page, ttl=300,
+                                load=lambda: self._load(page, id=id, name=name))
 
-        model_class = self.model_class
-        relationship_list = [model_class.cart_products]
+    def _load(self, page, id=None, name=None):
+        """
+        Query product records and convert them to dictionaries.
+
+        Called on a cache miss by the one request rebuilding the key.
+
+        Args:
+            page (dict): Arguments returned by _page_args.
+            id (int, optional): Filter by product ID.
+            name (str, optional): Filter by product name.
+
+        Returns:
+            list | dict | tuple: Serialized products, a single product when
+            querying by ID, or an error response tuple.
+        """
         session = self.db_manager.sessionlocal()
-        products = self.db_manager.get_query(session, model_class, id=id, name=name,
-                                             relationships=relationship_list)
+        try:
+            product_list = self._serialize(session, self.schema, page, id=id, name=name)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # If querying by ID and no result found
-        if id and not products:
+        if id and not product_list:
             return jsonify({"error": "product not found"}), 404
-        
-        # Convert SQLAlchemy objects to dictionaries
-        product_list = []
-        for product in products:
-            product_data = {
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "price": product.price,
-                "size": product.size,
-                "quantity": product.quantity,
-                "created_at": str(product.created_at) if product.created_at else None,
-                "updated_at": str(product.updated_at) if product.updated_at else None
-            }
-            # Include related address data if loaded
-            if hasattr(product, 'cart_products') and product.cart_products:
-                cart_list = []
-                for cart_product in product.cart_products:
-                    cart_data = {
-                        "cart_id": cart_product.cart_id,
-                        "product_id": cart_product.product_id,
-                        "quantity": cart_product.quantity,
-                        "checkout": cart_product.checkout,
-                        "created_at": str(cart_product.created_at),
-                        "updated_at": str(cart_product.updated_at)
-                    }
-                    cart_list.append(cart_data)
-                product_data['cart_products'] = cart_list
-            product_list.append(product_data)         
-        
-        self.cache_manager.store_data(cache_key, json.dumps(product_list), ttl=300)
+
         # Return single object if querying by ID, otherwise return list
-        if id and product_list:
-            return jsonify(product_list[0]), 200
-        
-        return jsonify(product_list), 200
+        return product_list[0] if id else product_list
 
     def _add(self, data):
         """
         Internal method to create new products.
+
+        All products are inserted in a single transaction; if any of them
+        conflicts with existing records none are created.
         
         Args:
             data (list): List of product dictionaries with name,
@@ -124,15 +114,19 @@ class ProductRepository(Repository):
         
         if not isinstance(data, list):
             return jsonify({"error": "JSON Data is not correct, provide a list of items."}), 400
-        record_list = []
-        for product in data:
-            _new_product = model_class(**product)
-            new_product = self.db_manager.insert(session, _new_product)
-            if new_product is None:
-                return jsonify({
+        try:
+            new_products, conflicts = self.db_manager.bulk_insert(session, model_class, data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if new_products is None:
+            return jsonify({
                 "error": "Product already exists or violates database constraints",
-                "message": "This user may already be registered or the data conflicts with existing records"
+                "message": "No products were created, the listed rows conflict with existing records",
+                "conflicts": conflicts
             }), 409
+
+        record_list = []
+        for new_product in new_products:
             product_data = {
                 "id": new_product.id,
                 "name": new_product.name,
@@ -147,9 +141,9 @@ class ProductRepository(Repository):
             record_list.append(product_data)
         
         try:
-            self.cache_manager.delete_pattern("products:*")
+            self.cache_manager.invalidate("products")
         except redis.RedisError as e:
-            print(f"Redis Error: {e}")
+            logger.warning(f"Redis Error: {e}")
         
         return jsonify(record_list), 201
 
@@ -201,9 +195,9 @@ class ProductRepository(Repository):
             updated_product = self.db_manager.update(session, product)
             
             try:
-                self.cache_manager.delete_pattern("products:*")
+                self.cache_manager.invalidate("products")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             return jsonify({
                 "id": updated_product.id,
@@ -234,7 +228,8 @@ class ProductRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            products = self.db_manager.get_query(session, model_class, id=id)
+            products = self.db_manager.get_query(session, model_class, id=id,
+                                                 relationships=self.relationships)
             product = products[0]
             if not product:
                 raise ValueError(f"Product ID {id} has not been found")
@@ -242,9 +237,9 @@ class ProductRepository(Repository):
             msg = f"Product with ID {id} with name {product.name} has been DELETED"
             
             try:
-                self.cache_manager.delete_pattern("products:*")
+                self.cache_manager.invalidate("products")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             return jsonify({"message": msg}), 200
         except ValueError as e:
@@ -0,0 +1,71 @@
+"""readiness_repository.py
+
+Readiness repository for load balancer and orchestrator probes.
+Reports whether this process can serve traffic during rolling restarts.
+"""
+
+from flask import jsonify
+from repositories.repository import Repository
+from modules.jwt_manager import key_store
+from modules.cache_manager import breaker
+from modules.migrations import current_version, LATEST_VERSION
+
+
+
+class ReadinessRepository(Repository):
+    """
+    Repository for the readiness probe.
+
+    Unauthenticated, read-only endpoint. The process is ready when the
+    database answers with a current schema and the signing keys are
+    loaded. Redis is reported but not required, since the cache degrades
+    to the database when it is down.
+
+    Attributes:
+        db_manager: Database manager instance.
+    """
+
+    def __init__(self, db_manager, *args, **kwargs):
+        """
+        Initialize the readiness repository.
+
+        Args:
+            db_manager: Database manager instance.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+        """
+        # Ensure MethodView init runs and accept extra args if Flask passes any
+        super().__init__(*args, **kwargs)
+        self.db_manager = db_manager
+
+    def get(self):
+        """
+        Check whether the process is ready to serve requests.
+
+        Returns:
+            tuple: (JSON response with the checks, 200 if ready or 503)
+        """
+        checks = {"redis": breaker.state}
+        try:
+            version = current_version(self.db_manager)
+            checks["database"] = "ok" if version >= LATEST_VERSION else \
+                f"schema version {version}, expected {LATEST_VERSION}"
+        except Exception as e:
+            checks["database"] = f"unavailable: {e.__class__.__name__}"
+        try:
+            checks["keys"] = "ok" if key_store.kid else "missing"
+        except OSError:
+            checks["keys"] = "missing"
+
+        ready = checks["database"] == "ok" and checks["keys"] == "ok"
+        checks["status"] = "ready" if ready else "not ready"
+        return jsonify(checks), 200 if ready else 503
+
+    def post(self):
+        pass
+
+    def put(self):
+        pass
+
+    def delete(self):
+        pass
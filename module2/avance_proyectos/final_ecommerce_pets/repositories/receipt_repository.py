@@ -4,15 +4,18 @@ Receipt repository for managing purchase receipt records.
 Handles CRUD operations for receipts with payment method,
 total amount, and relationship to shopping carts.
 """
-import json
+import logging
 import redis
 from flask import (Flask, request, jsonify)
 from datetime import date
 from repositories.repository import Repository
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 from modules.cache_manager import CacheManager
 
+logger = logging.getLogger(__name__)
+
 
 class ReceiptRepository(Repository):
     """
@@ -39,6 +42,9 @@ class ReceiptRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('receipt')
+        self.schema = _schemas.get('receipt')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {}
         self.cache_manager = CacheManager()
 
     def _get(self, id=None):
@@ -51,65 +57,52 @@ class ReceiptRepository(Repository):
         Returns:
             tuple: (JSON response with receipt data, HTTP status code)
         """
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream)
         # Cache layer with Redis
-        cache_key = f"receipts:{id}" if id else "receipts:all"
-        try:
-            cached_data = self.cache_manager.get_data(cache_key)
-        except redis.RedisError:
-            # Fallback to database if Redis is down
-            cached_data = None
-        if cached_data:
-            print("Pull from Redis")
-            return jsonify(json.loads(cached_data)), 200
-        model_class = self.model_class
-        relationship_list = [model_class.cart]
+        page = self._page_args(id)
+        cache_key = f"receipts:{id}" if id else f"receipts:all:{self._page_key(page)}"
+        return self._cached_get(cache_key, page, ttl=150,
+                                load=lambda: self._load(page, id=id))
+
+    def _load(self, page, id=None):
+        """
+        Query receipt records and convert them to dictionaries.
+
+        Called on a cache miss by the one request rebuilding the key.
+
+        Args:
+            page (dict): Arguments returned by _page_args.
+            id (int, optional): Filter by receipt ID.
+
+        Returns:
+            list | dict | tuple: Serialized receipts, a single receipt when
+            querying by ID, or an error response tuple.
+        """
         session = self.db_manager.sessionlocal()
-        receipts = self.db_manager.get_query(session, model_class, id=id,
-                                             relationships=relationship_list)
+        try:
+            receipts_list = self._serialize(session, self.schema, page, id=id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # If querying by ID and no result found
-        if id and not receipts:
+        if id and not receipts_list:
             return jsonify({"error": "Receipt not found"}), 404
-        
-        # Convert SQLAlchemy objects to dictionaries
-        receipts_list = []
-        for receipt in receipts:
-            receipt_data = {
-                "id": receipt.id,
-                "cart_id": receipt.cart_id,
-                "payment_method": receipt.payment_method,
-                "total_amount": receipt.total_amount,
-                "created_at": str(receipt.created_at) if receipt.created_at else None,
-                "updated_at": str(receipt.updated_at) if receipt.updated_at else None
-            }
-            # Include related cart data if loaded
-            if hasattr(receipt, 'cart') and receipt.cart:
-                cart = receipt.cart
-                receipt_data["cart"] = {
-                    "id": cart.id,
-                    "user_id": cart.user_id,
-                    "status": cart.status.value if hasattr(cart.status, 'value') else cart.status,
-                    "purchase_date": str(cart.purchase_date) if cart.purchase_date else None,
-                    "created_at": str(cart.created_at) if cart.created_at else None,
-                    "updated_at": str(cart.updated_at) if cart.updated_at else None
-                }
 
-            receipts_list.append(receipt_data)
-
-        self.cache_manager.store_data(cache_key, json.dumps(receipts_list), ttl=150)
         # Return single object if querying by ID, otherwise return list
-        if id and receipts_list:
-            return jsonify(receipts_list[0]), 200
-        
-        return jsonify(receipts_list), 200
+        return receipts_list[0] if id else receipts_list
 
     def _add(self, data):
         """
-        Internal method to create a new receipt.
+        Internal method to create one or more receipts.
+
+        A list of receipts is inserted in a single transaction; if any of
+        them conflicts with existing records none are created.
         
         Args:
-            data (dict): Receipt data with cart_id, payment_method,
-                        and total_amount.
+            data (dict | list): Receipt data with cart_id, payment_method,
+                        and total_amount, or a list of them.
             
         Returns:
             tuple: (JSON response with new receipt data, HTTP status code)
@@ -117,27 +110,37 @@ class ReceiptRepository(Repository):
         session = self.db_manager.sessionlocal()
         model_class = self.model_class
 
-        _receipt = model_class(**data)
-        receipt = self.db_manager.insert(session, _receipt)
+        rows = data if isinstance(data, list) else [data]
+        try:
+            receipts, conflicts = self.db_manager.bulk_insert(session, model_class, rows)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        if receipt is None:
+        if receipts is None:
             return jsonify({
             "error": "Receipt already exists or violates database constraints",
-            "message": "This user may already be registered or the data conflicts with existing records"
+            "message": "No receipts were created, the listed rows conflict with existing records",
+            "conflicts": conflicts
         }), 409
 
         try:
-            self.cache_manager.delete_pattern("receipts:*")
+            self.cache_manager.invalidate("receipts")
         except redis.RedisError as e:
-            print(f"Redis Error: {e}")
+            logger.warning(f"Redis Error: {e}")
 
-        return jsonify({
-            "id": receipt.id,
-            "cart_id": receipt.cart_id,
-            "payment_method": receipt.payment_method,
-            "total_amount": receipt.total_amount,
-            "created_at": str(receipt.created_at)
-        }), 200
+        receipt_list = []
+        for receipt in receipts:
+            receipt_list.append({
+                "id": receipt.id,
+                "cart_id": receipt.cart_id,
+                "payment_method": receipt.payment_method,
+                "total_amount": receipt.total_amount,
+                "created_at": str(receipt.created_at)
+            })
+        # Return single object for a single receipt, otherwise return list
+        if not isinstance(data, list):
+            return jsonify(receipt_list[0]), 200
+        return jsonify(receipt_list), 200
 
     def _update(self, id, new_data):
         """
@@ -187,9 +190,9 @@ class ReceiptRepository(Repository):
             updated_receipt = self.db_manager.update(session, receipt)
             
             try:
-                self.cache_manager.delete_pattern("receipts:*")
+                self.cache_manager.invalidate("receipts")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             return jsonify({
                 "id": updated_receipt.id,
@@ -219,7 +222,8 @@ class ReceiptRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            receipts = self.db_manager.get_query(session, model_class, id=id)
+            receipts = self.db_manager.get_query(session, model_class, id=id,
+                                                 relationships=self.relationships)
             receipt = receipts[0]
             if not receipt:
                 raise ValueError(f"Receipt ID {id} has not been found")
@@ -227,9 +231,9 @@ class ReceiptRepository(Repository):
             msg = f"Receipt with ID {id}  has been DELETED"
 
             try:
-                self.cache_manager.delete_pattern("receipts:*")
+                self.cache_manager.invalidate("receipts")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             return jsonify({"message": msg}), 200
         except ValueError as e:
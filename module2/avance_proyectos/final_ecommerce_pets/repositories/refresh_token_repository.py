@@ -8,7 +8,7 @@ import json
 from flask import (request, jsonify)
 from repositories.repository import Repository
 from modules.models import _models
-from modules.jwt_manager import require_jwt, JWT_Manager
+from modules.jwt_manager import require_jwt, get_jwt_manager
 
 
 
@@ -59,7 +59,7 @@ class RefreshTokenRepository(Repository):
         if not _token:
             return jsonify({"error": "No token provided"}), 400
         
-        jwt_manager = JWT_Manager()
+        jwt_manager = get_jwt_manager()
         decoded = jwt_manager.decode(_token)
         email = decoded.get("email")
         records = self.db_manager.get_by_email(session, email)
@@ -8,9 +8,9 @@ import json
 from flask import (request, jsonify)
 from repositories.repository import Repository
 from modules.models import _models
-from sqlalchemy.orm import joinedload
-from modules.jwt_manager import require_jwt, JWT_Manager
-from modules.secret_keys import password_hash, verify_password
+from modules.serializers import _schemas
+from modules.jwt_manager import require_jwt, get_jwt_manager
+from modules.secret_keys import password_hash, verify_password, PasswordHasherBusy
 from modules.config import ALLOWED_ROLES
 from modules.models import _models
 
@@ -41,6 +41,15 @@ class RegistrationRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('register_user')
+        self.schema = _schemas.get('register_user')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {
+            "user": "joined",
+            "user.contacts": "selectin",
+            "user.carts": "selectin",
+            "user.carts.cart_products": "selectin",
+            "user.carts.receipt": "joined"
+        }
     
     def _get(self, id=None, email=None):
         """
@@ -53,39 +62,26 @@ class RegistrationRepository(Repository):
         Returns:
             tuple: (JSON response, HTTP status code)
         """
-        model_class = self.model_class
-        relationship_list = [model_class.user]
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream, email=email)
+        page = self._page_args(id)
         session = self.db_manager.sessionlocal()
-        registrations = self.db_manager.get_query(session, model_class, id=id, email=email,
-                                                  relationships=relationship_list)
-        
+        try:
+            registration_list = self._serialize(session, self.schema, page, id=id, email=email)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # If querying by ID and no result found
-        if id and not registrations:
+        if id and not registration_list:
             return jsonify({"error": "Registration not found"}), 404
-        
-        # Convert SQLAlchemy objects to dictionaries
-        registration_list = []
-        for registration in registrations:
-            reg_data = {
-                "registration_id": registration.id,
-                "email": registration.email,
-                "created_at": str(registration.created_at) if registration.created_at else None,
-                "updated_at": str(registration.updated_at) if registration.updated_at else None
-            }
-            
-            # Include related user data if loaded
-            if hasattr(registration, 'user') and registration.user:
-                reg_data["user"] = {
-                    "id": registration.user.id,
-                    "user_name": f"{registration.user.first_name} {registration.user.last_name}"
-                }
-            registration_list.append(reg_data)
-        
+
         # Return single object if querying by ID, otherwise return list
         if id and registration_list:
             return jsonify(registration_list[0]), 200
         
-        return jsonify(registration_list), 200
+        id_key = "id" if page["fields"] else "registration_id"
+        return self._page_response(registration_list, page, id_key=id_key)
 
     def _add(self, data):
         """
@@ -107,7 +103,10 @@ class RegistrationRepository(Repository):
         
         # Hash the password before storing
         hashed_data = data.copy()
-        hashed_data['password'] = password_hash(data['password'])
+        try:
+            hashed_data['password'] = password_hash(data['password'])
+        except PasswordHasherBusy:
+            return self._busy_response("Server is busy, try again shortly")
         
         try:
             model_class = self.model_class
@@ -117,7 +116,7 @@ class RegistrationRepository(Repository):
             registration = self.db_manager.insert(session, _registration)
             
             # Generate JWT token for the newly registered user
-            jwt_manager = JWT_Manager()
+            jwt_manager = get_jwt_manager()
             
             # Create token data
             token_data = {
@@ -180,6 +179,8 @@ class RegistrationRepository(Repository):
                     "updated_at": str(updated_reg.updated_at)
                 }), 200
             
+        except PasswordHasherBusy:
+            return self._busy_response("Server is busy, try again shortly")
         except ValueError as e:
             return jsonify({"error": str(e)}), 404
         except Exception as e:
@@ -200,7 +201,8 @@ class RegistrationRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            registrations = self.db_manager.get_query(session, model_class, id=id)
+            registrations = self.db_manager.get_query(session, model_class, id=id,
+                                                      relationships=self.relationships)
             registration = registrations[0]
             if not registration:
                 raise ValueError(f"User ID {id} has not been found")
@@ -236,8 +238,8 @@ class RegistrationRepository(Repository):
             tuple: (JSON response with new registration data, HTTP status code)
         """
         data = request.get_json()
-        new_record, http_code = self._add(data)
-        return new_record, http_code
+        # Returned as is: a busy hasher answer also carries headers
+        return self._add(data)
 
     @require_jwt("administrator")
     def put(self, id):
@@ -245,8 +247,7 @@ class RegistrationRepository(Repository):
         Update registration information (e.g., change role or password).
         """
         data = request.get_json()
-        updated_record, http_code = self._update(id, data)
-        return updated_record, http_code
+        return self._update(id, data)
 
     @require_jwt("administrator")
     def delete(self, id):
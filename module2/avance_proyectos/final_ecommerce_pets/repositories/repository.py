@@ -2,10 +2,46 @@
 
 Base repository abstract class defining the interface for all API repositories.
 Combines Flask's MethodView with abstract base class pattern for consistent API structure.
+Also provides the shared keyset pagination and field projection helpers used
+by every list endpoint, the raw-bytes response path for cached payloads, and
+the per-request profiling hook around view dispatch.
 """
 
+import enum
+import json
+import logging
+import sys
+import time
+from itertools import islice
 from abc import ABC, abstractmethod
+from datetime import date
+from urllib.parse import urlencode
+from flask import (request, jsonify, Response, current_app, stream_with_context)
 from flask.views import MethodView
+from modules.config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, STREAM_CHUNK_SIZE
+from modules.metrics import timed
+from modules import profiler, compression
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+
+def _json_default(value):
+    """
+    Encode values json.dumps does not handle natively.
+
+    Args:
+        value: Value found while encoding.
+
+    Returns:
+        JSON-compatible representation of the value.
+    """
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, date):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 class Repository(ABC, MethodView):
@@ -18,6 +54,413 @@ class Repository(ABC, MethodView):
     
     All concrete repository classes must implement get, post, put, and delete methods.
     """
+
+    def dispatch_request(self, **kwargs):
+        """
+        Dispatch to the HTTP method handler, profiling the request if asked to.
+
+        A request is profiled when an administrator sends ``X-Profile: true``
+        (the response then names the profile in ``X-Profile-File``) or when
+        it is drawn by PROFILE_SAMPLE_RATE.
+
+        Args:
+            **kwargs: URL path arguments.
+
+        Returns:
+            The handler's response.
+        """
+        requested = profiler.requested()
+        if not requested and not profiler.sampled():
+            return super().dispatch_request(**kwargs)
+        sampler = profiler.start(sys._getframe())
+        try:
+            return super().dispatch_request(**kwargs)
+        finally:
+            profiler.finish(sampler, report=requested)
+
+    def _busy_response(self, message):
+        """
+        Answer a request rejected because the password hashing queue is full.
+
+        Shared by every endpoint that hashes or verifies passwords, so they
+        all tell clients when to retry.
+
+        Args:
+            message (str): Error message for the client.
+
+        Returns:
+            tuple: (JSON error response, 503, Retry-After header)
+        """
+        return jsonify({"error": message}), 503, {"Retry-After": "1"}
+
+    def _stream_format(self, id=None):
+        """
+        Decide whether a list request is streamed.
+
+        ``Accept: application/x-ndjson`` streams one record per line;
+        ``?stream=true`` streams a regular JSON array. Lookups by ID are
+        never streamed.
+
+        Args:
+            id (int, optional): Record ID from the URL path.
+
+        Returns:
+            str: NDJSON or "application/json" when streaming, otherwise None.
+        """
+        if id:
+            return None
+        if request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON:
+            return NDJSON
+        if request.args.get("stream", "").lower() in ("1", "true"):
+            return "application/json"
+        return None
+
+    def _stream_response(self, schema, mimetype, **filters):
+        """
+        Stream a whole collection chunk by chunk.
+
+        Rows are read with a server-side cursor in batches of
+        STREAM_CHUNK_SIZE; each batch is serialized (nested relationships
+        included), encoded and sent before the next one is fetched, so
+        memory stays flat however many records exist. ``after_id``,
+        ``limit`` and ``fields`` work as for paged requests, but the limit
+        is optional and not capped.
+
+        Args:
+            schema: Schema of the response (see modules.serializers).
+            mimetype (str): NDJSON or "application/json".
+            **filters: name or email filters for get_query.
+
+        Returns:
+            tuple: (Streaming response, HTTP status code)
+        """
+        page = self._page_args()
+        page["limit"] = request.args.get("limit", type=int)
+        session = self.db_manager.sessionlocal()
+        try:
+            rows = self.db_manager.get_query(session, schema.model,
+                                             after_id=page["after_id"], limit=page["limit"],
+                                             fields=page["fields"] or schema.columns,
+                                             yield_per=STREAM_CHUNK_SIZE, **filters)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        ndjson = mimetype == NDJSON
+
+        def generate():
+            first = True
+            if not ndjson:
+                yield "["
+            while True:
+                chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+                if not chunk:
+                    break
+                if page["fields"]:
+                    records = self._project(chunk)
+                else:
+                    records = schema.dump(self.db_manager, session, chunk)
+                encoded = [json.dumps(record, separators=(",", ":"), default=_json_default)
+                           for record in records]
+                if ndjson:
+                    yield "\n".join(encoded) + "\n"
+                else:
+                    yield ("" if first else ",") + ",".join(encoded)
+                first = False
+            if not ndjson:
+                yield "]"
+
+        return Response(stream_with_context(generate()), mimetype=mimetype), 200
+
+    def _page_args(self, id=None):
+        """
+        Read pagination and projection arguments from the query string.
+
+        Supports ``?after_id=<id>&limit=<n>&fields=a,b``. The limit falls
+        back to DEFAULT_PAGE_LIMIT and is capped at MAX_PAGE_LIMIT.
+        Lookups by ID are never paged or projected.
+
+        Args:
+            id (int, optional): Record ID from the URL path.
+
+        Returns:
+            dict: after_id, limit and fields (list or None).
+        """
+        if id:
+            return {"after_id": None, "limit": None, "fields": None}
+        limit = request.args.get("limit", type=int) or DEFAULT_PAGE_LIMIT
+        fields = request.args.get("fields")
+        if fields:
+            fields = [field.strip() for field in fields.split(",") if field.strip()]
+        return {
+            "after_id": request.args.get("after_id", type=int),
+            "limit": max(1, min(limit, MAX_PAGE_LIMIT)),
+            "fields": fields or None
+        }
+
+    def _page_key(self, page):
+        """
+        Build a cache key suffix identifying a page.
+
+        Args:
+            page (dict): Arguments returned by _page_args.
+
+        Returns:
+            str: Key suffix such as ``after=0:limit=100:fields=*``.
+        """
+        fields = ",".join(page["fields"]) if page["fields"] else "*"
+        return f"after={page['after_id'] or 0}:limit={page['limit']}:fields={fields}"
+
+    def _project(self, rows):
+        """
+        Convert projected Row tuples into JSON-ready dictionaries.
+
+        Args:
+            rows (list): Rows returned by a column-restricted query.
+
+        Returns:
+            list: One dictionary per row.
+        """
+        records = []
+        for row in rows:
+            record = {}
+            for key, value in row._mapping.items():
+                if isinstance(value, enum.Enum):
+                    value = value.value
+                elif isinstance(value, date):
+                    value = str(value)
+                record[key] = value
+            records.append(record)
+        return records
+
+    def _serialize(self, session, schema, page, **filters):
+        """
+        Query and serialize a page (or one record) with column-only selects.
+
+        Requested ``fields`` are projected as-is; otherwise the schema
+        selects its columns and loads nested relationships.
+
+        Args:
+            session: SQLAlchemy session instance.
+            schema: Schema of the response (see modules.serializers).
+            page (dict): Arguments returned by _page_args.
+            **filters: id, name or email filters for get_query.
+
+        Returns:
+            list: Serialized records.
+
+        Raises:
+            ValueError: If the ID format or a requested field is invalid.
+        """
+        rows = self.db_manager.get_query(session, schema.model,
+                                         after_id=page["after_id"], limit=page["limit"],
+                                         fields=page["fields"] or schema.columns, **filters)
+        with timed("serialize"):
+            if page["fields"]:
+                return self._project(rows)
+            return schema.dump(self.db_manager, session, rows)
+
+    def _page_response(self, records, page, id_key="id"):
+        """
+        Build a paginated list response.
+
+        When the page is full, a ``Link: <...>; rel="next"`` header and an
+        ``X-Next-Cursor`` header point at the next page.
+
+        Args:
+            records (list): Serialized records for this page.
+            page (dict): Arguments returned by _page_args.
+            id_key (str): Record key holding the primary key.
+
+        Returns:
+            tuple: (JSON response with pagination headers, HTTP status code)
+        """
+        with timed("serialize"):
+            response = jsonify(records)
+        response.headers.update(self._link_headers(self._page_headers(records, page, id_key), page))
+        return response, 200
+
+    def _page_headers(self, records, page, id_key="id"):
+        """
+        Compute the request-independent pagination headers of a page.
+
+        Args:
+            records (list): Serialized records for this page.
+            page (dict): Arguments returned by _page_args.
+            id_key (str): Record key holding the primary key.
+
+        Returns:
+            dict: ``X-Next-Cursor`` when the page is full, otherwise empty.
+        """
+        if page["limit"] and records and len(records) >= page["limit"]:
+            return {"X-Next-Cursor": str(records[-1][id_key])}
+        return {}
+
+    def _link_headers(self, headers, page):
+        """
+        Add the ``Link`` header for the current request to page headers.
+
+        The link is built from the request URL, so it is never cached.
+
+        Args:
+            headers (dict): Headers returned by _page_headers.
+            page (dict): Arguments returned by _page_args.
+
+        Returns:
+            dict: Copy of the headers with ``Link`` added when there is a next page.
+        """
+        headers = dict(headers)
+        next_cursor = headers.get("X-Next-Cursor")
+        if next_cursor is not None:
+            args = request.args.to_dict()
+            args.update({"after_id": next_cursor, "limit": page["limit"]})
+            headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+        return headers
+
+    def _raw_response(self, body, headers, page):
+        """
+        Build a JSON response from already encoded bytes.
+
+        Used on cache hits so the payload is sent as stored, without
+        decoding, parsing or re-encoding it. When ``If-None-Match`` matches
+        the stored ETag the answer is ``304 Not Modified`` without a body.
+        A compressed variant carries its ``Content-Encoding`` in the
+        stored headers.
+
+        Args:
+            body (bytes): Encoded JSON payload, None for an ETag match.
+            headers (dict): Stored headers (ETag, X-Next-Cursor,
+                Content-Encoding).
+            page (dict): Arguments returned by _page_args.
+
+        Returns:
+            tuple: (JSON response, HTTP status code)
+        """
+        headers = self._link_headers(headers, page)
+        if compression.ENCODINGS:
+            headers["Vary"] = "Accept-Encoding"
+        if self._etag_matches(headers.get("ETag", "")):
+            return Response(status=304, headers=headers), 304
+        response = Response(body, mimetype="application/json", headers=headers)
+        return response, 200
+
+    def _etag_matches(self, etag):
+        """
+        Check a stored ETag against the request's ``If-None-Match`` header.
+
+        Args:
+            etag (str): Quoted ETag stored with the payload.
+
+        Returns:
+            bool: True if the client already has this payload.
+        """
+        return bool(etag) and request.if_none_match.contains_weak(etag.strip('"'))
+
+    def _cached_get(self, cache_key, page, ttl, load):
+        """
+        Serve a cache-aside read with stale-while-revalidate and single-flight.
+
+        Past its soft TTL (or when picked for early refresh) a cached
+        payload is still served while a background worker rebuilds it.
+        On a miss only one request (per key, across threads and workers)
+        runs ``load``; concurrent requests for the same key wait for it and
+        are answered with the bytes it stored. A conditional request whose
+        ``If-None-Match`` matches the cached ETag gets a 304 without the
+        database being queried or the cached body decompressed. Clients
+        accepting a compressed encoding are served the variant stored for it.
+
+        Args:
+            cache_key (str): Redis key for the payload.
+            page (dict): Arguments returned by _page_args.
+            ttl (int): Soft cache time to live in seconds.
+            load (callable): Returns the payload to cache, or an error
+                response tuple that is returned uncached.
+
+        Returns:
+            tuple: (JSON response, HTTP status code)
+        """
+        encoding = compression.negotiate()
+        etag_matches = self._etag_matches if request.if_none_match else None
+        cached_body, cached_headers, fresh = self.cache_manager.get_raw(cache_key, etag_matches,
+                                                                        encoding)
+        if cached_headers is not None:
+            logger.debug("Pull from Redis")
+            if not fresh:
+                self._refresh_in_background(cache_key, page, ttl, load)
+            return self._raw_response(cached_body, cached_headers, page)
+        with self.cache_manager.single_flight(cache_key, encoding) as (cached_body, cached_headers, _):
+            if cached_body is not None:
+                logger.debug("Pull from Redis")
+                return self._raw_response(cached_body, cached_headers, page)
+            generation = self.cache_manager.generation(cache_key)
+            start = time.perf_counter()
+            payload = load()
+            if isinstance(payload, tuple):
+                return payload
+            body, headers = self._store_payload(cache_key, payload, page, ttl,
+                                                time.perf_counter() - start, encoding=encoding,
+                                                generation=generation)
+            return self._raw_response(body, headers, page)
+
+    def _refresh_in_background(self, cache_key, page, ttl, load):
+        """
+        Rebuild a stale cache entry on a refresh worker thread.
+
+        The rebuild runs inside an application context so ``load`` can
+        build error responses and the request teardown closes its session.
+
+        Args:
+            cache_key (str): Redis key for the payload.
+            page (dict): Arguments returned by _page_args.
+            ttl (int): Soft cache time to live in seconds.
+            load (callable): Returns the payload to cache.
+        """
+        app = current_app._get_current_object()
+
+        def rebuild():
+            with app.app_context():
+                generation = self.cache_manager.generation(cache_key)
+                start = time.perf_counter()
+                payload = load()
+                if isinstance(payload, tuple):
+                    # Record is gone or the query failed, drop the stale copy
+                    self.cache_manager.delete_data(cache_key)
+                    return
+                self._store_payload(cache_key, payload, page, ttl, time.perf_counter() - start,
+                                    generation=generation)
+
+        self.cache_manager.refresh_in_background(cache_key, rebuild)
+
+    def _store_payload(self, cache_key, payload, page, ttl, build_time=0.0, id_key="id",
+                       encoding=None, generation=None):
+        """
+        Encode a payload once and cache the bytes and their compressed variants.
+
+        The same bytes and headers are sent on this miss and on every
+        later hit of the key.
+
+        Args:
+            cache_key (str): Redis key for the payload.
+            payload (list | dict): Serialized records (or one record).
+            page (dict): Arguments returned by _page_args.
+            ttl (int): Soft cache time to live in seconds.
+            build_time (float): Seconds spent loading the payload, used to
+                schedule early refresh.
+            id_key (str): Record key holding the primary key.
+            encoding (str, optional): Content-Encoding of the variant to return.
+            generation (int, optional): Namespace generation read before the
+                payload was loaded; the payload is not cached if the
+                namespace was invalidated since.
+
+        Returns:
+            tuple: (encoded body, stored headers) of the requested variant
+        """
+        with timed("serialize"):
+            body = json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+            variants = compression.encode_variants(body)
+        headers = self._page_headers(payload, page, id_key) if isinstance(payload, list) else {}
+        representations = self.cache_manager.store_raw(cache_key, body, ttl=ttl, headers=headers,
+                                                       build_time=build_time, variants=variants,
+                                                       generation=generation)
+        return representations.get(encoding, representations[None])
     
     @abstractmethod
     def get(self):
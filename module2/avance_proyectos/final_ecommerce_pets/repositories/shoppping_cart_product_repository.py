@@ -10,9 +10,10 @@ from flask import (Flask, request, jsonify)
 from datetime import date
 from repositories.repository import Repository
 from modules.models import _models
-from sqlalchemy.orm import joinedload
+from modules.serializers import _schemas
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 
 
 
@@ -41,6 +42,9 @@ class ShoppingCartProductRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('shopping_cart_product')
+        self.schema = _schemas.get('shopping_cart_product')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {}
 
     def _get(self, id=None):
         """
@@ -52,63 +56,36 @@ class ShoppingCartProductRepository(Repository):
         Returns:
             tuple: (JSON response with cart product data, HTTP status code)
         """
-        model_class = self.model_class
-        relationship_list = [model_class.product, model_class.cart]
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream)
+        page = self._page_args(id)
         session = self.db_manager.sessionlocal()
-        shopping_cart_products = self.db_manager.get_query(session, model_class, id=id,
-                                                           relationships=relationship_list)
+        try:
+            shopping_cart_product_list = self._serialize(session, self.schema, page, id=id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # If querying by ID and no result found
-        if id and not shopping_cart_products:
+        if id and not shopping_cart_product_list:
             return jsonify({"error": "Shopping Cart Product not found"}), 404
-        
-        # Convert SQLAlchemy objects to dictionaries
-        shopping_cart_product_list = []
-        for shopping_cart_product in shopping_cart_products:
-            scp_data = {
-                "id": shopping_cart_product.id,
-                "cart_id": shopping_cart_product.cart_id,
-                "product_id": shopping_cart_product.product_id,
-                "checkout": shopping_cart_product.checkout,
-                "created_at": str(shopping_cart_product.created_at) if shopping_cart_product.created_at else None,
-                "updated_at": str(shopping_cart_product.updated_at) if shopping_cart_product.updated_at else None
-            }
-            # Include related address data if loaded
-            if hasattr(shopping_cart_product, 'product') and shopping_cart_product.product:
-                scp_address = shopping_cart_product.product
-                scp_data["product"] = {
-                    "product_id": scp_address.id,
-                    "name": scp_address.name,
-                    "description": scp_address.description,
-                    "price": scp_address.price,
-                    "size": scp_address.size,
-                    "quantity": scp_address.quantity
-                }
-            # Include related cart data if loaded
-            if hasattr(shopping_cart_product, 'cart') and shopping_cart_product.cart:
-                cart = shopping_cart_product.cart
-                scp_data["cart"] = {
-                    "cart_id": cart.id,
-                    "user_id": cart.user_id,
-                    "status": cart.status.value if hasattr(cart.status, 'value') else cart.status,
-                    "purchase_date": str(cart.purchase_date) if cart.purchase_date else None,
-                    "created_at": str(cart.created_at) if cart.created_at else None,
-                    "updated_at": str(cart.updated_at) if cart.updated_at else None
-                }
-            shopping_cart_product_list.append(scp_data)
-        
+
         # Return single object if querying by ID, otherwise return list
         if id and shopping_cart_product_list:
             return jsonify(shopping_cart_product_list[0]), 200
         
-        return jsonify(shopping_cart_product_list), 200
+        return self._page_response(shopping_cart_product_list, page)
 
     def _add(self, data):
         """
-        Internal method to create a new cart product entry.
+        Internal method to create one or more cart product entries.
+
+        A list of entries is inserted in a single transaction; if any of
+        them conflicts with existing records none are created.
         
         Args:
-            data (dict): Cart product data with cart_id, product_id,
-                        quantity, and checkout status.
+            data (dict | list): Cart product data with cart_id, product_id,
+                        quantity, and checkout status, or a list of them.
             
         Returns:
             tuple: (JSON response with new cart product data, HTTP status code)
@@ -116,22 +93,33 @@ class ShoppingCartProductRepository(Repository):
         session = self.db_manager.sessionlocal()
         model_class = self.model_class
 
-        _shopping_cart_product = model_class(**data)
-        shopping_cart_product = self.db_manager.insert(session, _shopping_cart_product)
+        rows = data if isinstance(data, list) else [data]
+        try:
+            shopping_cart_products, conflicts = self.db_manager.bulk_insert(session, model_class, rows)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        if shopping_cart_product is None:
+        if shopping_cart_products is None:
             return jsonify({
                 "error": "Shopping Cart Product already exists or violates database constraints",
-                "message": "This user may already be registered or the data conflicts with existing records"
+                "message": "No cart products were created, the listed rows conflict with existing records",
+                "conflicts": conflicts
             }), 409
-        return jsonify({
+
+        shopping_cart_product_list = []
+        for shopping_cart_product in shopping_cart_products:
+            shopping_cart_product_list.append({
                 "id": shopping_cart_product.id,
                 "cart_id": shopping_cart_product.cart_id,
                 "product_id": shopping_cart_product.product_id,
                 "quantity": shopping_cart_product.quantity,
                 "checkout": shopping_cart_product.checkout,
                 "created_at": str(shopping_cart_product.created_at)
-            }), 200
+            })
+        # Return single object for a single cart product, otherwise return list
+        if not isinstance(data, list):
+            return jsonify(shopping_cart_product_list[0]), 200
+        return jsonify(shopping_cart_product_list), 200
 
     def _update(self, id, new_data):
         """
@@ -209,7 +197,8 @@ class ShoppingCartProductRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            shopping_cart_products = self.db_manager.get_query(session, model_class, id=id)
+            shopping_cart_products = self.db_manager.get_query(session, model_class, id=id,
+                                                               relationships=self.relationships)
             shopping_cart_product = shopping_cart_products[0]
             if not shopping_cart_product:
                 raise ValueError(f"Shopping Cart Product ID {id} has not been found")
@@ -11,6 +11,7 @@ from datetime import date
 from repositories.repository import Repository
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 
 
 class ShoppingCartRepository(Repository):
@@ -38,6 +39,9 @@ class ShoppingCartRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('shopping_cart')
+        self.schema = _schemas.get('shopping_cart')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {"cart_products": "selectin", "receipt": "joined"}
 
     def _get(self, id=None):
         """
@@ -49,57 +53,25 @@ class ShoppingCartRepository(Repository):
         Returns:
             tuple: (JSON response with cart data, HTTP status code)
         """
-        model_class = self.model_class
-        relationship_list= [model_class.receipt, model_class.cart_products]
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream)
+        page = self._page_args(id)
         session = self.db_manager.sessionlocal()
-        shopping_carts = self.db_manager.get_query(session, model_class, id=id,
-                                                   relationships=relationship_list)
-        
+        try:
+            shopping_cart_list = self._serialize(session, self.schema, page, id=id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # If querying by ID and no result found
-        if shopping_carts is None:
+        if id and not shopping_cart_list:
             return jsonify({"error": "Shopping Cart not found"}), 404
-        # Convert SQLAlchemy objects to dictionaries
-        shopping_cart_list = []
-        for shopping_cart in shopping_carts:
-            shopping_cart_data = {
-                "id": shopping_cart.id,
-                "user_id": shopping_cart.user_id,
-                "status": shopping_cart.status.value if hasattr(shopping_cart.status, 'value') else shopping_cart.status,
-                "purchase_date": shopping_cart.purchase_date,
-                "created_at": str(shopping_cart.created_at) if shopping_cart.created_at else None,
-                "updated_at": str(shopping_cart.updated_at) if shopping_cart.updated_at else None
-            }
-            # Include related cart data if loaded
-            if hasattr(shopping_cart, 'receipt') and shopping_cart.receipt:
-                shopping_cart_data["receipt"] = {
-                    "receipt_id": shopping_cart.receipt.id,
-                    "payment_method": shopping_cart.receipt.payment_method,
-                    "total_amount": shopping_cart.receipt.total_amount,
-                    "created_at": str(shopping_cart.receipt.created_at),
-                    "updated_at": str(shopping_cart.receipt.updated_at)
-                } 
-            # Include related address data if loaded
-            if hasattr(shopping_cart, 'cart_products') and shopping_cart.cart_products:
-                sc_cart_products = shopping_cart.cart_products
-                shopping_cart_product_list = []
-                for sc_cart_product in sc_cart_products:
-                    sp_cart_product_data = {
-                        "cart_id": sc_cart_product.cart_id,
-                        "product_id": sc_cart_product.product_id,
-                        "quantity": sc_cart_product.quantity,
-                        "created_at": str(sc_cart_product.created_at),
-                        "updated_at": str(sc_cart_product.updated_at)
-                    }
-                    shopping_cart_product_list.append(sp_cart_product_data)
-                shopping_cart_data["shopping_cart_products"] = shopping_cart_product_list
-             
-            shopping_cart_list.append(shopping_cart_data)
-        
+
         # Return single object if querying by ID, otherwise return list
         if id and shopping_cart_list:
             return jsonify(shopping_cart_list[0])
         
-        return jsonify(shopping_cart_list)
+        return self._page_response(shopping_cart_list, page)
 
     def _add(self, data):
         """
@@ -203,7 +175,8 @@ class ShoppingCartRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            shooping_carts = self.db_manager.get_query(session, model_class, id=id)
+            shooping_carts = self.db_manager.get_query(session, model_class, id=id,
+                                                       relationships=self.relationships)
             shooping_cart = shooping_carts[0]
             if not shooping_cart:
                 raise ValueError(f"Shopping Cart ID {id} has not been found")
@@ -9,6 +9,7 @@ from flask import (request, jsonify)
 from repositories.repository import Repository
 from modules.jwt_manager import require_jwt
 from modules.models import _models
+from modules.serializers import _schemas
 
 
 class UserContactRepository(Repository):
@@ -34,6 +35,9 @@ class UserContactRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('user_contact')
+        self.schema = _schemas.get('user_contact')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {}
 
     def _get(self, id=None):
         """
@@ -45,38 +49,25 @@ class UserContactRepository(Repository):
         Returns:
             tuple: (JSON response with contact data, HTTP status code)
         """
-        model_class = self.model_class
-        relationship_list = [model_class.user]
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream)
+        page = self._page_args(id)
         session = self.db_manager.sessionlocal()
-        contacts = self.db_manager.get_query(session, model_class, id=id,
-                                              relationships=relationship_list)
+        try:
+            contact_list = self._serialize(session, self.schema, page, id=id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # If querying by ID and no result found
-        if id and not contacts:
+        if id and not contact_list:
             return jsonify({"error": "User contact not found"}), 404
 
-        # Convert SQLAlchemy objects to dictionaries
-        contact_list = []
-        for contact in contacts:
-            contact_data = {
-                "id": contact.id,
-                "user_id": contact.user_id,
-                "created_at": str(contact.created_at) if contact.created_at else None,
-                "updated_at": str(contact.updated_at) if contact.updated_at else None
-            }
-            # Include related user data if loaded
-            if hasattr(contact, 'user') and contact.user:
-                contact_data["user"] = {
-                    "id": contact.user.id,
-                    "user_name": f"{contact.user.first_name} {contact.user.last_name}"
-                }
-            contact_list.append(contact_data)
-
         # Return single object if querying by ID, otherwise return list
         if id and contact_list:
             return jsonify(contact_list[0]), 200
 
-        return jsonify(contact_list), 200
+        return self._page_response(contact_list, page)
 
     def _add(self, data):
         """
@@ -177,7 +168,8 @@ class UserContactRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            contacts = self.db_manager.get_query(session, model_class, id=id)
+            contacts = self.db_manager.get_query(session, model_class, id=id,
+                                                 relationships=self.relationships)
             contact = contacts[0]
             if not contact:
                 raise ValueError(f"User contact ID {id} has not been found")
@@ -5,15 +5,17 @@ Handles CRUD operations for user personal information including name,
 telephone, and relationships to addresses and shopping carts.
 """
 
-import json
+import logging
 import redis
 from flask import (Flask, request, jsonify)
 from datetime import date
 from repositories.repository import Repository
 from modules.models import _models
+from modules.serializers import _schemas
 from modules.jwt_manager import require_jwt
 from modules.cache_manager import CacheManager
 
+logger = logging.getLogger(__name__)
 
 
 class UserRepository(Repository):
@@ -41,6 +43,14 @@ class UserRepository(Repository):
         super().__init__(*args, **kwargs)
         self.db_manager = db_manager
         self.model_class = _models.get('user')
+        self.schema = _schemas.get('user')
+        # Relationships a delete cascades to, loaded up front instead of per object
+        self.relationships = {
+            "contacts": "selectin",
+            "carts": "selectin",
+            "carts.cart_products": "selectin",
+            "carts.receipt": "joined"
+        }
         self.cache_manager = CacheManager()
 
     def _get(self, id=None, name=None):
@@ -54,78 +64,42 @@ class UserRepository(Repository):
         Returns:
             tuple: (JSON response with user data, HTTP status code)
         """
+        stream = self._stream_format(id)
+        if stream:
+            return self._stream_response(self.schema, stream, name=name)
         # Cache layer with Redis
-        cache_key = f"users:{id}" if id else "users:all"
-        try:
-            cached_data = self.cache_manager.get_data(cache_key)
-        except redis.RedisError:
-            cached_data = None
-        if cached_data:
-            print("Pull from Redis")
-            return jsonify(json.loads(cached_data)), 200
+        page = self._page_args(id)
+        cache_key = f"users:{id}" if id else f"users:all:{self._page_key(page)}"
+        return self._cached_get(cache_key, page, ttl=180,
+                                load=lambda: self._load(page, id=id, name=name))
 
-        model_class = self.model_class
-        relationship_list = [model_class.contacts, model_class.address, model_class.carts]
+    def _load(self, page, id=None, name=None):
+        """
+        Query user records and convert them to dictionaries.
+
+        Called on a cache miss by the one request rebuilding the key.
+
+        Args:
+            page (dict): Arguments returned by _page_args.
+            id (int, optional): Filter by user ID.
+            name (str, optional): Filter by name.
+
+        Returns:
+            list | dict | tuple: Serialized users, a single user when
+            querying by ID, or an error response tuple.
+        """
         session = self.db_manager.sessionlocal()
-        users = self.db_manager.get_query(session, model_class, id=id, name=name,
-                                          relationships=relationship_list)
+        try:
+            user_list = self._serialize(session, self.schema, page, id=id, name=name)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # If querying by ID and no result found
-        if id and not users:
+        if id and not user_list:
             return jsonify({"error": "User not found"}), 404
-        
-        # Convert SQLAlchemy objects to dictionaries
-        user_list = []
-        for user in users:
-            user_data = {
-                "id": user.id,
-                "registration_id": user.registration_id,
-                "user_name": f"{user.first_name} {user.last_name}",
-                "created_at": str(user.created_at) if user.created_at else None,
-                "updated_at": str(user.updated_at) if user.updated_at else None
-            }
-            # Include related address data if loaded
-            if hasattr(user, 'address') and user.address:
-                user_data["address"] = {
-                    "id": user.address.id,
-                    "street": user.address.street,
-                    "city": user.address.city,
-                    "state": user.address.state,
-                    "postal_code": user.address.postal_code,
-                    "country": user.address.country
-                }
-            # Include related contact data if loaded
-            if hasattr(user, 'contacts') and user.contacts:
-                contact_list = []
-                for contact in user.contacts:
-                    contact_data = {
-                        "contact_id": contact.id,
-                        "user_name": f"{user.first_name} {user.last_name}"
-                    }
-                    contact_list.append(contact_data)
-                user_data["contacts"] = contact_list
-            
-            # Include related cart data if loaded
-            if hasattr(user, 'carts') and user.carts:
-                cart_list = []
-                for cart in user.carts:
-                    cart_data = {
-                        "cart_id": cart.id,
-                        "status": cart.status,
-                        "purchase_date": cart.purchase_date
-                    }
-                    cart_list.append(cart_data)
-                user_data['carts'] = cart_list
-            
-            user_list.append(user_data)
-
-        self.cache_manager.store_data(cache_key, json.dumps(user_list), ttl=180)
 
         # Return single object if querying by ID, otherwise return list
-        if id and user_list:
-            return jsonify(user_list[0]), 200
-        
-        return jsonify(user_list), 200
+        return user_list[0] if id else user_list
 
     def _add(self, data):
         """
@@ -151,9 +125,9 @@ class UserRepository(Repository):
         }), 409
 
         try:
-            self.cache_manager.delete_pattern("users:*")
+            self.cache_manager.invalidate("users")
         except redis.RedisError as e:
-            print(f"Redis Error: {e}")
+            logger.warning(f"Redis Error: {e}")
 
         return jsonify({
             "id": user.id,
@@ -210,9 +184,9 @@ class UserRepository(Repository):
             updated_user = self.db_manager.update(session, user)
 
             try:
-                self.cache_manager.delete_pattern("users:*")
+                self.cache_manager.invalidate("users")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             if updated_user:
                 return jsonify({
@@ -241,16 +215,17 @@ class UserRepository(Repository):
         try:
             model_class = self.model_class
             session = self.db_manager.sessionlocal()
-            users = self.db_manager.get_query(session, model_class, id=id)
+            users = self.db_manager.get_query(session, model_class, id=id,
+                                              relationships=self.relationships)
             user = users[0]
             if not user:
                 raise ValueError(f"User ID {id} has not been found")
             self.db_manager.delete(session, user)
 
             try:
-                self.cache_manager.delete_pattern("users:*")
+                self.cache_manager.invalidate("users")
             except redis.RedisError as e:
-                print(f"Redis Error: {e}")
+                logger.warning(f"Redis Error: {e}")
 
             msg = f"User with ID {id} has been DELETED"
             return jsonify({"message": msg}), 200
@@ -0,0 +1,166 @@
+"""conftest.py
+
+Test fixtures for the E-Commerce Pets API.
+
+Every test gets an app backed by its own temporary SQLite database and an
+empty fakeredis server, so no external services are needed. Keys,
+certificates and profiles are written to a temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Settings are read when modules.config is imported, so set them first
+_TMP_DIR = tempfile.mkdtemp(prefix="e_commerce_pets_test_")
+os.environ["TESTING"] = "true"
+os.environ.setdefault("FILE_PATH", _TMP_DIR)
+os.environ.setdefault("PROFILE_DIR", os.path.join(_TMP_DIR, "profiles"))
+# Background refreshes would race the assertions on cache contents
+os.environ.setdefault("CACHE_EARLY_REFRESH_BETA", "0")
+os.chdir(_TMP_DIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+import pytest
+import redis
+from flask import Flask
+from modules import cache_manager
+from modules.config import CACHE_INVALIDATION_CHANNEL
+from modules.db_manager import DBManager
+from modules.jwt_manager import get_jwt_manager
+from modules.secret_keys import ensure_keys, password_hash
+
+ADMIN = {"email": "admin@administrator.com", "role": "administrator"}
+PRODUCTS_URL = "/e_commerce_pets/products"
+
+_redis_server = fakeredis.FakeServer()
+_redis_pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection,
+                                   server=_redis_server)
+
+
+def wait_for(condition, timeout=3.0):
+    """Poll ``condition`` until it is true or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def get(client, headers, url=PRODUCTS_URL, etag=None, accept_encoding=None):
+    """GET a URL, sending If-None-Match and Accept-Encoding when given."""
+    headers = dict(headers)
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if accept_encoding is not None:
+        headers["Accept-Encoding"] = accept_encoding
+    return client.get(url, headers=headers)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def keys():
+    """Generate the JWT signing keys once for the whole run."""
+    ensure_keys()
+
+
+@pytest.fixture
+def db_uri(tmp_path):
+    """URI of a SQLite database file private to the test."""
+    return f"sqlite:///{tmp_path}/test.db"
+
+
+@pytest.fixture
+def db_manager(db_uri):
+    """Database manager with the tables and the admin user created."""
+    manager = DBManager(db_uri=db_uri)
+    manager.create_tables()
+    manager._get_model_name("register_user")
+    session = manager.sessionlocal()
+    manager.insert(session, manager._get_model()(**ADMIN, password=password_hash("admin")))
+    yield manager
+    manager.remove_session()
+    manager.engine.dispose()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """Client of an empty fakeredis server, with fresh cache tiers and breaker."""
+    client = redis.Redis(connection_pool=_redis_pool)
+    client.flushall()
+    monkeypatch.setattr(cache_manager, "_connection_pool", lambda: _redis_pool)
+    monkeypatch.setattr(cache_manager, "local_cache", cache_manager.LocalCache())
+    monkeypatch.setattr(cache_manager, "breaker", cache_manager.CircuitBreaker())
+    monkeypatch.setattr(cache_manager, "_pending_invalidations", set())
+    monkeypatch.setattr(cache_manager, "_redis_stats", {"hits": 0, "misses": 0})
+    monkeypatch.setattr(cache_manager, "_flight_stats", {"rebuilds": 0, "coalesced": 0})
+    monkeypatch.setattr(cache_manager, "_stale_stats", dict.fromkeys(cache_manager._stale_stats, 0))
+    return client
+
+
+@pytest.fixture
+def subscribed(redis_client):
+    """Wait until this process receives invalidation messages, enabling the local tier."""
+    cache_manager.CacheManager()
+
+    def received():
+        generation = cache_manager.local_cache.generation("probe:key")
+        redis_client.publish(CACHE_INVALIDATION_CHANNEL, "probe")
+        return wait_for(lambda: cache_manager.local_cache.generation("probe:key") > generation,
+                        timeout=0.2)
+
+    assert wait_for(received)
+    assert cache_manager._local_enabled()
+
+
+@pytest.fixture
+def redis_down(redis_client):
+    """Make every Redis command fail with a ConnectionError until the test ends."""
+    _redis_server.connected = False
+    yield
+    _redis_server.connected = True
+
+
+@pytest.fixture
+def app(db_manager, redis_client):
+    """
+    Application on the test database, with empty Redis and local caches.
+
+    Built like create_app, but on the db_manager fixture so tests can seed
+    data and count statements on the same engine.
+    """
+    from e_main import API_NAME, register_api
+
+    app = Flask("e_main")
+    app.config["TESTING"] = True
+
+    @app.teardown_appcontext
+    def shutdown_session(exception=None):
+        db_manager.remove_session()
+
+    register_api(app, API_NAME, db_manager)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Test client of the application."""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(db_manager):
+    """Authorization header carrying an administrator token."""
+    token = get_jwt_manager().encode({**ADMIN, "id": 1})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def product_list(client, admin_headers):
+    """Create 20 products, enough for the cached list to be stored compressed."""
+    rows = [{"name": f"product{i}", "description": "d" * 200, "price": 10,
+             "size": "small", "quantity": 1}
+            for i in range(20)]
+    assert client.post(PRODUCTS_URL, json=rows, headers=admin_headers).status_code == 201
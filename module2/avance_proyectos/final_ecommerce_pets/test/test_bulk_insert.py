@@ -0,0 +1,90 @@
+"""test_bulk_insert.py
+
+Tests for bulk inserts: one all-or-nothing transaction per batch, with each
+conflicting row reported by its index.
+"""
+
+import pytest
+from modules.models import Product
+
+PRODUCTS_URL = "/e_commerce_pets/products"
+
+
+def product(name, price=10):
+    """Product row with the required columns."""
+    return {"name": name, "price": price, "size": "small", "quantity": 1}
+
+
+def product_names(db_manager):
+    """Names of every stored product, in insertion order."""
+    session = db_manager.sessionlocal()
+    names = [row.name for row in session.query(Product).order_by(Product.id)]
+    db_manager.remove_session()
+    return names
+
+
+class TestBulkInsert:
+    """DBManager.bulk_insert stores every row or none of them."""
+
+    def test_rows_are_inserted_and_returned(self, db_manager):
+        session = db_manager.sessionlocal()
+        records, conflicts = db_manager.bulk_insert(session, Product, [product("a"), product("b")])
+        assert conflicts == []
+        assert [record.name for record in records] == ["a", "b"]
+        assert records[0].id < records[1].id
+        assert product_names(db_manager) == ["a", "b"]
+
+    def test_conflicts_are_reported_by_index(self, db_manager):
+        session = db_manager.sessionlocal()
+        db_manager.bulk_insert(session, Product, [product("a")])
+        records, conflicts = db_manager.bulk_insert(
+            session, Product, [product("c"), product("a"), product("c")])
+        assert records is None
+        assert [conflict["index"] for conflict in conflicts] == [1, 2]
+        assert all("UNIQUE" in conflict["error"] for conflict in conflicts)
+        assert product_names(db_manager) == ["a"]
+
+    def test_empty_batch_is_a_no_op(self, db_manager):
+        assert db_manager.bulk_insert(db_manager.sessionlocal(), Product, []) == ([], [])
+
+    def test_unknown_field_is_rejected(self, db_manager):
+        with pytest.raises(ValueError, match="Row 1 has unknown field"):
+            db_manager.bulk_insert(db_manager.sessionlocal(), Product,
+                                   [product("a"), {"nam": "b"}])
+        assert product_names(db_manager) == []
+
+    def test_row_must_be_an_object(self, db_manager):
+        with pytest.raises(ValueError, match="Row 0 is not an object"):
+            db_manager.bulk_insert(db_manager.sessionlocal(), Product, ["a"])
+
+
+class TestBulkInsertEndpoint:
+    """POST with a JSON array creates every row or answers 409 with the conflicts."""
+
+    def test_array_is_created(self, client, admin_headers, db_manager):
+        response = client.post(PRODUCTS_URL, json=[product("a"), product("b")],
+                               headers=admin_headers)
+        assert response.status_code == 201
+        assert [row["name"] for row in response.get_json()] == ["a", "b"]
+        assert product_names(db_manager) == ["a", "b"]
+
+    def test_conflicting_row_rejects_the_batch(self, client, admin_headers, db_manager):
+        client.post(PRODUCTS_URL, json=[product("a")], headers=admin_headers)
+        response = client.post(PRODUCTS_URL, json=[product("new"), product("a")],
+                               headers=admin_headers)
+        assert response.status_code == 409
+        body = response.get_json()
+        assert [conflict["index"] for conflict in body["conflicts"]] == [1]
+        assert product_names(db_manager) == ["a"]
+
+    def test_unknown_field_is_a_bad_request(self, client, admin_headers, db_manager):
+        response = client.post(PRODUCTS_URL, json=[{"nam": "new"}], headers=admin_headers)
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "Row 0 has unknown field(s): nam"
+        assert product_names(db_manager) == []
+
+    def test_created_rows_invalidate_the_cached_list(self, client, admin_headers):
+        client.post(PRODUCTS_URL, json=[product("a")], headers=admin_headers)
+        assert len(client.get(PRODUCTS_URL, headers=admin_headers).get_json()) == 1
+        client.post(PRODUCTS_URL, json=[product("b"), product("c")], headers=admin_headers)
+        assert len(client.get(PRODUCTS_URL, headers=admin_headers).get_json()) == 3
@@ -0,0 +1,215 @@
+"""test_cache_manager.py
+
+Tests for CacheManager against fakeredis: namespace index sets and the
+Redis circuit breaker.
+"""
+
+import threading
+import time
+import pytest
+import redis
+from modules import cache_manager
+from modules.cache_manager import CacheManager, CircuitBreaker, CircuitOpenError
+
+
+class TestNamespaceIndex:
+    """Stored keys are registered in their namespace index for invalidate()."""
+
+    def test_keys_are_indexed(self, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        cache.store_data("products:1", "{}", ttl=60)
+        assert redis_client.smembers("products:keys") == {b"products:all", b"products:1"}
+
+    def test_index_ttl_only_grows(self, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        assert 55 < redis_client.ttl("products:keys") <= 60
+        cache.store_data("products:1", "{}", ttl=600)
+        assert 595 < redis_client.ttl("products:keys") <= 600
+        cache.store_data("products:2", "{}", ttl=60)
+        assert 595 < redis_client.ttl("products:keys") <= 600
+
+    def test_key_without_ttl_keeps_the_index(self, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        cache.store_data("products:1", "{}")
+        assert redis_client.ttl("products:keys") == -1
+
+    def test_invalidate_drops_every_indexed_key(self, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        cache.store_data("products:1", "{}", ttl=60)
+        cache.store_data("users:all", "[]", ttl=60)
+        assert cache.invalidate("products") == 2
+        assert redis_client.keys("products:*") == []
+        assert redis_client.exists("users:all")
+
+
+class TestBreakerOutcomes:
+    """Only errors reaching Redis count against it."""
+
+    def test_rejected_command_does_not_open_the_breaker(self, redis_client):
+        cache = CacheManager()
+        redis_client.sadd("products:all", "not a string")
+        for _ in range(cache_manager.breaker.failures + 1):
+            assert cache.get_data("products:all") is None  # WRONGTYPE
+        assert cache_manager.breaker.state == "closed"
+        assert cache_manager.breaker.consecutive_failures == 0
+        cache.store_data("products:1", "{}", ttl=60)
+        assert cache.get_data("products:1") == "{}"
+
+
+def guarded(breaker, error=None, delay=0.0):
+    """Run one call through the breaker, raising ``error`` from it if given."""
+    with breaker.guard():
+        time.sleep(delay)
+        if error is not None:
+            raise error
+
+
+def trip(breaker):
+    """Open a breaker with connection errors."""
+    for _ in range(breaker.failures):
+        with pytest.raises(redis.ConnectionError):
+            guarded(breaker, redis.ConnectionError())
+    assert breaker.state == "open"
+
+
+class TestCircuitBreaker:
+    """State machine of CircuitBreaker: closed, open, half_open."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failures=3, slow_call=1, cooldown=60)
+        for _ in range(2):
+            with pytest.raises(redis.ConnectionError):
+                guarded(breaker, redis.ConnectionError())
+        assert breaker.state == "closed"
+        with pytest.raises(redis.TimeoutError):
+            guarded(breaker, redis.TimeoutError())
+        assert breaker.state == "open"
+        assert breaker.opened == 1
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failures=2, slow_call=1, cooldown=60)
+        with pytest.raises(redis.ConnectionError):
+            guarded(breaker, redis.ConnectionError())
+        guarded(breaker)
+        with pytest.raises(redis.ConnectionError):
+            guarded(breaker, redis.ConnectionError())
+        assert breaker.state == "closed"
+
+    def test_slow_calls_open_the_breaker(self):
+        breaker = CircuitBreaker(failures=2, slow_call=0.01, cooldown=60)
+        guarded(breaker, delay=0.02)
+        guarded(breaker, delay=0.02)
+        assert breaker.state == "open"
+
+    def test_untimed_calls_are_not_slow(self):
+        breaker = CircuitBreaker(failures=1, slow_call=0.01, cooldown=60)
+        with breaker.guard(timed=False):
+            time.sleep(0.02)
+        assert breaker.state == "closed"
+
+    def test_open_breaker_rejects_without_calling(self):
+        breaker = CircuitBreaker(failures=1, slow_call=1, cooldown=60)
+        trip(breaker)
+        calls = []
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard():
+                calls.append(1)
+        assert calls == []
+        assert breaker.rejected == 1
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failures=1, slow_call=1, cooldown=0)
+        trip(breaker)
+        with breaker.guard():
+            assert breaker.state == "half_open"
+            with pytest.raises(CircuitOpenError):
+                guarded(breaker)
+        assert breaker.state == "closed"
+        assert breaker.rejected == 1
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failures=3, slow_call=1, cooldown=0)
+        trip(breaker)
+        with pytest.raises(redis.ConnectionError):
+            guarded(breaker, redis.ConnectionError())
+        assert breaker.state == "open"
+        assert breaker.opened == 2
+
+    def test_probe_is_released_by_unrelated_errors(self):
+        breaker = CircuitBreaker(failures=1, slow_call=1, cooldown=0)
+        trip(breaker)
+        with pytest.raises(TypeError):
+            guarded(breaker, TypeError())
+        with pytest.raises(redis.ResponseError):
+            guarded(breaker, redis.ResponseError())
+        assert breaker.state == "half_open"
+        guarded(breaker)
+        assert breaker.state == "closed"
+
+    def test_concurrent_half_open_calls_get_one_probe(self):
+        breaker = CircuitBreaker(failures=1, slow_call=1, cooldown=0)
+        trip(breaker)
+        barrier = threading.Barrier(8)
+        outcomes = []
+
+        def call():
+            barrier.wait()
+            try:
+                guarded(breaker, delay=0.05)
+                outcomes.append("probe")
+            except CircuitOpenError:
+                outcomes.append("rejected")
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert outcomes.count("probe") == 1
+        assert breaker.state == "closed"
+
+
+class TestBreakerWithRedis:
+    """CacheManager falls back to misses while Redis is down, then recovers."""
+
+    @pytest.fixture
+    def breaker(self, redis_client, monkeypatch):
+        breaker = CircuitBreaker(failures=2, slow_call=1, cooldown=60)
+        monkeypatch.setattr(cache_manager, "breaker", breaker)
+        return breaker
+
+    def test_outage_opens_the_breaker(self, breaker, redis_down):
+        cache = CacheManager()
+        for _ in range(2):
+            assert cache.get_data("products:all") is None
+        assert breaker.state == "open"
+        assert cache.get_data("products:all") is None
+        assert breaker.rejected == 1
+        assert cache_manager.cache_stats()["circuit_breaker"]["state_code"] == 2
+
+    def test_recovers_after_the_cooldown(self, breaker, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        cache_manager.local_cache.clear()
+        breaker.cooldown = 0.05
+        trip(breaker)
+        assert cache.get_data("products:all") is None
+        time.sleep(0.05)
+        assert cache.get_data("products:all") == "[]"
+        assert breaker.state == "closed"
+
+    def test_failed_invalidation_is_retried(self, breaker, redis_client):
+        cache = CacheManager()
+        cache.store_data("products:all", "[]", ttl=60)
+        breaker.cooldown = 0.05
+        trip(breaker)
+        assert cache.invalidate("products") == 0
+        assert cache_manager._pending_invalidations == {"products"}
+        time.sleep(0.05)
+        assert cache.get_data("products:all") is None
+        assert cache_manager._pending_invalidations == set()
+        assert not redis_client.exists("products:all")
@@ -0,0 +1,121 @@
+"""test_compression.py
+
+Tests for response compression: the encoding is negotiated from
+Accept-Encoding, cached endpoints serve stored variants with their own
+ETag and other responses are compressed by the after_request hook.
+"""
+
+import gzip
+import json
+import zlib
+import pytest
+from flask import jsonify
+from conftest import PRODUCTS_URL, get
+from modules import cache_manager, compression
+
+
+@pytest.fixture
+def deflate(monkeypatch):
+    """Offer a second encoding, preferred over gzip, without needing brotli."""
+    monkeypatch.setitem(compression.ENCODERS, "deflate", zlib.compress)
+    monkeypatch.setattr(compression, "ENCODINGS", ["deflate", "gzip"])
+    monkeypatch.setattr(cache_manager, "ENCODINGS", ["deflate", "gzip"])
+
+
+DECODERS = {None: lambda data: data, "gzip": gzip.decompress, "deflate": zlib.decompress}
+
+
+def body(response):
+    """Decoded JSON body of a possibly compressed response."""
+    return json.loads(DECODERS[response.headers.get("Content-Encoding")](response.data))
+
+
+class TestCachedVariants:
+    """Cached endpoints pick a stored variant per Accept-Encoding."""
+
+    def test_identity_without_accept_encoding(self, client, admin_headers, product_list):
+        response = get(client, admin_headers)
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert len(response.get_json()) == 20
+
+    def test_gzip_variant(self, client, admin_headers, product_list):
+        identity = get(client, admin_headers)
+        for _ in range(2):  # cache fill, then cache hit
+            response = get(client, admin_headers, accept_encoding="gzip")
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert len(response.data) < len(identity.data)
+            assert body(response) == identity.get_json()
+
+    def test_variants_have_their_own_etag(self, client, admin_headers, product_list):
+        identity_etag = get(client, admin_headers).headers["ETag"]
+        gzip_etag = get(client, admin_headers, accept_encoding="gzip").headers["ETag"]
+        assert gzip_etag != identity_etag
+        assert get(client, admin_headers, accept_encoding="gzip", etag=gzip_etag).status_code == 304
+        assert get(client, admin_headers, etag=gzip_etag).status_code == 200
+        assert get(client, admin_headers, accept_encoding="gzip", etag=identity_etag).status_code == 200
+
+    def test_small_body_is_sent_as_is(self, client, admin_headers, product_list):
+        response = get(client, admin_headers, accept_encoding="gzip", url=f"{PRODUCTS_URL}/1")
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        assert response.get_json()["id"] == 1
+
+    def test_update_replaces_every_variant(self, client, admin_headers, product_list):
+        get(client, admin_headers, accept_encoding="gzip")
+        response = client.put(f"{PRODUCTS_URL}/1", json={"price": 11}, headers=admin_headers)
+        assert response.status_code == 200
+        assert body(get(client, admin_headers, accept_encoding="gzip"))[0]["price"] == 11
+
+
+class TestNegotiation:
+    """Client quality values decide, ties go to the RESPONSE_ENCODINGS order."""
+
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        ("gzip, deflate", "deflate"),
+        ("deflate;q=0.5, gzip", "gzip"),
+        ("gzip", "gzip"),
+        ("*", "deflate"),
+        ("identity", None),
+        ("gzip;q=0, deflate;q=0", None),
+    ])
+    def test_encoding_choice(self, client, admin_headers, product_list, deflate,
+                             accept_encoding, expected):
+        response = get(client, admin_headers, accept_encoding=accept_encoding)
+        assert response.headers.get("Content-Encoding") == expected
+        assert len(body(response)) == 20
+
+    @pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+    def test_brotli_is_preferred(self, client, admin_headers, product_list):
+        response = get(client, admin_headers, accept_encoding="gzip, br")
+        assert response.headers["Content-Encoding"] == "br"
+        assert len(json.loads(compression.brotli.decompress(response.data))) == 20
+
+
+class TestUncachedResponses:
+    """The after_request hook compresses responses built outside the cache."""
+
+    @pytest.fixture
+    def report(self, app):
+        """Route returning a large uncached JSON body."""
+        @app.route("/report")
+        def report():
+            return jsonify([{"line": i, "text": "x" * 100} for i in range(50)])
+        return app.test_client()
+
+    def test_large_response_is_compressed(self, report):
+        response = report.get("/report", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert len(body(response)) == 50
+
+    def test_response_is_sent_as_is_when_not_accepted(self, report):
+        response = report.get("/report")
+        assert "Content-Encoding" not in response.headers
+        assert len(response.get_json()) == 50
+
+    def test_error_response_is_not_compressed(self, client):
+        response = get(client, {}, accept_encoding="gzip")
+        assert response.status_code == 401
+        assert "Content-Encoding" not in response.headers
@@ -0,0 +1,68 @@
+"""test_conditional_get.py
+
+Tests for conditional GETs on cached endpoints: a matching If-None-Match
+is answered 304 from the cached ETag, without SQL or the cached body.
+"""
+
+from conftest import PRODUCTS_URL, get
+from modules import cache_manager
+
+
+class TestConditionalGet:
+    """If-None-Match on cached list and detail endpoints."""
+
+    def test_matching_etag_returns_304(self, client, admin_headers, product_list, db_manager):
+        etag = get(client, admin_headers).headers["ETag"]
+        db_manager.reset_statement_count()
+        response = get(client, admin_headers, etag=etag)
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+        assert db_manager.statement_count() == 0
+
+    def test_304_from_redis_skips_decompression(self, client, admin_headers, product_list,
+                                                db_manager, monkeypatch):
+        etag = get(client, admin_headers).headers["ETag"]
+        # Drop the in-process copy so the ETag is read from Redis
+        monkeypatch.setattr(cache_manager, "local_cache", cache_manager.LocalCache())
+        decompressed = []
+        for name, decompress in list(cache_manager._DECOMPRESSORS.items()):
+            if decompress is not None:
+                monkeypatch.setitem(cache_manager._DECOMPRESSORS, name,
+                                    lambda data, decompress=decompress:
+                                    decompressed.append(data) or decompress(data))
+        db_manager.reset_statement_count()
+        response = get(client, admin_headers, etag=etag)
+        assert response.status_code == 304
+        assert decompressed == []
+        assert db_manager.statement_count() == 0
+        # The body itself is still stored compressed
+        assert get(client, admin_headers, etag='"other"').status_code == 200
+        assert decompressed
+
+    def test_etag_lists_and_weak_etags_match(self, client, admin_headers, product_list):
+        etag = get(client, admin_headers).headers["ETag"]
+        assert get(client, admin_headers, etag=f'"other", W/{etag}').status_code == 304
+        assert get(client, admin_headers, etag="*").status_code == 304
+
+    def test_other_etag_returns_the_body(self, client, admin_headers, product_list):
+        expected = get(client, admin_headers)
+        response = get(client, admin_headers, etag='"other"')
+        assert response.status_code == 200
+        assert response.get_json() == expected.get_json()
+        assert response.headers["ETag"] == expected.headers["ETag"]
+
+    def test_update_changes_the_etag(self, client, admin_headers, product_list):
+        url = f"{PRODUCTS_URL}/1"
+        etag = get(client, admin_headers, url).headers["ETag"]
+        assert get(client, admin_headers, url, etag).status_code == 304
+        response = client.put(url, json={"price": 11}, headers=admin_headers)
+        assert response.status_code == 200
+        response = get(client, admin_headers, url, etag)
+        assert response.status_code == 200
+        assert response.get_json()["price"] == 11
+        assert response.headers["ETag"] != etag
+
+    def test_authentication_runs_before_the_etag_check(self, client, admin_headers, product_list):
+        etag = get(client, admin_headers).headers["ETag"]
+        assert get(client, {}, etag=etag).status_code == 401
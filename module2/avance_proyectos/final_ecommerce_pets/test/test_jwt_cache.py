@@ -0,0 +1,95 @@
+"""test_jwt_cache.py
+
+Tests for the verified-token cache: LRU eviction, expiry at the ``exp``
+claim, clearing on key reload and its /metrics gauges.
+"""
+
+import os
+import time
+import pytest
+from modules.jwt_manager import (VerifiedTokenCache, get_jwt_manager, key_store,
+                                 token_cache, verify_token)
+
+
+@pytest.fixture
+def cache():
+    """Enabled cache holding at most two tokens."""
+    return VerifiedTokenCache(maxsize=2, enabled=True)
+
+
+def payload(expires_in=60):
+    """Token payload expiring ``expires_in`` seconds from now."""
+    return {"id": 1, "exp": time.time() + expires_in}
+
+
+class TestVerifiedTokenCache:
+    """VerifiedTokenCache lookups and limits."""
+
+    def test_least_recently_used_token_is_evicted(self, cache):
+        first, second = payload(), payload()
+        cache.put("first", first)
+        cache.put("second", second)
+        assert cache.get("first") is first
+        cache.put("third", payload())
+        assert cache.get("second") is None
+        assert cache.get("first") is first
+        assert cache.stats()["size"] == 2
+
+    def test_token_expires_at_exp(self, cache):
+        cache.put("token", payload(expires_in=0.05))
+        assert cache.get("token") is not None
+        time.sleep(0.06)
+        assert cache.get("token") is None
+        assert cache.stats()["size"] == 0
+
+    def test_token_without_exp_is_not_cached(self, cache):
+        cache.put("token", {"id": 1})
+        assert cache.get("token") is None
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = VerifiedTokenCache(maxsize=2, enabled=False)
+        cache.put("token", payload())
+        assert cache.get("token") is None
+        assert cache.stats()["misses"] == 0
+
+    def test_stats(self, cache):
+        cache.put("token", payload())
+        cache.get("token")
+        cache.get("other")
+        assert cache.stats() == {"enabled": True, "size": 1, "hits": 1, "misses": 1,
+                                 "hit_ratio": 0.5}
+
+
+class TestKeyReload:
+    """Reloading the signing keys drops every cached token."""
+
+    @pytest.fixture
+    def enabled(self, monkeypatch):
+        monkeypatch.setattr(token_cache, "enabled", True)
+        token_cache.clear()
+
+    def test_reload_clears_the_cache(self, enabled):
+        token = get_jwt_manager().encode({"id": 1, "role": "client"})
+        verify_token(token)
+        hits = token_cache.hits
+        verify_token(token)
+        assert token_cache.hits == hits + 1
+        private_file = f"{key_store.path}/private.pem"
+        stat = os.stat(private_file)
+        os.utime(private_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        key_store.refresh(force=True)
+        assert token_cache.stats()["size"] == 0
+        misses = token_cache.misses
+        assert verify_token(token)["id"] == 1
+        assert token_cache.misses == misses + 1
+
+
+class TestMetrics:
+    """The cache counters are exported as gauges."""
+
+    def test_counters_are_scraped(self, client, admin_headers):
+        response = client.get("/e_commerce_pets/metrics", headers=admin_headers)
+        assert response.status_code == 200
+        text = response.get_data(as_text=True)
+        for name in ("jwt_cache_hits", "jwt_cache_misses", "jwt_cache_size"):
+            assert f'{name}{{worker="{os.getpid()}"}}' in text
@@ -0,0 +1,119 @@
+"""test_local_cache.py
+
+Tests for the in-process cache tier: LRU and TTL limits, namespace
+generations and invalidation through Redis pub/sub.
+"""
+
+import time
+from conftest import wait_for
+from modules import cache_manager
+from modules.cache_manager import CacheManager, LocalCache
+from modules.config import CACHE_INVALIDATION_CHANNEL
+
+
+class TestLocalCache:
+    """LocalCache limits and generations."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalCache(maxsize=2, ttl=60, max_bytes=100)
+        cache.put("products:1", "a")
+        cache.put("products:2", "b")
+        assert cache.get("products:1") == "a"
+        cache.put("products:3", "c")
+        assert cache.get("products:2") is None
+        assert cache.get("products:1") == "a"
+        assert cache.get("products:3") == "c"
+
+    def test_entries_expire(self):
+        cache = LocalCache(maxsize=2, ttl=0.05, max_bytes=100)
+        cache.put("products:1", "a")
+        time.sleep(0.06)
+        assert cache.get("products:1") is None
+        assert len(cache) == 0
+
+    def test_large_values_are_not_kept(self):
+        cache = LocalCache(maxsize=2, ttl=60, max_bytes=3)
+        cache.put("products:1", "abcd")
+        cache.put("products:2", ("x",), size=3)
+        assert cache.get("products:1") is None
+        assert cache.get("products:2") == ("x",)
+
+    def test_invalidate_drops_only_its_namespace(self):
+        cache = LocalCache(maxsize=4, ttl=60, max_bytes=100)
+        cache.put("products:1", "a")
+        cache.put("users:1", "b")
+        cache.invalidate("products")
+        assert cache.get("products:1") is None
+        assert cache.get("users:1") == "b"
+
+    def test_put_with_an_old_generation_is_skipped(self):
+        cache = LocalCache(maxsize=4, ttl=60, max_bytes=100)
+        generation = cache.generation("products:1")
+        cache.invalidate("products")
+        cache.put("products:1", "stale", generation)
+        assert cache.get("products:1") is None
+        cache.put("products:1", "fresh", cache.generation("products:1"))
+        assert cache.get("products:1") == "fresh"
+
+    def test_clear_bumps_every_generation(self):
+        cache = LocalCache(maxsize=4, ttl=60, max_bytes=100)
+        cache.invalidate("products")
+        generation = cache.generation("products:1")
+        cache.clear()
+        cache.put("products:1", "stale", generation)
+        assert cache.get("products:1") is None
+
+    def test_uncounted_lookups(self):
+        cache = LocalCache(maxsize=4, ttl=60, max_bytes=100)
+        cache.get("products:1", count=False)
+        cache.put("products:1", "a")
+        cache.get("products:1", count=False)
+        assert (cache.hits, cache.misses) == (0, 0)
+
+
+class TestLocalTier:
+    """CacheManager keeps Redis hits locally while subscribed to invalidations."""
+
+    def test_hit_is_kept_locally(self, redis_client, subscribed):
+        cache = CacheManager()
+        redis_client.set("products:1", "{}")
+        assert cache.get_data("products:1") == "{}"
+        redis_client.set("products:1", "changed without invalidation")
+        assert cache.get_data("products:1") == "{}"
+        assert cache_manager.local_cache.hits == 1
+
+    def test_published_invalidation_drops_local_values(self, redis_client, subscribed):
+        cache = CacheManager()
+        cache.store_data("products:1", "{}", ttl=60)
+        assert cache_manager.local_cache.get("products:1", count=False) == "{}"
+        generation = cache_manager.local_cache.generation("products:1")
+        # As another worker does after a write
+        redis_client.publish(CACHE_INVALIDATION_CHANNEL, "products")
+        assert wait_for(lambda: cache_manager.local_cache.generation("products:1") > generation)
+        assert cache_manager.local_cache.get("products:1", count=False) is None
+
+    def test_invalidation_during_a_read_is_not_undone(self, redis_client, subscribed):
+        cache = CacheManager()
+        cache.store_raw("products:all", b"[]", ttl=60)
+        cache_manager.local_cache.clear()
+
+        def invalidated_meanwhile(etag):
+            cache_manager.local_cache.invalidate("products")
+            return False
+
+        body, _, _ = cache.get_raw("products:all", etag_matches=invalidated_meanwhile)
+        assert body == b"[]"
+        assert cache_manager.local_cache.get("products:all", count=False) is None
+
+    def test_rebuild_from_before_an_invalidation_is_not_stored(self, redis_client, subscribed):
+        cache = CacheManager()
+        generation = cache.generation("products:all")
+        cache.invalidate("products")
+        cache.store_raw("products:all", b"stale", ttl=60, generation=generation)
+        assert cache_manager.local_cache.get("products:all", count=False) is None
+        assert not redis_client.exists("products:all")
+
+    def test_lost_subscription_clears_the_local_tier(self, redis_client, subscribed):
+        cache_manager.local_cache.put("products:1", "{}")
+        cache_manager._on_subscriber_error(ConnectionError(), None, None)
+        assert cache_manager.local_cache.get("products:1", count=False) is None
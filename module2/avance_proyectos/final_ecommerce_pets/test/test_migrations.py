@@ -0,0 +1,40 @@
+"""test_migrations.py
+
+Tests for the versioned schema migrations: the schema_migrations history
+belongs to migrate() alone, not to the model tables.
+"""
+
+from sqlalchemy import inspect
+import pytest
+from modules import migrations
+
+
+@pytest.fixture(autouse=True)
+def release_session(db_manager):
+    """End the admin insert's session so its SQLite read lock does not block DDL."""
+    db_manager.remove_session()
+
+
+def has_history(db_manager):
+    """Whether the schema_migrations table exists."""
+    return inspect(db_manager.engine).has_table(migrations.schema_migrations.name)
+
+
+class TestMigrate:
+    """migrate() records each applied version once."""
+
+    def test_fresh_database_is_migrated(self, db_manager):
+        applied = migrations.migrate(db_manager)
+        assert [number for number, _ in applied] == [number for number, _, _ in migrations.MIGRATIONS]
+        assert migrations.current_version(db_manager) == migrations.LATEST_VERSION
+        assert migrations.migrate(db_manager) == []
+
+    def test_create_tables_does_not_create_the_history(self, db_manager):
+        assert not has_history(db_manager)
+        assert migrations.current_version(db_manager) == 0
+
+    def test_drop_tables_keeps_the_history(self, db_manager):
+        migrations.migrate(db_manager)
+        db_manager.drop_tables()
+        assert has_history(db_manager)
+        assert migrations.current_version(db_manager) == migrations.LATEST_VERSION
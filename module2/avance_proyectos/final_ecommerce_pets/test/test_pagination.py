@@ -0,0 +1,93 @@
+"""test_pagination.py
+
+Tests for keyset pagination of the list endpoints: ``after_id`` cursors,
+the ``X-Next-Cursor`` and ``Link`` headers and the page size limits.
+"""
+
+import pytest
+from urllib.parse import urlsplit
+import repositories.repository
+
+PRODUCTS_URL = "/e_commerce_pets/products"
+
+
+@pytest.fixture
+def products(client, admin_headers):
+    """Create five products and return their IDs."""
+    rows = [{"name": f"product{i}", "price": 10 + i, "size": "small", "quantity": 1}
+            for i in range(5)]
+    response = client.post(PRODUCTS_URL, json=rows, headers=admin_headers)
+    assert response.status_code == 201
+    return [row["id"] for row in response.get_json()]
+
+
+def next_url(response):
+    """Path and query of the ``rel="next"`` Link header, None on the last page."""
+    link = response.headers.get("Link")
+    if link is None:
+        return None
+    url = urlsplit(link[link.index("<") + 1:link.index(">")])
+    return f"{url.path}?{url.query}"
+
+
+class TestKeysetPagination:
+    """List endpoints page by primary key with an after_id cursor."""
+
+    def test_first_page_points_at_the_next(self, client, admin_headers, products):
+        response = client.get(f"{PRODUCTS_URL}?limit=2", headers=admin_headers)
+        assert response.status_code == 200
+        assert [row["id"] for row in response.get_json()] == products[:2]
+        assert response.headers["X-Next-Cursor"] == str(products[1])
+        assert next_url(response) == f"{PRODUCTS_URL}?limit=2&after_id={products[1]}"
+
+    def test_following_links_returns_every_record_once(self, client, admin_headers, products):
+        url, seen, pages = f"{PRODUCTS_URL}?limit=2", [], 0
+        while url:
+            response = client.get(url, headers=admin_headers)
+            assert response.status_code == 200
+            seen += [row["id"] for row in response.get_json()]
+            url, pages = next_url(response), pages + 1
+        assert seen == products
+        assert pages == 3
+
+    def test_last_page_has_no_cursor(self, client, admin_headers, products):
+        response = client.get(f"{PRODUCTS_URL}?limit=2&after_id={products[3]}",
+                              headers=admin_headers)
+        assert [row["id"] for row in response.get_json()] == products[4:]
+        assert "X-Next-Cursor" not in response.headers
+        assert "Link" not in response.headers
+
+    def test_cursor_past_the_end_returns_empty_page(self, client, admin_headers, products):
+        response = client.get(f"{PRODUCTS_URL}?after_id={products[-1]}", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.get_json() == []
+
+    def test_cursor_survives_deleted_rows(self, client, admin_headers, products):
+        first = client.get(f"{PRODUCTS_URL}?limit=2", headers=admin_headers)
+        response = client.delete(f"{PRODUCTS_URL}/{products[0]}", headers=admin_headers)
+        assert response.status_code == 200
+        second = client.get(next_url(first), headers=admin_headers)
+        assert [row["id"] for row in second.get_json()] == products[2:4]
+
+    def test_link_keeps_field_selection(self, client, admin_headers, products):
+        response = client.get(f"{PRODUCTS_URL}?limit=2&fields=name", headers=admin_headers)
+        assert response.get_json() == [{"id": products[0], "name": "product0"},
+                                        {"id": products[1], "name": "product1"}]
+        second = client.get(next_url(response), headers=admin_headers)
+        assert second.get_json() == [{"id": products[2], "name": "product2"},
+                                     {"id": products[3], "name": "product3"}]
+
+    def test_unknown_field_is_rejected(self, client, admin_headers, products):
+        response = client.get(f"{PRODUCTS_URL}?fields=bogus", headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_limit_is_capped(self, client, admin_headers, products, monkeypatch):
+        monkeypatch.setattr(repositories.repository, "MAX_PAGE_LIMIT", 3)
+        response = client.get(f"{PRODUCTS_URL}?limit=1000", headers=admin_headers)
+        assert [row["id"] for row in response.get_json()] == products[:3]
+        assert response.headers["X-Next-Cursor"] == str(products[2])
+
+    def test_default_limit_applies(self, client, admin_headers, products, monkeypatch):
+        monkeypatch.setattr(repositories.repository, "DEFAULT_PAGE_LIMIT", 4)
+        response = client.get(PRODUCTS_URL, headers=admin_headers)
+        assert [row["id"] for row in response.get_json()] == products[:4]
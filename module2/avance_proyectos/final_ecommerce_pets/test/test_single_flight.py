@@ -0,0 +1,114 @@
+"""test_single_flight.py
+
+Tests for single-flight rebuilds of missed keys: concurrent misses run one
+rebuild, and each request counts one miss per tier.
+"""
+
+import threading
+import time
+import redis
+from modules import cache_manager
+from modules.cache_manager import CacheManager
+
+PRODUCTS_URL = "/e_commerce_pets/products"
+
+
+def read_through(cache, key, rebuilds, delay=0.05):
+    """Cache-aside read of ``key`` as Repository._cached_get does it."""
+    body, _, _ = cache.get_raw(key)
+    if body is not None:
+        return body
+    with cache.single_flight(key) as (body, _, _):
+        if body is not None:
+            return body
+        rebuilds.append(threading.get_ident())
+        time.sleep(delay)
+        return cache.store_raw(key, b"[1,2,3]", ttl=60)[None][0]
+
+
+def run_concurrently(count, target):
+    """Start ``count`` threads on ``target`` together and return their results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Concurrent misses of one key are coalesced behind a single rebuild."""
+
+    def test_concurrent_misses_rebuild_once(self, redis_client):
+        cache, rebuilds = CacheManager(), []
+        results = run_concurrently(8, lambda: read_through(cache, "products:all", rebuilds))
+        assert results == [b"[1,2,3]"] * 8
+        assert len(rebuilds) == 1
+        stats = cache_manager.cache_stats()["single_flight"]
+        assert stats["rebuilds"] == 1
+        assert stats["coalesced"] + stats["rebuilds"] <= 8
+
+    def test_other_keys_are_not_blocked(self, redis_client):
+        cache, rebuilds = CacheManager(), []
+        keys = iter(["products:1", "products:2", "products:3", "products:4"])
+        lock = threading.Lock()
+
+        def next_key():
+            with lock:
+                return next(keys)
+
+        start = time.monotonic()
+        run_concurrently(4, lambda: read_through(cache, next_key(), rebuilds, delay=0.2))
+        assert len(rebuilds) == 4
+        assert time.monotonic() - start < 0.6
+
+    def test_waits_for_a_rebuild_in_another_process(self, redis_client):
+        cache, rebuilds = CacheManager(), []
+        other_worker = redis.Redis(connection_pool=redis_client.connection_pool)
+        lock = other_worker.lock("products:all:lock", timeout=10, thread_local=False)
+        assert lock.acquire(blocking=False)
+
+        def finish_rebuild():
+            time.sleep(0.1)
+            CacheManager().store_raw("products:all", b"[]", ttl=60)
+            lock.release()
+
+        threading.Thread(target=finish_rebuild).start()
+        assert read_through(cache, "products:all", rebuilds) == b"[]"
+        assert rebuilds == []
+        assert cache_manager.cache_stats()["single_flight"]["coalesced"] == 1
+
+    def test_rebuilds_when_redis_is_down(self, redis_client, redis_down):
+        cache, rebuilds = CacheManager(), []
+        assert read_through(cache, "products:all", rebuilds) == b"[1,2,3]"
+        assert len(rebuilds) == 1
+
+
+class TestMissAccounting:
+    """A cold fill counts one miss per tier; the single-flight re-check is not counted."""
+
+    def test_cold_fill_counts_one_miss_per_tier(self, redis_client, subscribed):
+        cache, rebuilds = CacheManager(), []
+        read_through(cache, "products:all", rebuilds)
+        stats = cache_manager.cache_stats()
+        assert (stats["local"]["hits"], stats["local"]["misses"]) == (0, 1)
+        assert (stats["redis"]["hits"], stats["redis"]["misses"]) == (0, 1)
+        read_through(cache, "products:all", rebuilds)
+        stats = cache_manager.cache_stats()
+        assert (stats["local"]["hits"], stats["local"]["misses"]) == (1, 1)
+        assert stats["redis"]["misses"] == 1
+
+    def test_endpoint_counts_one_miss_then_hits(self, client, admin_headers, subscribed):
+        for _ in range(3):
+            assert client.get(PRODUCTS_URL, headers=admin_headers).status_code == 200
+        stats = cache_manager.cache_stats()
+        assert (stats["local"]["hits"], stats["local"]["misses"]) == (2, 1)
+        assert (stats["redis"]["hits"], stats["redis"]["misses"]) == (0, 1)
+        assert stats["single_flight"] == {"rebuilds": 1, "coalesced": 0}
@@ -0,0 +1,124 @@
+"""test_sql_budget.py
+
+Tests for the N+1 query guards: the per-request SQL_STATEMENT_LIMIT and
+the raiseload policy of the write query loader options.
+"""
+
+import pytest
+from flask import jsonify
+from sqlalchemy.exc import InvalidRequestError
+import e_main
+from modules.models import Product, ShoppingCart, User, Address, UserRegistration
+
+STATEMENT_LIMIT = 5
+
+
+@pytest.fixture(autouse=True)
+def statement_limit(monkeypatch):
+    """Enable the statement budget before the app registers its hooks."""
+    monkeypatch.setattr(e_main, "SQL_STATEMENT_LIMIT", STATEMENT_LIMIT)
+
+
+@pytest.fixture
+def n_plus_one_app(app, db_manager):
+    """App with a route that lazy loads one relationship per product."""
+    @app.route("/n_plus_one")
+    def n_plus_one():
+        products = db_manager.sessionlocal().query(Product).order_by(Product.id).all()
+        return jsonify([len(product.cart_products) for product in products])
+    return app
+
+
+def add_products(db_manager, count):
+    """Insert ``count`` products."""
+    session = db_manager.sessionlocal()
+    db_manager.bulk_insert(session, Product, [
+        {"name": f"product{i}", "price": 10, "size": "small", "quantity": 1}
+        for i in range(count)
+    ])
+    db_manager.remove_session()
+
+
+@pytest.fixture
+def user(db_manager):
+    """A user with one address and one shopping cart."""
+    session = db_manager.sessionlocal()
+    address = Address(street="1 Main", city="San Jose", state="SJ",
+                      postal_code="10101", country="CR")
+    registration = UserRegistration(email="client@example.com", password="x", role="client")
+    session.add_all([address, registration])
+    session.flush()
+    user = User(registration_id=registration.id, first_name="Ana", last_name="Mora",
+                telephone="88880000", address_id=address.id)
+    session.add(user)
+    session.flush()
+    session.add(ShoppingCart(user_id=user.id))
+    session.commit()
+    user_id = user.id
+    db_manager.remove_session()
+    return user_id
+
+
+class TestStatementLimit:
+    """The after_request hook fails requests over SQL_STATEMENT_LIMIT."""
+
+    def test_request_within_limit_succeeds(self, n_plus_one_app, db_manager):
+        add_products(db_manager, 1)
+        response = n_plus_one_app.test_client().get("/n_plus_one")
+        assert response.status_code == 200
+        assert response.get_json() == [0]
+
+    def test_n_plus_one_returns_500(self, n_plus_one_app, db_manager):
+        add_products(db_manager, STATEMENT_LIMIT + 1)
+        response = n_plus_one_app.test_client().get("/n_plus_one")
+        assert response.status_code == 500
+        error = response.get_json()["error"]
+        assert error.startswith("Request issued")
+        assert f"(limit {STATEMENT_LIMIT})" in error
+
+    def test_counter_resets_between_requests(self, n_plus_one_app, db_manager):
+        add_products(db_manager, 1)
+        client = n_plus_one_app.test_client()
+        for _ in range(STATEMENT_LIMIT + 1):
+            assert client.get("/n_plus_one").status_code == 200
+
+    def test_list_endpoint_stays_within_limit(self, client, admin_headers, db_manager):
+        add_products(db_manager, 20)
+        response = client.get("/e_commerce_pets/products", headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == 20
+
+
+class TestRaiseloadPolicy:
+    """get_query loads only the declared relationships and raises on the rest."""
+
+    def test_undeclared_relationship_raises(self, db_manager, user):
+        session = db_manager.sessionlocal()
+        record = db_manager.get_query(session, User, id=user)[0]
+        with pytest.raises(InvalidRequestError):
+            record.carts
+
+    def test_declared_relationship_is_loaded(self, db_manager, user):
+        session = db_manager.sessionlocal()
+        record = db_manager.get_query(session, User, id=user,
+                                      relationships={"carts": "selectin"})[0]
+        db_manager.reset_statement_count()
+        assert len(record.carts) == 1
+        assert db_manager.statement_count() == 0
+
+    def test_relationship_below_declared_path_raises(self, db_manager, user):
+        session = db_manager.sessionlocal()
+        record = db_manager.get_query(session, User, id=user,
+                                      relationships={"carts": "selectin"})[0]
+        with pytest.raises(InvalidRequestError):
+            record.carts[0].cart_products
+
+    def test_unknown_relationship_is_rejected(self, db_manager, user):
+        session = db_manager.sessionlocal()
+        with pytest.raises(ValueError, match="Unknown relationship: nope"):
+            db_manager.get_query(session, User, id=user, relationships={"nope": "selectin"})
+
+    def test_unknown_strategy_is_rejected(self, db_manager, user):
+        session = db_manager.sessionlocal()
+        with pytest.raises(ValueError, match="Unknown loading strategy: lazy"):
+            db_manager.get_query(session, User, id=user, relationships={"carts": "lazy"})
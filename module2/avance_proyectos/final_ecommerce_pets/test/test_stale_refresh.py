@@ -0,0 +1,138 @@
+"""test_stale_refresh.py
+
+Tests for stale-while-revalidate: entries past their soft TTL are still
+served while one background worker rebuilds them.
+"""
+
+import threading
+import time
+import pytest
+from conftest import wait_for
+from modules import cache_manager
+from modules.cache_manager import CacheManager
+from modules.models import Product
+
+PRODUCTS_URL = "/e_commerce_pets/products"
+
+
+def refreshed(count=1):
+    """True once ``count`` background refreshes completed."""
+    return wait_for(lambda: cache_manager.cache_stats()["stale_while_revalidate"]["refreshes"] >= count)
+
+
+class TestFreshness:
+    """_is_fresh decides between serving as is and refreshing."""
+
+    def test_before_and_after_the_soft_ttl(self, redis_client):
+        assert cache_manager._is_fresh({"fresh_until": time.time() + 60, "delta": 0.0})
+        assert not cache_manager._is_fresh({"fresh_until": time.time() - 1, "delta": 0.0})
+        assert cache_manager.cache_stats()["stale_while_revalidate"]["stale_served"] == 1
+
+    def test_slow_rebuilds_refresh_early(self, redis_client, monkeypatch):
+        meta = {"fresh_until": time.time() + 1, "delta": 1000.0}
+        assert cache_manager._is_fresh(meta)  # CACHE_EARLY_REFRESH_BETA=0 in tests
+        monkeypatch.setattr(cache_manager, "CACHE_EARLY_REFRESH_BETA", 1.0)
+        assert not cache_manager._is_fresh(meta)
+        assert cache_manager.cache_stats()["stale_while_revalidate"]["early_refreshes"] == 1
+
+    def test_stale_entry_is_still_returned(self, redis_client, monkeypatch):
+        monkeypatch.setattr(cache_manager, "CACHE_HARD_TTL_FACTOR", 100)
+        cache = CacheManager()
+        cache.store_raw("products:all", b"[]", ttl=0.05)
+        time.sleep(0.06)
+        assert redis_client.exists("products:all")  # kept until the hard TTL
+        body, headers, fresh = cache.get_raw("products:all")
+        assert (body, fresh) == (b"[]", False)
+        assert headers["ETag"]
+
+
+class TestBackgroundRefresh:
+    """refresh_in_background runs one rebuild per key at a time."""
+
+    def test_rebuild_runs_once_per_key(self, redis_client):
+        cache, started, release = CacheManager(), threading.Event(), threading.Event()
+        calls = []
+
+        def rebuild():
+            calls.append(1)
+            started.set()
+            release.wait(3)
+
+        assert cache.refresh_in_background("products:all", rebuild)
+        assert started.wait(3)
+        assert not cache.refresh_in_background("products:all", rebuild)
+        release.set()
+        assert refreshed()
+        assert calls == [1]
+        assert wait_for(lambda: "products:all" not in cache_manager._refreshing)
+
+    def test_rebuild_is_skipped_while_another_worker_holds_the_lock(self, redis_client):
+        cache, calls = CacheManager(), []
+        lock = redis_client.lock("products:all:lock", timeout=10, thread_local=False)
+        assert lock.acquire(blocking=False)
+        assert cache.refresh_in_background("products:all", lambda: calls.append(1))
+        assert wait_for(lambda: "products:all" not in cache_manager._refreshing)
+        assert calls == []
+        lock.release()
+
+    def test_failed_rebuild_is_counted_and_released(self, redis_client):
+        cache = CacheManager()
+
+        def rebuild():
+            raise RuntimeError("database is down")
+
+        assert cache.refresh_in_background("products:all", rebuild)
+        assert wait_for(lambda: cache_manager.cache_stats()
+                        ["stale_while_revalidate"]["refresh_errors"] == 1)
+        assert wait_for(lambda: "products:all" not in cache_manager._refreshing)
+        assert not redis_client.exists("products:all:lock")
+
+
+class TestStaleEndpoint:
+    """Cached endpoints serve the stale payload and store the rebuilt one."""
+
+    @pytest.fixture
+    def product(self, client, admin_headers, redis_client):
+        """One product, cached in Redis."""
+        row = {"name": "product", "price": 10, "size": "small", "quantity": 1}
+        assert client.post(PRODUCTS_URL, json=[row], headers=admin_headers).status_code == 201
+
+        def cached():
+            # The invalidation published by the POST may reach this process
+            # during the rebuild, which then (correctly) skips storing it
+            client.get(f"{PRODUCTS_URL}/1", headers=admin_headers)
+            return redis_client.exists("products:1")
+
+        assert wait_for(cached)
+
+    @staticmethod
+    def change_behind_the_cache(db_manager, **values):
+        """Update the product without invalidating its cached copy."""
+        session = db_manager.sessionlocal()
+        if values:
+            session.query(Product).filter(Product.id == 1).update(values)
+        else:
+            session.query(Product).filter(Product.id == 1).delete()
+        session.commit()
+        db_manager.remove_session()
+
+    def test_stale_payload_is_served_then_refreshed(self, client, admin_headers, db_manager,
+                                                    product, monkeypatch):
+        self.change_behind_the_cache(db_manager, price=20)
+        with monkeypatch.context() as stale:
+            stale.setattr(cache_manager, "_is_fresh", lambda meta: False)
+            response = client.get(f"{PRODUCTS_URL}/1", headers=admin_headers)
+            assert response.get_json()["price"] == 10
+            assert refreshed()
+        response = client.get(f"{PRODUCTS_URL}/1", headers=admin_headers)
+        assert response.get_json()["price"] == 20
+
+    def test_refresh_of_a_deleted_record_drops_the_entry(self, client, admin_headers,
+                                                         db_manager, product, redis_client,
+                                                         monkeypatch):
+        self.change_behind_the_cache(db_manager)
+        with monkeypatch.context() as stale:
+            stale.setattr(cache_manager, "_is_fresh", lambda meta: False)
+            assert client.get(f"{PRODUCTS_URL}/1", headers=admin_headers).status_code == 200
+            assert wait_for(lambda: not redis_client.exists("products:1"))
+        assert client.get(f"{PRODUCTS_URL}/1", headers=admin_headers).status_code == 404